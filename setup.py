@@ -18,5 +18,8 @@ setuptools.setup(
         "License :: OSI Approved :: GNU Lesser General Public License v3 (LGPLv3)",
         "Operating System :: OS Independent",
     ],
-    python_requires='>=3.6',
+    python_requires='>=3.8',
+    entry_points={
+        "console_scripts": ["svg2gcode=svg_to_gcode.cli:main"],
+    },
 )
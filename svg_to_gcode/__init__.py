@@ -1,2 +1,2 @@
-TOLERANCES = {"approximation": 10 ** -2, "input": 10 ** -3, "operation": 10**-6}
+from svg_to_gcode.settings import TOLERANCES, Settings
 UNITS = {"mm", "in"}
@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+# The umask can only be read by setting it. Setting it changes it for every thread of the process, so it's only done
+# once, at import, rather than for every file written.
+_umask = os.umask(0)
+os.umask(_umask)
+
+
+def write_atomically(file_name: str, lines):
+    """
+    Write lines to a temporary file in the destination directory, then move it in place. Readers either see the old
+    file or the complete new one, never a partial file.
+
+    :param file_name: the path of the file.
+    :param lines: an iterable of strings, which are joined by newlines and encoded as utf-8.
+    :return: the number of bytes written.
+    """
+    directory = os.path.dirname(os.path.abspath(file_name))
+    descriptor, temporary_file_name = tempfile.mkstemp(dir=directory, prefix=".svg2gcode-", suffix=".tmp")
+
+    size = 0
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            for i, line in enumerate(lines):
+                data = (line if i == 0 else '\n' + line).encode("utf-8")
+                size += len(data)
+                file.write(data)
+
+        # mkstemp creates private files, give the output the permissions of a regular file instead.
+        os.chmod(temporary_file_name, 0o666 & ~_umask)
+
+        os.replace(temporary_file_name, file_name)
+    except BaseException:
+        os.remove(temporary_file_name)
+        raise
+
+    return size
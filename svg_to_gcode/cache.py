@@ -0,0 +1,180 @@
+"""
+Content-addressed, on-disk cache of compiled programs. Compiling the same file with the same settings twice skips
+parsing, approximation and emission entirely, the cached program is read from disk instead.
+
+Usage:
+    cache = CompileCache("~/.cache/svg_to_gcode", max_size=512 * 2 ** 20)
+    gcode = cache.compile_file("drawing.svg", interfaces.Gcode, 1000, 300, 0, passes=2)
+"""
+
+import functools
+import hashlib
+import json
+import os
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler
+from svg_to_gcode import TOLERANCES
+from svg_to_gcode import instrumentation
+from svg_to_gcode._atomic import write_atomically
+
+# Part of every key. Increment it whenever a change to the library alters the output for identical inputs and settings,
+# such that stale entries are never returned.
+CACHE_VERSION = 1
+
+
+def _describe_interface(interface_class) -> object:
+    """A json serializable description of an interface class, or of a functools.partial which configures one."""
+    if isinstance(interface_class, functools.partial):
+        return {"class": _describe_interface(interface_class.func), "args": interface_class.args,
+                "keywords": interface_class.keywords}
+
+    return f"{interface_class.__module__}.{interface_class.__qualname__}"
+
+
+class CompileCache:
+    """
+    The CompileCache class stores compiled programs on disk, keyed by a hash of everything which affects the output:
+    the bytes of the svg, the parser options, the active TOLERANCES, the interface and the compiler settings. When the cache grows
+    beyond max_size, the least recently used entries are evicted.
+
+    Several processes may share the same directory. Entries are written atomically.
+    """
+
+    def __init__(self, directory: str, max_size=256 * 2 ** 20):
+        """
+        :param directory: where to store the cached programs. Created if it doesn't exist.
+        :param max_size: the maximum total size of the cached programs in bytes.
+        """
+        if max_size <= 0:
+            raise ValueError(f"max_size must be a positive number. Not {max_size}")
+
+        self.directory = os.path.expanduser(directory)
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, svg_file_name: str, interface_class, compiler_options: dict, parser_options: dict,
+            passes: int) -> str:
+        """Return the hexadecimal sha256 digest which identifies a compilation."""
+        digest = hashlib.sha256()
+
+        with open(svg_file_name, 'rb') as file:
+            for chunk in iter(lambda: file.read(2 ** 16), b''):
+                digest.update(chunk)
+
+        settings = {
+            "version": CACHE_VERSION,
+            "interface": _describe_interface(interface_class),
+            "compiler": compiler_options,
+            "parser": parser_options,
+            "passes": passes,
+            "tolerances": dict(TOLERANCES)
+        }
+        digest.update(json.dumps(settings, sort_keys=True, default=repr).encode())
+
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".gcode")
+
+    def compile_file(self, svg_file_name: str, interface_class, movement_speed, cutting_speed, pass_depth, passes=1,
+                     parser_options=None, **compiler_options) -> str:
+        """
+        Parse and compile an svg file, or return the cached program if it was compiled with the same settings before.
+
+        :param svg_file_name: the path of the svg file.
+        :param interface_class: the interface, as passed to the Compiler.
+        :param movement_speed: as passed to the Compiler.
+        :param cutting_speed: as passed to the Compiler.
+        :param pass_depth: as passed to the Compiler.
+        :param passes: as passed to Compiler.compile.
+        :param parser_options: a dictionary of keyword arguments for parse_file.
+        :param compiler_options: additional keyword arguments for the Compiler, like dwell_time or unit.
+        :return: the compiled program.
+        """
+        parser_options = {} if parser_options is None else parser_options
+        compiler_options = dict(compiler_options, movement_speed=movement_speed, cutting_speed=cutting_speed,
+                                pass_depth=pass_depth)
+
+        path = self._path(self.key(svg_file_name, interface_class, compiler_options, parser_options, passes))
+
+        try:
+            with open(path, encoding="utf-8") as file:
+                gcode = file.read()
+        except FileNotFoundError:  # A miss, or evicted by another process in the meantime.
+            pass
+        else:
+            try:
+                os.utime(path)  # The modification time orders entries for eviction.
+            except FileNotFoundError:
+                pass
+
+            self.hits += 1
+            if instrumentation.stats is not None:
+                instrumentation.stats.count("cache_hits")
+            return gcode
+
+        self.misses += 1
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("cache_misses")
+
+        gcode_compiler = Compiler(interface_class, **compiler_options)
+        gcode_compiler.append_curves(parse_file(svg_file_name, **parser_options))
+        gcode = gcode_compiler.compile(passes=passes)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomically(path, [gcode])
+
+        self.evict()
+
+        return gcode
+
+    def _entries(self):
+        """Return a list of (modification time, size, path) tuples, one for each cached program."""
+        entries = []
+        for directory, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                if not file_name.endswith(".gcode"):
+                    continue
+
+                path = os.path.join(directory, file_name)
+                try:
+                    status = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                entries.append((status.st_mtime, status.st_size, path))
+
+        return entries
+
+    def size(self) -> int:
+        """The total size of the cached programs in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove the least recently used programs until the cache fits in max_size."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            total -= size
+
+    def clear(self):
+        """Remove every cached program."""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,208 @@
+"""
+Command line interface. Converts any number of svg files to gcode in parallel.
+
+Usage:
+    svg2gcode drawing.svg other.svg --output-dir gcode --movement-speed 1000 --cutting-speed 300 --pass-depth 0
+    svg2gcode *.svg --config machine.json --jobs 4
+
+A config file is a json object whose keys are the long option names, with dashes or underscores. Options given on the
+command line override the config file.
+"""
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode import TOLERANCES, UNITS, Settings
+from svg_to_gcode._atomic import write_atomically
+from svg_to_gcode.cache import CompileCache
+
+INTERFACES = {"gcode": interfaces.Gcode, "fan": interfaces.FanControlledGcode, "compact": interfaces.CompactGcode}
+
+
+def _number(text: str):
+    """Parse an int if possible, otherwise a float. Interfaces format some numbers as given (F1000 vs F1000.0)."""
+    number = float(text)
+    return int(number) if number.is_integer() else number
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(prog="svg2gcode", description="Convert svg files to gcode.")
+
+    parser.add_argument("inputs", nargs="+", help="the svg files to convert")
+    parser.add_argument("-o", "--output-dir", help="where to save the gcode. Defaults to the directory of each input")
+    parser.add_argument("-c", "--config", help="a json file containing default values for any of these options")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="the number of worker processes. Defaults to the number of cpus")
+
+    compiler = parser.add_argument_group("compiler")
+    compiler.add_argument("--interface", choices=sorted(INTERFACES), default="gcode")
+    compiler.add_argument("--movement-speed", type=_number, help="the speed at which the tool moves between cuts")
+    compiler.add_argument("--cutting-speed", type=_number, help="the speed at which the tool moves while cutting")
+    compiler.add_argument("--pass-depth", type=_number, default=0, help="how far down the tool moves after every pass")
+    compiler.add_argument("--passes", type=int, default=1)
+    compiler.add_argument("--dwell-time", type=_number, default=0, help="ms to wait before moving to another cut")
+    compiler.add_argument("--unit", choices=sorted(UNITS))
+    compiler.add_argument("--tolerance", type=float, default=TOLERANCES["approximation"],
+                          help="the maximum distance between a curve and the line segments approximating it")
+
+    compact = parser.add_argument_group("compact interface")
+    compact.add_argument("--resolution", type=float, help="the smallest distance the machine can move")
+    compact.add_argument("--relative-moves", action="store_true")
+    compact.add_argument("--modal-motion", action="store_true")
+
+    svg = parser.add_argument_group("parser")
+    svg.add_argument("--canvas-height", type=float)
+    svg.add_argument("--no-transform-origin", action="store_true",
+                     help="don't transform svg coordinates to the cartesian coordinate system")
+    svg.add_argument("--draw-hidden", action="store_true", help="draw hidden elements")
+
+    cache = parser.add_argument_group("cache")
+    cache.add_argument("--cache-dir",
+                       help="reuse programs compiled with identical inputs and settings from this directory")
+    cache.add_argument("--cache-size", type=float, default=256, help="the maximum size of the cache in MB")
+
+    return parser
+
+
+def _parse_arguments(parser, argv):
+    arguments = parser.parse_args(argv)
+
+    if arguments.config:
+        with open(arguments.config) as file:
+            config = {key.replace('-', '_'): value for key, value in json.load(file).items()}
+
+        known = {action.dest for action in parser._actions}
+        unknown = set(config) - known - {"help"}
+        if unknown:
+            parser.error(f"Unknown options in {arguments.config}: {', '.join(sorted(unknown))}")
+
+        # Reparse, such that options given on the command line take precedence over the config file.
+        parser.set_defaults(**config)
+        arguments = parser.parse_args(argv)
+
+    if arguments.movement_speed is None or arguments.cutting_speed is None:
+        parser.error("--movement-speed and --cutting-speed are required, either as flags or in the config file")
+
+    if arguments.jobs < 1:
+        parser.error(f"--jobs must be at least 1. Not {arguments.jobs}")
+
+    return arguments
+
+
+def _output_file_name(input_file_name, output_dir):
+    directory = os.path.dirname(input_file_name) if output_dir is None else output_dir
+    return os.path.join(directory, os.path.splitext(os.path.basename(input_file_name))[0] + ".gcode")
+
+
+def _settings(arguments):
+    """Extract everything a worker needs from the arguments, in a picklable dictionary."""
+    interface_options = {}
+    if arguments.interface == "compact":
+        interface_options = {"resolution": arguments.resolution, "relative_moves": arguments.relative_moves,
+                             "modal_motion": arguments.modal_motion}
+
+    return {
+        "interface": arguments.interface,
+        "interface_options": interface_options,
+        "compiler": {"movement_speed": arguments.movement_speed, "cutting_speed": arguments.cutting_speed,
+                     "pass_depth": arguments.pass_depth, "dwell_time": arguments.dwell_time, "unit": arguments.unit},
+        "parser": {"transform_origin": not arguments.no_transform_origin, "canvas_height": arguments.canvas_height,
+                   "draw_hidden": arguments.draw_hidden},
+        "passes": arguments.passes,
+        "tolerance": arguments.tolerance,
+        "cache_dir": arguments.cache_dir,
+        "cache_size": int(arguments.cache_size * 2 ** 20)
+    }
+
+
+def convert(input_file_name: str, output_file_name: str, settings: dict):
+    """
+    Convert a single svg file.
+
+    :return: an (input_file_name, output_file_name, seconds, bytes written, whether the program was cached, error
+    message or None) tuple.
+    """
+    start = time.perf_counter()
+    cached = False
+
+    try:
+        with Settings({"approximation": settings["tolerance"]}):
+            interface_class = INTERFACES[settings["interface"]]
+            if settings["interface_options"]:
+                interface_class = functools.partial(interface_class, **settings["interface_options"])
+
+            if settings["cache_dir"] is None:
+                gcode_compiler = Compiler(interface_class, **settings["compiler"])
+                gcode_compiler.append_curves(parse_file(input_file_name, **settings["parser"]))
+                lines = gcode_compiler.compile_stream(passes=settings["passes"])
+            else:
+                cache = CompileCache(settings["cache_dir"], settings["cache_size"])
+                lines = [cache.compile_file(input_file_name, interface_class, passes=settings["passes"],
+                                            parser_options=settings["parser"], **settings["compiler"])]
+                cached = cache.hits > 0
+
+            size = write_atomically(output_file_name, lines)
+    except Exception as error:
+        return input_file_name, output_file_name, time.perf_counter() - start, 0, cached, \
+            f"{type(error).__name__}: {error}"
+
+    return input_file_name, output_file_name, time.perf_counter() - start, size, cached, None
+
+
+def _convert_task(task):
+    return convert(*task)
+
+
+def main(argv=None) -> int:
+    parser = _build_parser()
+    arguments = _parse_arguments(parser, argv)
+
+    outputs = [_output_file_name(input_file_name, arguments.output_dir) for input_file_name in arguments.inputs]
+    if len(set(outputs)) != len(outputs):
+        parser.error("Several inputs would be saved to the same output file. Rename them or convert them separately.")
+
+    if arguments.output_dir is not None:
+        os.makedirs(arguments.output_dir, exist_ok=True)
+
+    settings = _settings(arguments)
+    tasks = [(input_file_name, output, settings) for input_file_name, output in zip(arguments.inputs, outputs)]
+
+    start = time.perf_counter()
+    jobs = min(arguments.jobs, len(tasks))
+
+    results = []
+    if jobs == 1:
+        for task in tasks:
+            results.append(_convert_task(task))
+            _report(results[-1])
+    else:
+        # Workers are reused for many files, so imports and interpreter startup are paid once per worker.
+        with multiprocessing.Pool(jobs) as pool:
+            for result in pool.imap_unordered(_convert_task, tasks):
+                results.append(result)
+                _report(result)
+
+    failures = sum(1 for result in results if result[5] is not None)
+    print(f"Converted {len(results) - failures}/{len(results)} files in {time.perf_counter() - start:.3f}s "
+          f"using {jobs} {'process' if jobs == 1 else 'processes'}.")
+
+    return 1 if failures else 0
+
+
+def _report(result):
+    input_file_name, output_file_name, seconds, size, cached, error = result
+    if error is None:
+        print(f"{input_file_name} -> {output_file_name}  {seconds:.3f}s  {size} bytes{'  (cached)' if cached else ''}")
+    else:
+        print(f"{input_file_name} failed after {seconds:.3f}s. {error}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,9 @@
 """The compiler sub-module transforms geometric Curves into CAM machine code."""
 
+from svg_to_gcode.compiler._operations import Operation, parse_color
+from svg_to_gcode.compiler._peephole import PeepholeOptimizer, PEEPHOLE_RULES
 from svg_to_gcode.compiler._compiler import Compiler
+from svg_to_gcode.compiler._binary import BinaryWriter, BinaryReader, encode, decode
+from svg_to_gcode.compiler._job_statistics import Machine, JobStatistics, estimate_job
+from svg_to_gcode.compiler._sender import Sender
+from svg_to_gcode.compiler._layers import compile_layers, concatenate_layers
@@ -0,0 +1,354 @@
+"""
+A compact binary container for gcode. Commands are stored in blocks of records, each of which starts with an opcode
+byte. Linear moves store their coordinates as fixed-point integers, delta-encoded from the previous move in the same
+block, such that the few bytes which change between consecutive points are all that is written. Blocks are independent
+of each other and can optionally be compressed with zlib, so the container can be decoded as a stream.
+
+Layout:
+    header: MAGIC, version (1 byte), precision (1 byte)
+    block:  flags (1 byte), payload length (varint), payload (records, zlib compressed if flags & COMPRESSED)
+
+Any line which doesn't match one of the specialised records is stored verbatim, so decoding always yields an
+equivalent program. Numbers are decoded with the container's precision, eg. "F1000" and "F1000.000" are equivalent.
+"""
+
+import io
+import zlib
+
+MAGIC = b"GCB\x00"
+VERSION = 1
+
+COMPRESSED = 0b1
+
+# Opcodes
+MOVE = 0x01
+PARAMETER_COMMANDS = {0x02: "M3 S", 0x03: "M106 S", 0x04: "G4 P"}
+RAW = 0x7F
+
+LITERAL_OFFSET = 0x20
+LITERALS = ("M5;", "G90;", "G91;", "G20;", "G21;", "G28;", "G92 X0 Y0 Z0;", "M107;",
+            "M5", "G90", "G91", "G20", "G21", "G28", "G92 X0 Y0 Z0", "M107")
+
+# Flags of a MOVE record. Axes are stored in the order listed.
+MOVE_AXES = "XYZ"
+HAS_X, HAS_Y, HAS_Z, HAS_F, TERMINATED = 0b1, 0b10, 0b100, 0b1000, 0b10000
+
+
+def _write_varint(buffer: bytearray, value: int):
+    """Append an unsigned LEB128 varint to the buffer."""
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _write_signed_varint(buffer: bytearray, value: int):
+    """Append a zigzag encoded varint to the buffer. Small negative numbers remain small."""
+    _write_varint(buffer, (value << 1) if value >= 0 else ((-value << 1) - 1))
+
+
+def _read_varint(data, index: int):
+    """Read an unsigned varint from data starting at index. Return the value and the index of the next byte."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[index]
+        index += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, index
+        shift += 7
+
+
+def _read_signed_varint(data, index: int):
+    value, index = _read_varint(data, index)
+    return (value >> 1) if not value & 1 else -((value + 1) >> 1), index
+
+
+def _to_fixed_point(number: str, precision: int):
+    """
+    Convert a decimal number string to an integer multiple of 10^-precision without rounding.
+
+    :return: the integer, or None if the string isn't a plain decimal number or has too many significant decimals.
+    """
+    integer, _, fraction = number.partition('.')
+    fraction = fraction.rstrip('0')
+
+    if len(fraction) > precision or (fraction and not fraction.isdigit()):
+        return None
+
+    sign = 1
+    if integer[:1] == '-':
+        sign = -1
+        integer = integer[1:]
+
+    if not (integer.isdigit() or (not integer and fraction)):
+        return None
+
+    return sign * (int(integer or '0') * 10 ** precision + int(fraction.ljust(precision, '0') or '0'))
+
+
+def _format_fixed_point(value: int, precision: int, strip=False):
+    """Write an integer multiple of 10^-precision as a decimal number, optionally without trailing zeros."""
+    if precision == 0:
+        return str(value)
+
+    sign = '-' if value < 0 else ''
+    integer, fraction = divmod(abs(value), 10 ** precision)
+    fraction = f"{fraction:0{precision}d}"
+
+    if strip:
+        fraction = fraction.rstrip('0')
+        return f"{sign}{integer}.{fraction}" if fraction else f"{sign}{integer}"
+
+    return f"{sign}{integer}.{fraction}"
+
+
+class BinaryWriter:
+    """
+    The BinaryWriter class encodes gcode commands into the binary container format. Commands are buffered until a
+    block is full and then written to the underlying binary file.
+    """
+
+    def __init__(self, file, precision=6, block_size=4096, compression_level=6):
+        """
+        :param file: a binary file-like object with a write method.
+        :param precision: the number of decimals coordinates are stored with. Use the precision of the interface.
+        :param block_size: the number of commands per block. Larger blocks compress better.
+        :param compression_level: the zlib compression level of each block. None disables compression.
+        """
+        if not 0 <= precision <= 255:
+            raise ValueError(f"precision must be between 0 and 255. Not {precision}")
+
+        if block_size < 1:
+            raise ValueError(f"block_size must be a positive integer. Not {block_size}")
+
+        self.file = file
+        self.precision = precision
+        self.block_size = block_size
+        self.compression_level = compression_level
+
+        self._literal_opcodes = {literal: LITERAL_OFFSET + index for index, literal in enumerate(LITERALS)}
+        self._parameter_opcodes = {prefix: opcode for opcode, prefix in PARAMETER_COMMANDS.items()}
+
+        self._block = bytearray()
+        self._block_records = 0
+        self._previous = [0, 0, 0]
+
+        self.file.write(MAGIC + bytes([VERSION, precision]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, command: str):
+        """Encode a command. Commands may span multiple lines."""
+        for line in command.split('\n'):
+            self._encode_line(line)
+
+            self._block_records += 1
+            if self._block_records >= self.block_size:
+                self.flush()
+
+    def flush(self):
+        """Write the current block to the file, even if it isn't full."""
+        if not self._block_records:
+            return
+
+        payload = bytes(self._block)
+        flags = 0
+        if self.compression_level is not None:
+            payload = zlib.compress(payload, self.compression_level)
+            flags |= COMPRESSED
+
+        header = bytearray([flags])
+        _write_varint(header, len(payload))
+
+        self.file.write(bytes(header) + payload)
+
+        self._block = bytearray()
+        self._block_records = 0
+        self._previous = [0, 0, 0]
+
+    def close(self):
+        """Flush the last block. The underlying file is left open."""
+        self.flush()
+
+    def _encode_line(self, line: str):
+        block = self._block
+
+        opcode = self._literal_opcodes.get(line)
+        if opcode is not None:
+            block.append(opcode)
+            return
+
+        terminated = line.endswith(';')
+        body = line[:-1] if terminated else line
+
+        if body.startswith("G1 ") and self._encode_move(body[3:], terminated):
+            return
+
+        for prefix, opcode in self._parameter_opcodes.items():
+            if body.startswith(prefix):
+                value = _to_fixed_point(body[len(prefix):], self.precision)
+                if value is not None:
+                    block.append(opcode)
+                    block.append(TERMINATED if terminated else 0)
+                    _write_signed_varint(block, value)
+                    return
+
+        encoded = line.encode("utf-8")
+        block.append(RAW)
+        _write_varint(block, len(encoded))
+        block.extend(encoded)
+
+    def _encode_move(self, words: str, terminated: bool) -> bool:
+        """Encode the words of a G1 command. Return False if they can't be represented by a MOVE record."""
+        values = {}
+        for word in words.split(' '):
+            if not word or word[0] not in "FXYZ" or word[0] in values:
+                return False
+
+            value = _to_fixed_point(word[1:], self.precision)
+            if value is None:
+                return False
+
+            values[word[0]] = value
+
+        flags = TERMINATED if terminated else 0
+        for letter, flag in zip("XYZF", (HAS_X, HAS_Y, HAS_Z, HAS_F)):
+            if letter in values:
+                flags |= flag
+
+        block = self._block
+        block.append(MOVE)
+        block.append(flags)
+
+        if "F" in values:
+            _write_signed_varint(block, values["F"])
+
+        previous = self._previous
+        for index, axis in enumerate(MOVE_AXES):
+            if axis in values:
+                _write_signed_varint(block, values[axis] - previous[index])
+                previous[index] = values[axis]
+
+        return True
+
+
+class BinaryReader:
+    """
+    The BinaryReader class decodes the binary container format back into gcode, one block at a time. Iterating over a
+    reader yields lines of gcode.
+    """
+
+    def __init__(self, file):
+        """
+        :param file: a binary file-like object with a read method, positioned at the start of the container.
+        """
+        self.file = file
+
+        header = file.read(len(MAGIC) + 2)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a binary gcode container. The file doesn't start with the expected magic bytes.")
+
+        version = header[len(MAGIC)]
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary gcode version {version}. Only version {VERSION} is supported.")
+
+        self.precision = header[len(MAGIC) + 1]
+
+    def __iter__(self):
+        while True:
+            payload = self._read_block()
+            if payload is None:
+                return
+
+            yield from self._decode_block(payload)
+
+    def read(self) -> str:
+        """Decode the rest of the container into a gcode string."""
+        return '\n'.join(self)
+
+    def _read_block(self):
+        flags = self.file.read(1)
+        if not flags:
+            return None
+
+        length = 0
+        shift = 0
+        while True:
+            byte = self.file.read(1)
+            if not byte:
+                raise ValueError("Truncated binary gcode container. Block header is incomplete.")
+
+            length |= (byte[0] & 0x7F) << shift
+            shift += 7
+            if byte[0] < 0x80:
+                break
+
+        payload = self.file.read(length)
+        if len(payload) != length:
+            raise ValueError(f"Truncated binary gcode container. Expected a block of {length} bytes, not "
+                             f"{len(payload)}.")
+
+        return zlib.decompress(payload) if flags[0] & COMPRESSED else payload
+
+    def _decode_block(self, data: bytes):
+        precision = self.precision
+        previous = [0, 0, 0]
+        index = 0
+
+        while index < len(data):
+            opcode = data[index]
+            index += 1
+
+            if opcode == MOVE:
+                flags = data[index]
+                index += 1
+                line = "G1"
+
+                if flags & HAS_F:
+                    speed, index = _read_signed_varint(data, index)
+                    line += f" F{_format_fixed_point(speed, precision, strip=True)}"
+
+                for axis_index, (axis, flag) in enumerate(zip(MOVE_AXES, (HAS_X, HAS_Y, HAS_Z))):
+                    if flags & flag:
+                        delta, index = _read_signed_varint(data, index)
+                        previous[axis_index] += delta
+                        line += f" {axis}{_format_fixed_point(previous[axis_index], precision)}"
+
+                yield line + ';' if flags & TERMINATED else line
+
+            elif opcode in PARAMETER_COMMANDS:
+                flags = data[index]
+                value, index = _read_signed_varint(data, index + 1)
+                line = PARAMETER_COMMANDS[opcode] + _format_fixed_point(value, precision, strip=True)
+                yield line + ';' if flags & TERMINATED else line
+
+            elif LITERAL_OFFSET <= opcode < LITERAL_OFFSET + len(LITERALS):
+                yield LITERALS[opcode - LITERAL_OFFSET]
+
+            elif opcode == RAW:
+                length, index = _read_varint(data, index)
+                yield data[index:index + length].decode("utf-8")
+                index += length
+
+            else:
+                raise ValueError(f"Corrupted binary gcode container. Unknown opcode {opcode:#x}.")
+
+
+def encode(gcode: str, precision=6, block_size=4096, compression_level=6) -> bytes:
+    """Encode a gcode string into the binary container format. (Wrapper for BinaryWriter)"""
+    buffer = io.BytesIO()
+    with BinaryWriter(buffer, precision, block_size, compression_level) as writer:
+        writer.write(gcode)
+
+    return buffer.getvalue()
+
+
+def decode(data: bytes) -> str:
+    """Decode a binary container into a gcode string. (Wrapper for BinaryReader)"""
+    return BinaryReader(io.BytesIO(data)).read()
@@ -1,10 +1,74 @@
+import functools
+import itertools
+import os
 import typing
 import warnings
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
 
 from svg_to_gcode.compiler.interfaces import Interface
-from svg_to_gcode.geometry import Curve, Line
-from svg_to_gcode.geometry import LineSegmentChain
-from svg_to_gcode import UNITS, TOLERANCES
+from svg_to_gcode.compiler._binary import BinaryWriter
+from svg_to_gcode.compiler._raster import dither, run_lengths
+from svg_to_gcode.compiler._operations import Operation
+from svg_to_gcode.compiler._peephole import PeepholeOptimizer
+from svg_to_gcode.geometry import Vector, Curve, Line, liang_barsky
+from svg_to_gcode.geometry import LineSegmentChain, BoundingBoxIndex, clip_line_chain, box_contains, hatch_fill, \
+    SegmentIndex, merge_strokes, order_cuts, join_chains, quantize_line_chain
+from svg_to_gcode import UNITS, TOLERANCES, Settings
+from svg_to_gcode import instrumentation
+
+FLATTENINGS = ("adaptive", "uniform")
+
+
+def _with_settings(method):
+    """Run a method of the Compiler with the compiler's Settings active, if it was given any."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.settings is None:
+            return method(self, *args, **kwargs)
+
+        with self.settings:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _format_line_chain(interface, start: Vector, points: list, movement_speed, cutting_speed, dwell_time,
+                       laser_power=1) -> list:
+    """Format the commands which draw a chain, given its start and the end of each of its segments."""
+    code = []
+
+    # Don't dwell and turn off laser if the new start is at the current position
+    if interface.position is None or abs(interface.position - start) > TOLERANCES["operation"]:
+
+        code = [interface.laser_off(), interface.set_movement_speed(movement_speed),
+                interface.linear_move(start.x, start.y), interface.set_movement_speed(cutting_speed),
+                interface.set_laser_power(laser_power)]
+
+        if dwell_time > 0:
+            code = [interface.dwell(dwell_time)] + code
+
+    code.extend(interface.linear_moves(points))
+    return code
+
+
+def _format_chunk(interface_class, settings, state, chains, movement_speed, cutting_speed, dwell_time, laser_power):
+    """
+    Format a chunk of chains in a worker process, starting from a predicted state of the interface.
+
+    :param chains: a list of (start, points) tuples, the start and the end of each segment of a chain as (x, y) tuples.
+    :return: a (commands, state of the interface after them) tuple.
+    """
+    with settings:
+        interface = interface_class()
+        interface.set_state(state)
+
+        commands = []
+        for start, points in chains:
+            commands.extend(_format_line_chain(interface, Vector(*start), points, movement_speed, cutting_speed,
+                                               dwell_time, laser_power))
+
+        return commands, interface.get_state()
 
 
 class Compiler:
@@ -14,7 +78,9 @@ class Compiler:
     """
 
     def __init__(self, interface_class: typing.Type[Interface], movement_speed, cutting_speed, pass_depth,
-                 dwell_time=0, unit=None, custom_header=None, custom_footer=None):
+                 dwell_time=0, unit=None, custom_header=None, custom_footer=None, clip_window=None,
+                 remove_duplicates=False, merge_strokes=False, order_cuts=False, steps_per_mm=None,
+                 flattening="adaptive", peephole=False, settings: Settings = None):
         """
 
         :param interface_class: Specify which interface to use. The most common is the gcode interface.
@@ -25,10 +91,31 @@ class Compiler:
         :param unit: specify a unit to the machine
         :param custom_header: A list of commands to be executed before all generated commands. Default is [laser_off,]
         :param custom_footer: A list of commands to be executed after all generated commands. Default is [laser_off,]
+        :param clip_window: (min_x, min_y, max_x, max_y). If specified, only geometry inside this window is drawn, eg.
+        the extents of the machine's bed or the region of the sheet which should be cut.
+        :param remove_duplicates: whether or not to skip segments which were already drawn, like the edges shared by
+        neighbouring parts. Both exact duplicates and collinear overlaps are removed, within the input tolerance.
+        :param merge_strokes: whether or not append_curves should join the approximated curves into as few continuous
+        strokes as possible, reversing them where needed. Saves most tool lifts and dwells, eg. on pen plotters.
+        :param order_cuts: whether or not append_curves should cut the chains inside of each closed chain before it, such
+        that holes are cut before the parts which contain them drop out of the sheet. Otherwise, the document order is
+        kept.
+        :param steps_per_mm: the resolution of the machine, in steps per unit. If specified, every vertex is snapped to
+        the nearest position the machine can reach and segments shorter than a step are dropped. The number of lines
+        saved is counted in self.saved_lines.
+        :param flattening: how append_curves approximates curves with line segments. "adaptive" grows and shrinks every
+        segment until its error is within tolerance. "uniform" computes every segment of a curve in a single batch with
+        the selected geometry backend, which is faster, especially with numpy, but may use more segments.
+        :param peephole: whether or not to remove redundant commands from the compiled program, like M5 while the laser
+        is already off, G90 in absolute mode or moves to the current position. True applies every rule, a collection of
+        rule names applies those, see PeepholeOptimizer. self.peephole.saved counts the commands each rule saved.
+        :param settings: the Settings of the job, which are active whenever the compiler draws. The tolerances active at
+        the time of each call are used by default. Give every concurrent job its own compiler and Settings.
         """
-        self.interface = interface_class()
+        self.settings = settings
         self.movement_speed = movement_speed
         self.cutting_speed = cutting_speed
+        self.laser_power = 1  # Between 0 and 1. append_paths sets it for each operation.
         self.pass_depth = abs(pass_depth)
         self.dwell_time = dwell_time
 
@@ -37,9 +124,49 @@ class Compiler:
         
         self.unit = unit
 
+        if clip_window is not None and (clip_window[0] >= clip_window[2] or clip_window[1] >= clip_window[3]):
+            raise ValueError(f"clip_window must be (min_x, min_y, max_x, max_y) with min < max. Not {clip_window}")
+
+        self.clip_window = clip_window
+        self.remove_duplicates = remove_duplicates
+        self.merge_strokes = merge_strokes
+        self.order_cuts = order_cuts
+
+        if steps_per_mm is not None and steps_per_mm <= 0:
+            raise ValueError(f"steps_per_mm must be a positive number. Not {steps_per_mm}")
+
+        self.steps_per_mm = steps_per_mm
+
+        if flattening not in FLATTENINGS:
+            raise ValueError(f"Unknown flattening {flattening}. Please specify one of the following: {FLATTENINGS}")
+
+        self.flattening = flattening
+
+        self.peephole = None
+        if peephole:
+            self.peephole = PeepholeOptimizer() if peephole is True else PeepholeOptimizer(peephole)
+
+        self._interface_class = interface_class
+        self._custom_header = custom_header
+        self._custom_footer = custom_footer
+
+        self.reset()
+
+    @_with_settings
+    def reset(self):
+        """
+        Start a new job. Discard the body, the state of the interface, like the position of the tool, and the segments
+        remove_duplicates remembers, such that the compiler can be reused instead of growing the same body forever.
+        """
+        self.interface = self._interface_class()
+        self.saved_lines = 0
+        self.segment_index = SegmentIndex() if self.remove_duplicates else None
+
+        custom_header = self._custom_header
         if custom_header is None:
             custom_header = [self.interface.laser_off()]
 
+        custom_footer = self._custom_footer
         if custom_footer is None:
             custom_footer = [self.interface.laser_off()]
 
@@ -59,6 +186,24 @@ class Compiler:
         :return returns the assembled code. self.header + [self.body, -self.pass_depth] * passes + self.footer
         """
 
+        with instrumentation.stage("join"):
+            gcode = '\n'.join(self.compile_stream(passes=passes))
+
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("bytes_emitted", len(gcode))
+
+        return gcode
+
+    def compile_stream(self, passes=1):
+        """
+        Assembles the code in the header, body and footer, yielding one non-empty command at a time. Useful to write or
+        send large programs without holding the whole string in memory.
+
+        :param passes: the number of passes that should be made. Every pass the machine moves_down (z-axis) by
+        self.pass_depth and self.body is repeated.
+        :return: a generator of commands. self.header + [self.body, -self.pass_depth] * passes + self.footer
+        """
+
         if len(self.body) == 0:
             warnings.warn("Compile with an empty body (no curves). Is this intentional?")
 
@@ -66,22 +211,114 @@ class Compiler:
 
         gcode.extend(self.header)
         gcode.append(self.interface.set_unit(self.unit))
+
+        yield from self._optimize(itertools.chain(gcode, self._passes(passes), self.footer))
+
+    def _optimize(self, commands):
+        """Drop the empty commands, or apply the peephole optimizer if it's enabled."""
+        if self.peephole is None:
+            return filter(None, commands)
+
+        return self.peephole.optimize(commands)
+
+    def _passes(self, passes):
+        """Yield the commands of the body, repeated for every pass and moving down between passes."""
         for i in range(passes):
-            gcode.extend(self.body)
+            yield from self.body
 
             if i < passes - 1:  # If it isn't the last pass, turn off the laser and move down
-                gcode.append(self.interface.laser_off())
+                yield from self._step_down(self.pass_depth)
+
+    def _step_down(self, depth) -> list:
+        """The commands which turn off the laser and move the machine down by depth, or up if depth is negative."""
+        gcode = [self.interface.laser_off()]
+
+        if depth != 0:
+            gcode.append(self.interface.set_relative_coordinates())
+            gcode.append(self.interface.linear_move(z=-depth))
+            gcode.append(self.interface.set_absolute_coordinates())
+
+        return gcode
+
+    def compile_array(self, columns: int, rows: int, spacing, passes=1, subroutine=False):
+        """
+        Assembles the code to cut columns x rows copies of the body, placed on a grid. Returns the assembled code.
+
+        See compile_array_stream.
+        """
+        return '\n'.join(self.compile_array_stream(columns, rows, spacing, passes, subroutine))
+
+    def compile_array_stream(self, columns: int, rows: int, spacing, passes=1, subroutine=False):
+        """
+        Assembles the code to cut columns x rows copies of the body, yielding one non-empty command at a time. Instead of
+        duplicating the geometry, the body is compiled once and each copy is placed by translating the origin of the
+        coordinate system with interface.translate_origin (G92 for gcode). Copies are cut in serpentine order, row by
+        row, to keep travel short. Once done, the origin is translated back to where it was.
+
+        :param columns: the number of copies along the x axis.
+        :param rows: the number of copies along the y axis.
+        :param spacing: an (x, y) tuple, the distance between the origins of neighbouring copies.
+        :param passes: the number of passes per copy. Every pass the machine moves down by self.pass_depth, after
+        the last one it moves back up.
+        :param subroutine: whether or not to define the body as a subroutine which is called once per copy, such that
+        the size of the program barely depends on the number of copies. The interface must implement subroutines.
+        :return: a generator of commands.
+        """
+        yield from self._optimize(self._compile_array_stream(columns, rows, spacing, passes, subroutine))
+
+    def _compile_array_stream(self, columns, rows, spacing, passes, subroutine):
+        if columns < 1 or rows < 1:
+            raise ValueError(f"An array needs at least one column and one row. Not {columns}x{rows}")
 
-                if self.pass_depth > 0:
-                    gcode.append(self.interface.set_relative_coordinates())
-                    gcode.append(self.interface.linear_move(z=-self.pass_depth))
-                    gcode.append(self.interface.set_absolute_coordinates())
+        spacing_x, spacing_y = spacing
 
-        gcode.extend(self.footer)
+        # Serpentine order: every other row is cut from right to left.
+        placements = [(column * spacing_x, row * spacing_y) for row in range(rows)
+                      for column in (range(columns) if row % 2 == 0 else range(columns - 1, -1, -1))]
 
-        gcode = filter(lambda command: len(command) > 0, gcode)
+        yield from filter(None, self.header)
+        yield from filter(None, [self.interface.set_unit(self.unit)])
 
-        return '\n'.join(gcode)
+        # The code of a single copy, generated once and reused for every placement.
+        part = list(filter(None, self._passes(passes)))
+        if passes > 1 and self.pass_depth > 0:
+            part.extend(filter(None, self._step_down(-self.pass_depth * (passes - 1))))
+
+        # Every copy ends in the same state, each translation is generated from a copy of it.
+        part_end = deepcopy(self.interface)
+
+        def translate_origin(x, y):
+            command = deepcopy(part_end).translate_origin(x, y)
+            if command is None:
+                raise ValueError(f"{type(self.interface).__name__} doesn't implement translate_origin")
+            return command
+
+        if subroutine:
+            number = 100
+            definition = [self.interface.begin_subroutine(number), self.interface.end_subroutine(number),
+                          self.interface.call_subroutine(number)]
+
+            if None in definition:
+                raise ValueError(f"{type(self.interface).__name__} doesn't implement subroutines")
+
+            yield definition[0]
+            yield from part
+            yield definition[1]
+
+            part = [definition[2]]
+
+        for index, (x, y) in enumerate(placements):
+            if index > 0:
+                previous_x, previous_y = placements[index - 1]
+                yield translate_origin(x - previous_x, y - previous_y)
+
+            yield from part
+
+        last_x, last_y = placements[-1]
+        if len(placements) > 1:
+            yield translate_origin(-last_x, -last_y)
+
+        yield from filter(None, self.footer)
 
     def compile_to_file(self, file_name: str, passes=1):
         """
@@ -95,46 +332,357 @@ class Compiler:
         with open(file_name, 'w') as file:
             file.write(self.compile(passes=passes))
 
+    def compile_to_binary(self, file_name: str, passes=1, block_size=4096, compression_level=6):
+        """
+        A wrapper for the self.compile_stream method. Assembles the code in the header, body and footer, saving it to a
+        file in the compact binary container format. Use BinaryReader to convert it back to text.
+
+        :param file_name: the path to save the file.
+        :param passes: the number of passes that should be made. Every pass the machine moves_down (z-axis) by
+        self.pass_depth and self.body is repeated.
+        :param block_size: the number of commands per block. Larger blocks compress better.
+        :param compression_level: the zlib compression level of each block. None disables compression.
+        """
+
+        precision = getattr(self.interface, "precision", 6)
+
+        with open(file_name, 'wb') as file, BinaryWriter(file, precision, block_size, compression_level) as writer:
+            for command in self.compile_stream(passes=passes):
+                writer.write(command)
+
+    @_with_settings
     def append_line_chain(self, line_chain: LineSegmentChain):
         """
-        Draws a LineSegmentChain by calling interface.linear_move() for each segment. The resulting code is appended to
-        self.body
+        Draws a LineSegmentChain by calling interface.linear_moves() with the end of each segment. The resulting code is
+        appended to self.body
         """
 
         if line_chain.chain_size() == 0:
             warnings.warn("Attempted to parse empty LineChain")
             return []
 
-        code = []
+        for line_chain in self._prepare_line_chain(line_chain):
+            self._emit_line_chain(line_chain)
 
-        start = line_chain.get(0).start
+    @_with_settings
+    def append_line_chains(self, line_chains: [LineSegmentChain], processes=None):
+        """
+        Draws LineSegmentChains like self.append_line_chain(), but formats them in parallel worker processes. The
+        chains are split in one chunk per process. Each chunk is formatted from the state the interface is predicted to
+        be in, and a sequential pass stitches the chunks together, such that the result is identical to serial output.
 
-        # Don't dwell and turn off laser if the new start is at the current position
-        if self.interface.position is None or abs(self.interface.position - start) > TOLERANCES["operation"]:
+        Starting the processes takes a while, it's only worth it for large jobs. Interfaces which don't implement
+        get_state, set_state and stitch are formatted serially.
 
-            code = [self.interface.laser_off(), self.interface.set_movement_speed(self.movement_speed),
-                    self.interface.linear_move(start.x, start.y), self.interface.set_movement_speed(self.cutting_speed),
-                    self.interface.set_laser_power(1)]
+        :param line_chains: the chains to draw.
+        :param processes: the number of worker processes. Defaults to the number of cpus.
+        """
+        self._append_line_chains(line_chains, processes)
 
-            if self.dwell_time > 0:
-                code = [self.interface.dwell(self.dwell_time)] + code
+    def _append_line_chains(self, line_chains: [LineSegmentChain], processes, passes=1):
+        """
+        Draw the chains passes times. They're clipped, deduplicated and quantized once, before the first pass. Like
+        self.compile() does, the machine moves down by self.pass_depth between passes. After the last one it moves back
+        up, such that whatever is drawn next starts at the same height.
+        """
+        pieces = []
+        for line_chain in line_chains:
+            if line_chain.chain_size() == 0:
+                warnings.warn("Attempted to parse empty LineChain")
+                continue
 
-        for line in line_chain:
-            code.append(self.interface.linear_move(line.end.x, line.end.y))
+            pieces.extend(self._prepare_line_chain(line_chain))
 
-        self.body.extend(code)
+        processes = (os.cpu_count() or 1) if processes is None else processes
 
-    def append_curves(self, curves: [typing.Type[Curve]]):
+        for i in range(passes):
+            self._emit_pieces(pieces, processes)
+
+            if i < passes - 1:
+                self.body.extend(filter(None, self._step_down(self.pass_depth)))
+
+        if passes > 1 and self.pass_depth > 0:
+            self.body.extend(filter(None, self._step_down(-self.pass_depth * (passes - 1))))
+
+    def _emit_pieces(self, pieces: list, processes: int):
+        """Format prepared chains, in parallel if there are enough of them for processes workers."""
+        try:
+            state = self.interface.get_state()
+        except NotImplementedError:
+            processes = 1
+
+        if processes <= 1 or len(pieces) < processes:
+            for line_chain in pieces:
+                self._emit_line_chain(line_chain)
+            return
+
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("chains", len(pieces))
+
+        with instrumentation.stage("emission"):
+            self.body.extend(self._format_in_parallel(pieces, processes, state))
+
+    def _prepare_line_chain(self, line_chain: LineSegmentChain) -> list:
+        """
+        Clip a chain, remove the segments which were already drawn and snap it to the resolution of the machine, if
+        enabled. Return the pieces to draw.
+        """
+        line_chains = [line_chain]
+
+        if self.clip_window is not None and not box_contains(self.clip_window, line_chain.bounding_box()):
+            line_chains = clip_line_chain(line_chain, self.clip_window)
+
+        if self.segment_index is not None:
+            with instrumentation.stage("deduplication"):
+                line_chains = [piece for line_chain in line_chains for piece in self.segment_index.add(line_chain)]
+
+        if self.steps_per_mm is not None:
+            with instrumentation.stage("quantization"):
+                quantized = [quantize_line_chain(line_chain, self.steps_per_mm) for line_chain in line_chains]
+
+            saved = sum(line_chain.chain_size() for line_chain in line_chains) - \
+                sum(line_chain.chain_size() for line_chain in quantized)
+            self.saved_lines += saved
+
+            if instrumentation.stats is not None:
+                instrumentation.stats.count("quantized_lines", saved)
+
+            line_chains = [line_chain for line_chain in quantized if line_chain.chain_size()]
+
+        return line_chains
+
+    def _format_in_parallel(self, line_chains: list, processes: int, state) -> list:
+        chains = [((line_chain.get(0).start.x, line_chain.get(0).start.y),
+                   [(line.end.x, line.end.y) for line in line_chain]) for line_chain in line_chains]
+
+        # Chunks of roughly the same number of segments
+        total = sum(len(points) for _, points in chains)
+        chunks = [[]]
+        size = 0
+        for chain in chains:
+            if size >= total * len(chunks) / processes:
+                chunks.append([])
+
+            chunks[-1].append(chain)
+            size += len(chain[1])
+
+        # Every chunk but the first starts where the last chain of the previous one ends. Format it with a fresh
+        # interface to predict the state it leaves the interface in.
+        predicted = [state]
+        for chunk in chunks[:-1]:
+            interface = self._interface_class()
+            start, points = chunk[-1]
+            _format_line_chain(interface, Vector(*start), points, self.movement_speed, self.cutting_speed,
+                               self.dwell_time, self.laser_power)
+            predicted.append(interface.get_state())
+
+        arguments = [(self._interface_class, Settings(), chunk_state, chunk, self.movement_speed, self.cutting_speed,
+                      self.dwell_time, self.laser_power) for chunk_state, chunk in zip(predicted, chunks)]
+
+        with ProcessPoolExecutor(processes) as executor:
+            results = list(executor.map(_format_chunk, *zip(*arguments)))
+
+        code = []
+        for chunk, chunk_state, (commands, exit_state) in zip(chunks, predicted, results):
+            commands = self.interface.stitch(commands, chunk_state, state)
+
+            # The prediction was wrong, format the chunk again from the actual state.
+            if commands is None:
+                self.interface.set_state(state)
+                commands = [command for start, points in chunk for command in
+                            _format_line_chain(self.interface, Vector(*start), points, self.movement_speed,
+                                               self.cutting_speed, self.dwell_time, self.laser_power)]
+                exit_state = self.interface.get_state()
+
+            code.extend(commands)
+            state = exit_state
+
+        self.interface.set_state(state)
+        return code
+
+    def _emit_line_chain(self, line_chain: LineSegmentChain):
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("chains")
+            with instrumentation.stats.stage("emission"):
+                return self._append_line_chain(line_chain)
+
+        return self._append_line_chain(line_chain)
+
+    def _append_line_chain(self, line_chain: LineSegmentChain):
+        self.body.extend(_format_line_chain(self.interface, line_chain.get(0).start,
+                                            [(line.end.x, line.end.y) for line in line_chain], self.movement_speed,
+                                            self.cutting_speed, self.dwell_time, self.laser_power))
+
+    @_with_settings
+    def append_curves(self, curves: [typing.Type[Curve]], processes=1):
         """
         Draws curves by approximating them as line segments and calling self.append_line_chain(). The resulting code is
         appended to self.body
+
+        If self.clip_window is specified, curves whose bounding box lies outside of it are dropped before being
+        approximated. If self.merge_strokes is set, the approximations are joined into strokes before being drawn. If
+        self.order_cuts is set, the chains are ordered such that the contents of every closed chain are cut before it.
+
+        :param curves: the curves to draw.
+        :param processes: the number of worker processes which format the commands, see self.append_line_chains(). None
+        uses every cpu.
         """
+        self._append_curves(curves, processes)
+
+    def _append_curves(self, curves: [typing.Type[Curve]], processes, passes=1):
+        if self.clip_window is not None:
+            curves = list(curves)
+            visible = [curve for curve, _ in BoundingBoxIndex(curves).query(self.clip_window)]
+
+            if instrumentation.stats is not None:
+                instrumentation.stats.count("culled_curves", len(curves) - len(visible))
 
+            curves = visible
+
+        line_chains = []
         for curve in curves:
             line_chain = LineSegmentChain()
 
-            approximation = LineSegmentChain.line_segment_approximation(curve)
+            if self.flattening == "uniform":
+                approximation = LineSegmentChain.uniform_approximation(curve)
+            else:
+                approximation = LineSegmentChain.line_segment_approximation(curve)
 
             line_chain.extend(approximation)
 
+            if not (self.merge_strokes or self.order_cuts or processes != 1 or passes != 1):
+                self.append_line_chain(line_chain)
+            else:
+                line_chains.append(line_chain)
+
+        if self.merge_strokes:
+            with instrumentation.stage("merging"):
+                strokes = merge_strokes(line_chains)
+
+            if instrumentation.stats is not None:
+                instrumentation.stats.count("merged_chains", len(line_chains) - len(strokes))
+
+            line_chains = strokes
+
+        if self.order_cuts:
+            with instrumentation.stage("ordering"):
+                line_chains = order_cuts(join_chains(line_chains), self.interface.position)
+
+        self._append_line_chains(line_chains, processes, passes)
+
+    @_with_settings
+    def append_paths(self, paths: list, operations: [Operation], processes=1):
+        """
+        Draws paths with the parameters of the first operation each of them matches, like the one of its stroke colour.
+        The paths are grouped by operation and the groups are drawn in the order of operations, such that the speed and
+        the power only change once per group. Within a group, paths are drawn like self.append_curves() draws curves.
+
+        :param paths: the Paths to draw, as returned by parse_file_paths. Their style carries their stroke colour,
+        stroke width and class.
+        :param operations: a list of Operations. Paths which match none of them are drawn last, at self.cutting_speed
+        and full power.
+        :param processes: as passed to self.append_curves().
+        """
+        groups = [[] for _ in range(len(operations) + 1)]
+        for path in paths:
+            index = next((i for i, operation in enumerate(operations) if operation.matches(path.style)), -1)
+            groups[index].extend(path.curves)
+
+        cutting_speed, laser_power = self.cutting_speed, self.laser_power
+        try:
+            for operation, curves in zip(list(operations) + [Operation()], groups):
+                if not curves:
+                    continue
+
+                self.cutting_speed = cutting_speed if operation.cutting_speed is None else operation.cutting_speed
+                self.laser_power = operation.power
+
+                tolerances = None if operation.tolerance is None else {"approximation": operation.tolerance}
+                with Settings(tolerances):
+                    self._append_curves(curves, processes, operation.passes)
+        finally:
+            self.cutting_speed, self.laser_power = cutting_speed, laser_power
+
+    @_with_settings
+    def append_fill(self, curves: [typing.Type[Curve]], spacing: float, angle=0, fill_rule="nonzero"):
+        """
+        Fills the shapes described by curves with hatch lines and draws them with self.append_line_chain(). The
+        resulting code is appended to self.body. See geometry.hatch_fill.
+
+        :param curves: the outline of the shapes, eg. the curves of a parsed Path.
+        :param spacing: the distance between neighbouring hatch lines. Usually the width of the cut.
+        :param angle: the angle of the hatch lines in degrees, counter-clockwise from the x axis.
+        :param fill_rule: "nonzero" or "evenodd". Use the fill-rule of the parsed path, Path.style.get("fill-rule").
+        """
+        with instrumentation.stage("hatch"):
+            line_chains = hatch_fill(curves, spacing, angle, fill_rule)
+
+        for line_chain in line_chains:
             self.append_line_chain(line_chain)
+
+    @_with_settings
+    def append_image(self, image, levels=2, max_power=1):
+        """
+        Engraves a grayscale image, one scanline per row of pixels. Darker pixels are engraved with more power. Rows are
+        dithered to the given number of power levels and run-length encoded, such that each run of pixels with the same
+        power is a single move. Rows are scanned in alternating directions. The resulting code is appended to self.body
+
+        :param image: a svg_parser.Image, eg. from parse_file_images.
+        :param levels: the number of power levels, including off. The default dithers to on and off, which works on
+        any machine. More levels need a tool which responds proportionally to set_laser_power.
+        :param max_power: the power used for black pixels, between 0 and 1.
+        """
+        if not 0 < max_power <= 1:
+            raise ValueError(f"max_power must be between 0 and 1. Not {max_power}")
+
+        with instrumentation.stage("raster"):
+            rows = dither(image.pixels, levels)
+
+        forward = True
+        for index, row in enumerate(rows):
+            runs = run_lengths(row)
+            if not runs:
+                continue
+
+            y = index + 0.5  # Scan through the center of the row of pixels.
+            segments = [(image.point(start, y), image.point(end, y), level * max_power / (levels - 1))
+                        for start, end, level in runs]
+
+            if not forward:
+                segments = [(end, start, power) for start, end, power in reversed(segments)]
+
+            forward = not forward
+
+            if instrumentation.stats is not None:
+                instrumentation.stats.count("raster_rows")
+                instrumentation.stats.count("raster_runs", len(segments))
+
+            self._append_raster_row(segments)
+
+    def _append_raster_row(self, segments):
+        code = []
+        power = None
+
+        for start, end, segment_power in segments:
+            if self.clip_window is not None:
+                clipped = liang_barsky(Line(start, end), self.clip_window)
+                if clipped is None:
+                    continue
+
+                direction = end - start
+                start, end = start + direction * clipped[0], start + direction * clipped[1]
+
+            # Travel to the start of the row, or across the parts which were clipped.
+            if self.interface.position is None or abs(self.interface.position - start) > TOLERANCES["operation"]:
+                code.extend([self.interface.laser_off(), self.interface.set_movement_speed(self.movement_speed),
+                             self.interface.linear_move(start.x, start.y),
+                             self.interface.set_movement_speed(self.cutting_speed)])
+                power = None
+
+            if segment_power != power:
+                power = segment_power
+                code.append(self.interface.set_laser_power(power))
+
+            code.append(self.interface.linear_move(end.x, end.y))
+
+        self.body.extend(code)
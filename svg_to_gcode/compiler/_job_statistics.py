@@ -0,0 +1,223 @@
+import math
+
+from svg_to_gcode.compiler.interfaces import DryRun
+from svg_to_gcode import TOLERANCES
+
+
+class Machine:
+    """
+    The Machine class describes the motion planner of a machine, as far as it's relevant to estimate how long a job
+    takes. Lengths are in the unit of the program (usually mm), speeds are given per minute like gcode feed rates.
+    """
+
+    def __init__(self, acceleration=500, junction_deviation=0.01, max_speed=None, pierce_time=0):
+        """
+        :param acceleration: the acceleration of the machine in units/s^2.
+        :param junction_deviation: how far the tool may deviate from a corner while cornering at speed, in units. It
+        determines the maximum speed at the junction of two moves, like grbl's $11 setting.
+        :param max_speed: the maximum speed of the machine in units/min. Faster feed rates are capped. None means no
+        limit.
+        :param pierce_time: an additional number of seconds spent every time the laser is turned on.
+        """
+        if acceleration <= 0:
+            raise ValueError(f"acceleration must be a positive number. Not {acceleration}")
+
+        if junction_deviation < 0:
+            raise ValueError(f"junction_deviation can't be negative. Not {junction_deviation}")
+
+        self.acceleration = acceleration
+        self.junction_deviation = junction_deviation
+        self.max_speed = max_speed
+        self.pierce_time = pierce_time
+
+
+class JobStatistics:
+    """The JobStatistics class summarises a job. Lengths are in the unit of the program and times are in seconds."""
+
+    __slots__ = "cut_length", "travel_length", "segment_count", "pierce_count", "dwell_time", "estimated_time"
+
+    def __init__(self):
+        self.cut_length = 0
+        self.travel_length = 0
+        self.segment_count = 0
+        self.pierce_count = 0
+        self.dwell_time = 0
+        self.estimated_time = 0
+
+    def __repr__(self):
+        return f"JobStatistics({', '.join(f'{key}: {value}' for key, value in self.as_dict().items())})"
+
+    def as_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+def _junction_speed_squared(previous_unit, unit, acceleration, junction_deviation):
+    """
+    The maximum speed squared at which the tool can turn from one direction to another, using the junction deviation
+    model. The corner is approximated by an arc which deviates junction_deviation from the corner. Like grbl, speed is
+    limited by the centripetal acceleration along that arc.
+    """
+    cos_theta = -(previous_unit[0] * unit[0] + previous_unit[1] * unit[1] + previous_unit[2] * unit[2])
+
+    if cos_theta > 0.999999:  # The tool reverses direction
+        return 0
+
+    if cos_theta < -0.999999:  # The tool continues in a straight line
+        return math.inf
+
+    sin_theta_d2 = math.sqrt(0.5 * (1 - cos_theta))
+    return acceleration * junction_deviation * sin_theta_d2 / (1 - sin_theta_d2)
+
+
+def _plan_time(blocks, acceleration, junction_deviation):
+    """
+    Estimate the time required to execute a sequence of moves which starts and ends at rest, using a trapezoidal speed
+    profile for every move.
+
+    :param blocks: a list of (length, unit_vector, nominal_speed) tuples, speeds are in units/s.
+    """
+    if not blocks:
+        return 0
+
+    # The maximum entry speed (squared) of each block, limited by the junction and by the nominal speeds.
+    entry = [0]
+    for previous, block in zip(blocks, blocks[1:]):
+        junction = _junction_speed_squared(previous[1], block[1], acceleration, junction_deviation)
+        entry.append(min(junction, previous[2] ** 2, block[2] ** 2))
+
+    # Backward pass, the tool must be able to decelerate to the entry speed of the next block (and stop at the end).
+    exit_speed = 0
+    for i in range(len(blocks) - 1, -1, -1):
+        entry[i] = min(entry[i], exit_speed + 2 * acceleration * blocks[i][0])
+        exit_speed = entry[i]
+
+    # Forward pass, the tool must be able to accelerate to the entry speed of the next block.
+    for i in range(len(blocks) - 1):
+        entry[i + 1] = min(entry[i + 1], entry[i] + 2 * acceleration * blocks[i][0])
+
+    entry.append(0)
+
+    time = 0
+    for i, (length, _, nominal) in enumerate(blocks):
+        entry_squared, exit_squared = entry[i], entry[i + 1]
+
+        acceleration_distance = (nominal ** 2 - entry_squared) / (2 * acceleration)
+        deceleration_distance = (nominal ** 2 - exit_squared) / (2 * acceleration)
+
+        entry_speed, exit_speed = math.sqrt(entry_squared), math.sqrt(exit_squared)
+
+        if acceleration_distance + deceleration_distance <= length:  # Trapezoid, the tool reaches the nominal speed.
+            cruise_distance = length - acceleration_distance - deceleration_distance
+            time += (nominal - entry_speed) / acceleration + (nominal - exit_speed) / acceleration + \
+                cruise_distance / nominal
+        else:  # Triangle, the tool decelerates before reaching the nominal speed.
+            peak = math.sqrt(max(entry_squared, exit_squared,
+                                 acceleration * length + (entry_squared + exit_squared) / 2))
+            time += (peak - entry_speed) / acceleration + (peak - exit_speed) / acceleration
+
+    return time
+
+
+def estimate_job(compiler, machine=None, passes=1) -> JobStatistics:
+    """
+    Collect statistics about a job and estimate how long it takes to execute, without generating any code. The
+    compiler must use the DryRun interface. Its output is replayed exactly as a machine would execute it.
+
+    :param compiler: a Compiler instantiated with interfaces.DryRun, to which curves have already been appended.
+    :param machine: a Machine describing the motion planner. The default Machine is used if None.
+    :param passes: the number of passes, as passed to Compiler.compile.
+    :return: a JobStatistics instance.
+    """
+    if not isinstance(compiler.interface, DryRun):
+        raise ValueError(f"estimate_job requires a compiler with the DryRun interface. Not "
+                         f"{type(compiler.interface).__name__}")
+
+    machine = Machine() if machine is None else machine
+    interface = compiler.interface
+
+    statistics = JobStatistics()
+
+    # Replaying the program records its events and changes the interface's state. Both are restored afterwards, such
+    # that estimating a job has no side effects.
+    state = dict(vars(interface))
+    recorded = len(interface.events)
+    try:
+        _replay(compiler.compile_stream(passes=passes), interface, machine, statistics)
+    finally:
+        del interface.events[recorded:]
+        vars(interface).update(state)
+
+    return statistics
+
+
+def _replay(tokens, interface, machine, statistics):
+    """Add the lengths, counts and times of the events represented by the tokens to the statistics."""
+    position = [0, 0, 0]
+    absolute = True
+    speed = None
+    laser_on = False
+
+    blocks = []  # Consecutive moves, planned together until the machine has to stop.
+
+    def stop():
+        statistics.estimated_time += _plan_time(blocks, machine.acceleration, machine.junction_deviation)
+        blocks.clear()
+
+    for token in tokens:
+        event = interface.event(token)
+        if event is None:
+            continue
+
+        kind = event[0]
+
+        if kind == "move":
+            target = [position[axis] if value is None else (value if absolute else position[axis] + value)
+                      for axis, value in enumerate(event[1:])]
+
+            delta = [target[axis] - position[axis] for axis in range(3)]
+            length = math.sqrt(delta[0] ** 2 + delta[1] ** 2 + delta[2] ** 2)
+            position = target
+
+            # Moves below operational tolerance are lost when the program is formatted.
+            if length < TOLERANCES["operation"]:
+                continue
+
+            statistics.segment_count += 1
+            if laser_on:
+                statistics.cut_length += length
+            else:
+                statistics.travel_length += length
+
+            nominal = speed if machine.max_speed is None else min(speed, machine.max_speed)
+            blocks.append((length, [component / length for component in delta], nominal / 60))
+
+        elif kind == "speed":
+            speed = event[1]
+
+        elif kind == "laser_power":
+            stop()
+            if not laser_on and event[1] > 0:
+                statistics.pierce_count += 1
+                statistics.estimated_time += machine.pierce_time
+            laser_on = event[1] > 0
+
+        elif kind == "laser_off":
+            stop()
+            laser_on = False
+
+        elif kind == "dwell":
+            stop()
+            statistics.dwell_time += event[1] / 1000
+            statistics.estimated_time += event[1] / 1000
+
+        elif kind == "absolute":
+            absolute = True
+
+        elif kind == "relative":
+            absolute = False
+
+        elif kind in ("origin", "home"):
+            stop()
+            position = [0, 0, 0]
+
+    stop()
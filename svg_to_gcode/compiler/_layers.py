@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from svg_to_gcode.compiler._compiler import Compiler
+from svg_to_gcode import Settings
+
+
+def _compile_layer(curves, options) -> str:
+    """Compile the curves of a layer, in a worker process."""
+    options = dict(options)
+    interface_class, passes = options.pop("interface_class"), options.pop("passes")
+
+    gcode_compiler = Compiler(interface_class, **options)
+    gcode_compiler.append_curves(curves)
+    return gcode_compiler.compile(passes=passes)
+
+
+def compile_layers(layers, interface_class, movement_speed, cutting_speed, pass_depth, passes=1, layer_options=None,
+                   processes=None, **compiler_options) -> dict:
+    """
+    Compile every layer into its own program, concurrently in a pool of worker processes. Layers with the same name,
+    like a sublayer which shares the name of its parent, are compiled into a single program.
+
+    :param layers: the Layers to compile, as returned by parse_file_layers.
+    :param interface_class: as passed to the Compiler of every layer.
+    :param movement_speed: as passed to the Compiler of every layer.
+    :param cutting_speed: as passed to the Compiler of every layer.
+    :param pass_depth: as passed to the Compiler of every layer.
+    :param passes: as passed to Compiler.compile.
+    :param layer_options: {layer name: {option: value}} overriding any of the arguments of the Compiler, or passes, for
+    some layers, eg. {"cut": {"cutting_speed": 100, "passes": 3}}.
+    :param processes: the number of worker processes. None uses every cpu, 1 compiles the layers one after the other in
+    this process.
+    :param compiler_options: additional keyword arguments for every Compiler, like dwell_time or settings. The
+    tolerances active at the time of the call are used by default.
+    :return: {layer name: program}, in the order of the layers.
+    """
+    layer_options = {} if layer_options is None else layer_options
+
+    curves = {}
+    for layer in layers:
+        curves.setdefault(layer.name, []).extend(layer.curves)
+
+    unknown = set(layer_options) - set(curves)
+    if unknown:
+        raise ValueError(f"layer_options names unknown layers {unknown}. The layers are {list(curves)}")
+
+    tasks = []
+    for name, layer_curves in curves.items():
+        options = dict(compiler_options, interface_class=interface_class, movement_speed=movement_speed,
+                       cutting_speed=cutting_speed, pass_depth=pass_depth, passes=passes)
+        options.update(layer_options.get(name, {}))
+
+        # Workers don't inherit the active tolerances, give them a copy.
+        if options.get("settings") is None:
+            options["settings"] = Settings()
+
+        tasks.append((layer_curves, options))
+
+    processes = (os.cpu_count() or 1) if processes is None else processes
+    processes = min(processes, len(tasks))
+
+    if processes <= 1:
+        programs = [_compile_layer(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            programs = list(executor.map(_compile_layer, *zip(*tasks)))
+
+    return dict(zip(curves, programs))
+
+
+def concatenate_layers(programs: dict, order=None) -> str:
+    """
+    Join the programs of several layers into one, eg. to engrave before cutting.
+
+    :param programs: {layer name: program}, as returned by compile_layers.
+    :param order: the names of the layers to include, in the order they should run. All of them, in the order of
+    programs, by default.
+    :return: the concatenated program.
+    """
+    order = list(programs) if order is None else order
+
+    unknown = [name for name in order if name not in programs]
+    if unknown:
+        raise ValueError(f"order names unknown layers {unknown}. The layers are {list(programs)}")
+
+    return '\n'.join(programs[name] for name in order)
@@ -0,0 +1,103 @@
+import math
+import re
+
+# The basic css colour keywords, and orange. https://www.w3.org/TR/css-color-3/#html4
+NAMED_COLORS = {"black": "#000000", "silver": "#c0c0c0", "gray": "#808080", "grey": "#808080", "white": "#ffffff",
+                "maroon": "#800000", "red": "#ff0000", "purple": "#800080", "fuchsia": "#ff00ff",
+                "magenta": "#ff00ff", "green": "#008000", "lime": "#00ff00", "olive": "#808000", "yellow": "#ffff00",
+                "navy": "#000080", "blue": "#0000ff", "teal": "#008080", "aqua": "#00ffff", "cyan": "#00ffff",
+                "orange": "#ffa500"}
+
+
+def parse_color(color: str) -> tuple:
+    """
+    Parse a css colour, as found in the stroke property of a path.
+
+    :param color: a colour keyword, #rgb, #rrggbb or rgb(r, g, b).
+    :return: an (r, g, b) tuple of integers between 0 and 255.
+    """
+    text = NAMED_COLORS.get(color.strip().lower(), color.strip().lower())
+
+    if re.fullmatch(r"#[0-9a-f]{3}", text):
+        return tuple(int(digit * 2, 16) for digit in text[1:])
+
+    if re.fullmatch(r"#[0-9a-f]{6}", text):
+        return tuple(int(text[i:i + 2], 16) for i in (1, 3, 5))
+
+    match = re.fullmatch(r"rgb\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)", text)
+    if match:
+        return tuple(min(int(channel), 255) for channel in match.groups())
+
+    raise ValueError(f"Unsupported colour {color}. Please specify a colour keyword, #rgb, #rrggbb or rgb(r, g, b)")
+
+
+class Operation:
+    """
+    The Operation class describes the machine parameters of one kind of path, like cutting or scoring, and which paths
+    they apply to. A path matches an operation if its style matches every criterion the operation specifies.
+    """
+
+    __slots__ = "stroke", "stroke_width", "css_class", "cutting_speed", "power", "passes", "tolerance"
+
+    def __init__(self, stroke: str = None, stroke_width: float = None, css_class: str = None, cutting_speed=None,
+                 power=1, passes=1, tolerance=None):
+        """
+        :param stroke: the stroke colour of the paths, eg. "red", "#f00", "#ff0000" or "rgb(255, 0, 0)".
+        :param stroke_width: the stroke width of the paths in user units, within 0.1%.
+        :param css_class: one of the classes of the paths.
+        :param cutting_speed: the speed at which the paths are cut. The compiler's cutting speed by default.
+        :param power: the power of the laser, between 0 and 1.
+        :param passes: how many times the paths are drawn. The machine moves down by the compiler's pass_depth between
+        passes, and back up after the last one.
+        :param tolerance: the approximation tolerance of the paths. TOLERANCES["approximation"] by default.
+        """
+        self.stroke = None if stroke is None else parse_color(stroke)
+        self.stroke_width = stroke_width
+        self.css_class = css_class
+
+        if power < 0 or power > 1:
+            raise ValueError(f"power must be between 0 and 1. Not {power}")
+
+        if passes < 1 or int(passes) != passes:
+            raise ValueError(f"passes must be a positive integer. Not {passes}")
+
+        if tolerance is not None and tolerance <= 0:
+            raise ValueError(f"tolerance must be a positive number. Not {tolerance}")
+
+        self.cutting_speed = cutting_speed
+        self.power = power
+        self.passes = int(passes)
+        self.tolerance = tolerance
+
+    def __repr__(self):
+        return f"Operation(stroke: {self.stroke}, stroke_width: {self.stroke_width}, css_class: {self.css_class}, " \
+               f"cutting_speed: {self.cutting_speed}, power: {self.power}, passes: {self.passes}, " \
+               f"tolerance: {self.tolerance})"
+
+    def matches(self, style: dict) -> bool:
+        """
+        Check if the operation applies to a path.
+
+        :param style: the style of the path, Path.style.
+        """
+        if self.stroke is not None:
+            try:
+                if style.get("stroke") is None or parse_color(style["stroke"]) != self.stroke:
+                    return False
+            except ValueError:  # none, or a gradient
+                return False
+
+        if self.stroke_width is not None:
+            width = style.get("stroke-width")
+            width = width[:-2] if width is not None and width.endswith("px") else width
+
+            try:
+                if width is None or not math.isclose(float(width), self.stroke_width, rel_tol=1e-3):
+                    return False
+            except ValueError:  # Other units
+                return False
+
+        if self.css_class is not None and self.css_class not in style.get("class", "").split():
+            return False
+
+        return True
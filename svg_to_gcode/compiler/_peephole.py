@@ -0,0 +1,166 @@
+import re
+
+from svg_to_gcode import instrumentation
+
+PEEPHOLE_RULES = ("empty_commands", "laser_state", "coordinate_mode", "feed_rate", "zero_length_moves")
+
+_WORD = re.compile(r"([A-Z])([-+]?(?:\d+\.?\d*|\.\d+))?")
+
+# The laser commands of the gcode interfaces, each of which sets the whole state of the laser.
+_LASER_CODES = (3, 5, 106, 107)
+
+
+class _State:
+    """The modal state of the machine, as far as the commands seen so far tell. None where it's unknown."""
+    __slots__ = "absolute", "motion", "position", "feed", "laser"
+
+    def __init__(self):
+        self.forget()
+
+    def forget(self):
+        self.absolute = None
+        self.motion = None
+        self.position = [None, None, None]
+        self.feed = None
+        self.laser = None
+
+
+class PeepholeOptimizer:
+    """
+    The PeepholeOptimizer class removes redundant commands from a gcode program, one command at a time. It follows the
+    modal state of the machine through the commands it understands: the coordinate mode (G90, G91), the motion mode
+    and position (G0, G1), the feed rate and the laser (M3, M5, M106, M107). Commands which don't change that state are
+    removed.
+
+    Any other command, like G92, a subroutine or a comment, makes the optimizer forget the state, such that it never
+    removes a command unless it can prove it's redundant. The optimized program moves the machine exactly like the
+    original one.
+
+    Rules:
+        empty_commands:     counts the commands without any words, which are always removed.
+        laser_state:        laser commands which set the laser to the state it's already in, eg. M5 while it's off.
+        coordinate_mode:    G90 in absolute mode and G91 in relative mode.
+        feed_rate:          F words which repeat the current feed rate. The rest of the command is kept.
+        zero_length_moves:  moves to the current position, which change neither the motion mode nor the feed rate.
+    """
+
+    def __init__(self, rules=PEEPHOLE_RULES):
+        """
+        :param rules: the names of the rules to apply. All of them by default.
+        """
+        unknown = set(rules) - set(PEEPHOLE_RULES)
+        if unknown:
+            raise ValueError(f"Unknown peephole rules {unknown}. Please specify any of the following: {PEEPHOLE_RULES}")
+
+        self.rules = frozenset(rules)
+        self.saved = dict.fromkeys(PEEPHOLE_RULES, 0)
+
+    def optimize(self, commands):
+        """
+        Optimize a stream of commands. self.saved counts how many commands each rule removed or shortened, once the
+        stream is consumed.
+
+        :param commands: an iterable of commands, eg. Compiler.compile_stream().
+        :return: a generator of the optimized commands.
+        """
+        self.saved = dict.fromkeys(PEEPHOLE_RULES, 0)
+        state = _State()
+
+        for command in commands:
+            command = self._optimize_command(command, state)
+            if command is not None:
+                yield command
+
+        if instrumentation.stats is not None:
+            for rule, saved in self.saved.items():
+                instrumentation.stats.count(f"peephole_{rule}", saved)
+
+    def _apply(self, rule) -> bool:
+        """Count a command saved by a rule, if the rule is enabled."""
+        if rule not in self.rules:
+            return False
+
+        self.saved[rule] += 1
+        return True
+
+    def _optimize_command(self, command: str, state: _State):
+        """Return the optimized command, or None to remove it. Updates the state to the one after the command."""
+        code, terminator, comment = command.partition(';')
+
+        # Empty commands are always dropped, like the compiler does without the optimizer. They don't change the state.
+        if not code.strip() and not comment.strip():
+            self._apply("empty_commands")
+            return None
+
+        tokens = code.split()
+        words = [_WORD.fullmatch(token) for token in tokens]
+
+        # Commands with comments are kept intact, and so are any commands which aren't understood.
+        if comment.strip() or None in words or len({word[1] for word in words}) != len(words):
+            state.forget()
+            return command
+
+        words = {word[1]: None if word[2] is None else float(word[2]) for word in words}
+        letters = set(words)
+
+        if "M" in letters:
+            if words["M"] not in _LASER_CODES or not letters <= {"M", "S"}:
+                state.forget()
+                return command
+
+            laser = (words["M"], words.get("S"))
+            if state.laser == laser and self._apply("laser_state"):
+                return None
+
+            state.laser = laser
+            return command
+
+        if "G" in letters and words["G"] in (90, 91) and letters == {"G"}:
+            absolute = words["G"] == 90
+            if state.absolute == absolute and self._apply("coordinate_mode"):
+                return None
+
+            state.absolute = absolute
+            return command
+
+        if "G" in letters and words["G"] == 4 and letters <= {"G", "P", "S"}:
+            return command  # A dwell doesn't change the state
+
+        if not letters or not letters <= {"G", "X", "Y", "Z", "F"} or words.get("G", 0) not in (0, 1):
+            state.forget()
+            return command
+
+        return self._optimize_move(command, tokens, terminator, words, state)
+
+    def _optimize_move(self, command, tokens, terminator, words, state):
+        motion = words.get("G")
+        feed = words.get("F")
+        axes = [(index, words[axis]) for index, axis in enumerate("XYZ") if axis in words]
+
+        # A relative displacement of 0 never moves, even if the position is unknown.
+        position = list(state.position)
+        moves = False
+        for index, value in axes:
+            if state.absolute is None:
+                moves, position[index] = True, None
+            elif state.absolute:
+                moves, position[index] = moves or position[index] != value, value
+            else:
+                moves = moves or value != 0
+                position[index] = None if position[index] is None else position[index] + value
+
+        changes_motion = motion is not None and motion != state.motion
+        changes_feed = feed is not None and feed != state.feed
+
+        state.motion = state.motion if motion is None else motion
+        state.feed = state.feed if feed is None else feed
+        state.position = position
+
+        if not (changes_motion or changes_feed or moves) and \
+                self._apply("feed_rate" if feed is not None and not axes else "zero_length_moves"):
+            return None
+
+        if feed is not None and not changes_feed and self._apply("feed_rate"):
+            return ' '.join(token for token in tokens if token[0] != 'F') + terminator
+
+        return command
@@ -0,0 +1,68 @@
+"""
+Helpers which turn grayscale images into runs of constant laser power, used by Compiler.append_image.
+"""
+
+
+def _bayer_matrix(size: int) -> list:
+    """The size x size Bayer threshold matrix, with thresholds between 0 and 1. Size must be a power of 2."""
+    matrix = [[0]]
+    while len(matrix) < size:
+        n = len(matrix)
+        matrix = [[4 * matrix[row % n][column % n] + (0, 2, 3, 1)[2 * (row >= n) + (column >= n)]
+                   for column in range(2 * n)] for row in range(2 * n)]
+
+    return [[(value + 0.5) / (size * size) for value in row] for row in matrix]
+
+
+BAYER_MATRIX = _bayer_matrix(8)
+
+
+def dither(pixels: list, levels=2) -> list:
+    """
+    Quantize grayscale pixels to a number of power levels with ordered (Bayer) dithering. Unlike error diffusion, every
+    pixel is quantized independently, so each row is processed in a single pass against a precomputed threshold row.
+
+    :param pixels: rows of luminances between 0 (black) and 1 (white), as returned by decode_png.
+    :param levels: the number of power levels, including off. 2 dithers to on and off.
+    :return: rows of power levels between 0 (white, off) and levels - 1 (black, full power).
+    """
+    if levels < 2:
+        raise ValueError(f"levels must be at least 2. Not {levels}")
+
+    steps = levels - 1
+    size = len(BAYER_MATRIX)
+
+    rows = []
+    for index, row in enumerate(pixels):
+        thresholds = BAYER_MATRIX[index % size]
+        thresholds = thresholds * (len(row) // size + 1)
+
+        # Darkness scaled to the number of steps, split into its integer and fractional parts.
+        scaled = [(1 - value) * steps for value in row]
+        rows.append([min(steps, int(value) + (value - int(value) > threshold))
+                     for value, threshold in zip(scaled, thresholds)])
+
+    return rows
+
+
+def run_lengths(row: list) -> list:
+    """
+    Run-length encode a row of power levels, dropping the unpowered runs at either end.
+
+    :return: a list of (first column, column after the last, level) tuples.
+    """
+    runs = []
+    start = 0
+    for column in range(1, len(row) + 1):
+        if column == len(row) or row[column] != row[start]:
+            runs.append((start, column, row[start]))
+            start = column
+
+    while runs and runs[-1][2] == 0:
+        runs.pop()
+
+    first = 0
+    while first < len(runs) and runs[first][2] == 0:
+        first += 1
+
+    return runs[first:]
@@ -0,0 +1,192 @@
+import re
+import warnings
+from collections import deque
+
+_comment_pattern = re.compile(r"\(.*?\)|;.*")
+_number_pattern = re.compile(r"\d+")
+
+
+class Sender:
+    """
+    The Sender class streams gcode to a controller (like grbl or Marlin) over a serial-like byte stream, such as a
+    pyserial Serial instance or a pty.
+
+    Instead of waiting for every line to be acknowledged, the sender uses character-counting flow control: it keeps
+    track of how many characters are sitting in the controller's receive buffer and sends the next line as soon as it
+    fits, such that the planner is never starved by round trips on short segments.
+
+    Optionally, lines are numbered and checksummed (N123 G1 X1*45) and lines which the controller asks to resend
+    (Resend: 123) are sent again.
+    """
+
+    def __init__(self, stream, buffer_size=128, line_numbers=False, history_size=4096):
+        """
+        :param stream: a binary file-like object with write(bytes) and readline() methods. readline() should return
+        b'' on timeout or end of file.
+        :param buffer_size: the size of the controller's receive buffer in bytes. 128 for grbl.
+        :param line_numbers: whether or not to send line numbers and checksums, which enables resend requests.
+        :param history_size: the number of sent lines to remember, in case the controller asks to resend them.
+        """
+        if buffer_size <= 0:
+            raise ValueError(f"buffer_size must be a positive number. Not {buffer_size}")
+
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.line_numbers = line_numbers
+
+        self.lines_sent = 0  # Including resent lines
+        self.resends = 0
+        self.errors = []  # (line, response) tuples, excluding transmission errors which were resolved by a resend
+
+        self._line_number = 0
+        self._history = {}
+        self._history_order = deque(maxlen=history_size)
+
+        self._pending = deque()  # (line_number, line) tuples waiting to be sent
+        self._in_flight = deque()  # [line_number, line, length, stale] lists sent but not yet acknowledged
+        self._buffered = 0  # Characters in the controller's receive buffer
+        self._error_entry = None  # The in-flight entry which caused the last error
+
+        if line_numbers:
+            # Reset the controller's line number, such that the first numbered line is N1.
+            self._pending.append((None, "M110 N0"))
+
+    @staticmethod
+    def clean(line: str) -> str:
+        """Strip comments and surrounding whitespace, the controller doesn't need them."""
+        return _comment_pattern.sub('', line).strip()
+
+    @staticmethod
+    def checksum(data: str) -> int:
+        """The checksum expected by Marlin and RepRap firmware, the xor of all characters."""
+        result = 0
+        for byte in data.encode():
+            result ^= byte
+        return result
+
+    def _format(self, line_number, line: str) -> bytes:
+        if line_number is not None:
+            line = f"N{line_number} {line}"
+            line = f"{line}*{self.checksum(line)}"
+
+        return (line + '\n').encode()
+
+    def _queue(self, line: str):
+        line_number = None
+        if self.line_numbers:
+            self._line_number += 1
+            line_number = self._line_number
+
+            if len(self._history_order) == self._history_order.maxlen:
+                del self._history[self._history_order[0]]
+
+            self._history[line_number] = line
+            self._history_order.append(line_number)
+
+        self._pending.append((line_number, line))
+
+    def _transmit(self):
+        """Send the next pending line if it fits in the controller's buffer. Return whether or not it was sent."""
+        line_number, line = self._pending[0]
+        data = self._format(line_number, line)
+
+        if len(data) > self.buffer_size:
+            raise ValueError(f"'{line}' is longer than the controller's buffer ({self.buffer_size} bytes)")
+
+        if self._buffered + len(data) > self.buffer_size:
+            return False
+
+        self._pending.popleft()
+        self.stream.write(data)
+        self._in_flight.append([line_number, line, len(data), False])
+        self._buffered += len(data)
+        self.lines_sent += 1
+        return True
+
+    def _resend(self, line_number: int):
+        if line_number not in self._history:
+            raise ValueError(f"The controller requested line {line_number}, which is no longer in the history. "
+                             f"Increase history_size.")
+
+        # The error which preceded the request was a transmission error, resolved by resending the line.
+        if self._in_flight and self._error_entry is self._in_flight[0]:
+            self.errors.pop()
+
+        # The controller discards every line after the one it rejected. Their responses are stale.
+        for entry in self._in_flight:
+            entry[3] = True
+
+        self._pending = deque((number, self._history[number]) for number in range(line_number, self._line_number + 1))
+        self.resends += 1
+
+    def _read_response(self):
+        """Read and handle a single response from the controller."""
+        raw = self.stream.readline()
+        if not raw:
+            raise TimeoutError(f"The controller didn't respond. {len(self._in_flight)} lines are unacknowledged.")
+
+        response = raw.decode(errors="replace").strip()
+        lower = response.lower()
+
+        if lower.startswith("ok"):
+            if self._in_flight:
+                self._buffered -= self._in_flight.popleft()[2]
+
+        elif lower.startswith("resend") or lower.startswith("rs "):
+            # The controller rejects every line after a corrupted one, the first request is the one that matters.
+            if self._in_flight and self._in_flight[0][3]:
+                return
+
+            match = _number_pattern.search(response)
+            if not self.line_numbers or match is None:
+                warnings.warn(f"Ignored an unexpected resend request: '{response}'")
+                return
+
+            self._resend(int(match.group()))
+
+        elif lower.startswith("error") or lower.startswith("alarm"):
+            entry = self._in_flight[0] if self._in_flight else None
+
+            if not (entry and entry[3]):
+                self.errors.append((entry[1] if entry else None, response))
+                self._error_entry = entry
+
+            # grbl responds with an error instead of ok. Marlin follows errors with a resend request and ok.
+            if not self.line_numbers and self._in_flight:
+                self._buffered -= self._in_flight.popleft()[2]
+
+    def send(self, commands):
+        """
+        Stream commands to the controller, returning once all of them have been acknowledged.
+
+        :param commands: an iterable of gcode strings, each containing one or more lines. Comments and empty lines are
+        skipped. It's consumed lazily, so generators like Compiler.compile_stream() are never fully held in memory.
+        """
+        for command in commands:
+            for line in command.split('\n'):
+                line = self.clean(line)
+                if not line:
+                    continue
+
+                self._queue(line)
+
+                while self._pending:
+                    if not self._transmit():
+                        self._read_response()
+
+        self.wait()
+
+    def wait(self):
+        """Block until every line that was sent is acknowledged, resending lines on request."""
+        while self._pending or self._in_flight:
+            if not (self._pending and self._transmit()):
+                self._read_response()
+
+    def send_program(self, compiler, passes=1):
+        """
+        Compile and stream a program, without ever assembling it into a string.
+
+        :param compiler: the Compiler, to which curves have already been appended.
+        :param passes: the number of passes, as passed to Compiler.compile.
+        """
+        self.send(compiler.compile_stream(passes=passes))
@@ -1,3 +1,5 @@
 from svg_to_gcode.compiler.interfaces._abstract_interface import Interface
 from svg_to_gcode.compiler.interfaces._gcode import Gcode
 from svg_to_gcode.compiler.interfaces._fan_controlled_gcode import FanControlledGcode
+from svg_to_gcode.compiler.interfaces._compact_gcode import CompactGcode
+from svg_to_gcode.compiler.interfaces._dry_run import DryRun
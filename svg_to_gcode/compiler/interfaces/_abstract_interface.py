@@ -28,6 +28,16 @@ class Interface:
         """
         raise NotImplementedError("Interface class must implement the linear_move command")
 
+    def linear_moves(self, points) -> list:
+        """
+        Moves the tool along a chain of straight lines, one for each point. Equivalent to calling linear_move for every
+        point. Child classes may override it to format the whole chain at once.
+
+        :param points: a sequence of (x, y) tuples.
+        :return: A list of appropriate commands, one for each point.
+        """
+        return [self.linear_move(x, y) for x, y in points]
+
     def laser_off(self) -> str:
         """
         Powers off the laser beam.
@@ -89,6 +99,15 @@ class Interface:
         """
         pass
 
+    def translate_origin(self, x, y) -> str:
+        """
+        Optional method, if implemented translates coordinate space such that the point (x, y) becomes the new origin,
+        without moving the tool. Requires the current position to be known.
+
+        :return: Appropriate command. If not implemented return None.
+        """
+        pass
+
     def set_unit(self, unit):
         """
         Optional method, if implemented Specifies the unit of measurement.
@@ -104,3 +123,57 @@ class Interface:
         :return: Appropriate command. If not implemented return ''.
         """
         pass
+
+    def begin_subroutine(self, number) -> str:
+        """
+        Optional method, if implemented starts the definition of a subroutine. Every command until end_subroutine is
+        part of the subroutine and is only executed when it's called.
+
+        :param number: identifies the subroutine.
+        :return: Appropriate command. If not implemented return None.
+        """
+        pass
+
+    def end_subroutine(self, number) -> str:
+        """
+        Optional method, if implemented ends the definition of a subroutine.
+
+        :return: Appropriate command. If not implemented return None.
+        """
+        pass
+
+    def call_subroutine(self, number) -> str:
+        """
+        Optional method, if implemented executes a subroutine.
+
+        :return: Appropriate command. If not implemented return None.
+        """
+        pass
+
+    def get_state(self):
+        """
+        Optional method, if implemented returns a picklable snapshot of the modal state of the interface, like the
+        position of the tool. Commands are only formatted in parallel by interfaces which implement get_state, set_state
+        and stitch.
+
+        :return: The state. If not implemented raise NotImplementedError.
+        """
+        raise NotImplementedError("Interface class doesn't implement get_state")
+
+    def set_state(self, state):
+        """
+        Optional method, if implemented restores a snapshot returned by get_state.
+        """
+        raise NotImplementedError("Interface class doesn't implement set_state")
+
+    def stitch(self, commands: list, predicted, state):
+        """
+        Optional method, if implemented patches commands which were formatted from a predicted state, eg. by a worker
+        process, such that they are identical to the commands which would have been formatted from the actual state.
+
+        :param commands: the commands formatted after set_state(predicted).
+        :param predicted: the state the commands were formatted from.
+        :param state: the actual state, from which the commands are executed.
+        :return: The patched commands, or None if they can't be patched and must be formatted again.
+        """
+        raise NotImplementedError("Interface class doesn't implement stitch")
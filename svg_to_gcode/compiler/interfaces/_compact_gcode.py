@@ -0,0 +1,240 @@
+import math
+import warnings
+
+from svg_to_gcode import formulas
+from svg_to_gcode.compiler.interfaces import Gcode
+from svg_to_gcode.geometry import Vector
+from svg_to_gcode import TOLERANCES
+
+verbose = False
+
+
+class CompactGcode(Gcode):
+    """
+    The CompactGcode interface emits the same operations as the Gcode interface using as few bytes as possible. Useful
+    for serial-streamed machines, where the number of bytes per line limits the number of segments per second.
+
+    The interface keeps track of the modal state of the machine. Axis words which don't change the position are
+    dropped, numbers are written without trailing zeros and with no more decimals than the machine can resolve. Lines
+    are not terminated with ';'.
+    """
+
+    def __init__(self, resolution=None, relative_moves=False, modal_motion=False):
+        """
+        :param resolution: the smallest distance the machine can resolve (eg. the length of a motor step). Coordinates
+        are rounded to the smallest number of decimals which represents it. Defaults to TOLERANCES["operation"].
+        :param relative_moves: whether or not to switch to relative coordinates (G91) whenever a move is shorter to
+        express as a displacement, including the cost of switching modes.
+        :param modal_motion: whether or not to omit G1 when the machine is already in linear motion mode. Supported by
+        grbl and LinuxCNC, but not by Marlin.
+        """
+        super().__init__()
+
+        resolution = TOLERANCES["operation"] if resolution is None else resolution
+
+        if resolution <= 0:
+            raise ValueError(f"resolution must be a positive number. Not {resolution}")
+
+        # The smallest number of decimals d such that 10^-d <= resolution.
+        self.precision = max(0, math.ceil(round(-math.log(resolution, 10), 9)))
+        self.relative_moves = relative_moves
+        self.modal_motion = modal_motion
+
+        self._scale = 10 ** self.precision
+
+        # The state of the machine, as opposed to the state requested by the compiler. Coordinates are stored as
+        # integer multiples of 10^-precision, such that relative moves never accumulate rounding errors.
+        self._machine_position = [None, None, None]
+        self._machine_absolute = None
+        self._motion_mode = None
+
+        self._absolute = True
+
+    def _quantize(self, value):
+        return round(value * self._scale)
+
+    def _format(self, quantized):
+        """Write a quantized value as a decimal number without trailing zeros."""
+        if self.precision == 0:
+            return str(quantized)
+
+        sign = '-' if quantized < 0 else ''
+        integer, fraction = divmod(abs(quantized), self._scale)
+        fraction = f"{fraction:0{self.precision}d}".rstrip('0')
+
+        return f"{sign}{integer}.{fraction}" if fraction else f"{sign}{integer}"
+
+    def _absolute_words(self, target):
+        """The axis words required to reach target in absolute coordinates."""
+        words = ''
+        for axis, value, current in zip("XYZ", target, self._machine_position):
+            if value is not None and value != current:
+                words += f" {axis}{self._format(value)}"
+
+        return words
+
+    def _relative_words(self, target):
+        """The axis words required to reach target in relative coordinates, or None if the position is unknown."""
+        words = ''
+        for axis, value, current in zip("XYZ", target, self._machine_position):
+            if value is None:
+                continue
+
+            if current is None:
+                return None
+
+            if value != current:
+                words += f" {axis}{self._format(value - current)}"
+
+        return words
+
+    def _switch_mode(self, absolute):
+        """Return the command which puts the machine in the given coordinate mode, if it isn't already."""
+        if self._machine_absolute == absolute:
+            return ''
+
+        self._machine_absolute = absolute
+        return "G90" if absolute else "G91"
+
+    def linear_move(self, x=None, y=None, z=None):
+
+        if self._next_speed is None:
+            raise ValueError("Undefined movement speed. Call set_movement_speed before executing movement commands.")
+
+        # Don't do anything if linear move was called without passing a value.
+        if x is None and y is None and z is None:
+            warnings.warn("linear_move command invoked without arguments.")
+            return ''
+
+        requested = [None if value is None else self._quantize(value) for value in (x, y, z)]
+
+        if self._absolute:
+            target = requested
+            words = self._absolute_words(target)
+            use_relative = False
+
+            # Select the shortest representation, including the cost of switching coordinate modes.
+            relative_words = self._relative_words(target) if self.relative_moves else None
+            if relative_words is not None:
+                absolute_cost = len(words) + (4 if self._machine_absolute is False else 0)
+                relative_cost = len(relative_words) + (4 if self._machine_absolute is not False else 0)
+
+                if relative_cost < absolute_cost:
+                    words = relative_words
+                    use_relative = True
+
+            # The position is unknown, which happens at the beginning of every pass. Since passes are repeated, the
+            # coordinate mode could have been left relative by the end of the previous pass.
+            elif self.relative_moves:
+                self._machine_absolute = None
+
+        else:
+            target = [None if delta is None or current is None else current + delta
+                      for delta, current in zip(requested, self._machine_position)]
+            words = ''.join(f" {axis}{self._format(delta)}" for axis, delta in zip("XYZ", requested) if delta)
+            use_relative = True
+
+        for axis in range(3):
+            if requested[axis] is not None:
+                self._machine_position[axis] = target[axis]
+
+        self._update_position(x, y)
+
+        if verbose:
+            print(f"Move to {x}, {y}, {z}")
+
+        # The move doesn't change the position of the machine. Any change in speed is deferred to the next move.
+        if not words:
+            return ''
+
+        mode_command = self._switch_mode(not use_relative)
+
+        command = '' if self.modal_motion and self._motion_mode == "G1" else "G1"
+        self._motion_mode = "G1"
+
+        if self._current_speed != self._next_speed:
+            self._current_speed = self._next_speed
+            command += f" F{self._format(self._quantize(self._current_speed))}"
+
+        command = (command + words).strip()
+
+        return f"{mode_command}\n{command}" if mode_command else command
+
+    def _update_position(self, x, y):
+        """Track self.position in the same way as the Gcode interface."""
+        if not self._absolute:
+            if self.position is not None:
+                self.position = Vector(self.position.x + (x or 0), self.position.y + (y or 0))
+            return
+
+        if self.position is not None or (x is not None and y is not None):
+            if x is None:
+                x = self.position.x
+
+            if y is None:
+                y = self.position.y
+
+            self.position = Vector(x, y)
+
+    def get_state(self):
+        # The machine position, the coordinate mode and the motion mode are modal too. Format commands serially.
+        raise NotImplementedError("CompactGcode doesn't implement get_state")
+
+    def laser_off(self):
+        return "M5"
+
+    def set_laser_power(self, power):
+        if power < 0 or power > 1:
+            raise ValueError(f"{power} is out of bounds. Laser power must be given between 0 and 1. "
+                             f"The interface will scale it correctly.")
+
+        return f"M3 S{self._format(self._quantize(formulas.linear_map(0, 255, power)))}"
+
+    def set_absolute_coordinates(self):
+        self._absolute = True
+        return self._switch_mode(True)
+
+    def set_relative_coordinates(self):
+        self._absolute = False
+        return self._switch_mode(False)
+
+    def dwell(self, milliseconds):
+        return f"G4 P{milliseconds}"
+
+    def set_origin_at_position(self):
+        self.position = Vector(0, 0)
+        self._machine_position = [0, 0, 0]
+        return "G92 X0 Y0 Z0"
+
+    def translate_origin(self, x, y):
+        if self.position is None or None in self._machine_position[:2]:
+            raise ValueError("Unknown position. Move the tool before translating the origin.")
+
+        for axis, value in enumerate((x, y)):
+            self._machine_position[axis] -= self._quantize(value)
+
+        self.position = Vector(self._machine_position[0] / self._scale, self._machine_position[1] / self._scale)
+        return f"G92 X{self._format(self._machine_position[0])} Y{self._format(self._machine_position[1])}"
+
+    def set_unit(self, unit):
+        if unit == "mm":
+            return "G21"
+
+        if unit == "in":
+            return "G20"
+
+        return ''
+
+    def home_axes(self):
+        self._machine_position = [None, None, None]
+        self._motion_mode = None
+        return "G28"
+
+    def begin_subroutine(self, number):
+        return f"o{number} sub"
+
+    def end_subroutine(self, number):
+        return f"o{number} endsub"
+
+    def call_subroutine(self, number):
+        return f"o{number} call"
@@ -0,0 +1,72 @@
+from svg_to_gcode.compiler.interfaces import Interface
+from svg_to_gcode.geometry import Vector
+
+
+class DryRun(Interface):
+    """
+    The DryRun interface doesn't generate any code. Each command is recorded as a tuple in self.events and represented
+    by a short token referencing it, such that the output of Compiler.compile_stream() can be replayed without ever
+    formatting a number. Use it with estimate_job() to collect job statistics before compiling the real program.
+    """
+
+    def __init__(self):
+        self.position = None
+        self.events = []
+
+        self._next_speed = None
+        self._absolute = True
+
+    def _record(self, *event) -> str:
+        self.events.append(event)
+        return f"#{len(self.events) - 1}"
+
+    def event(self, token: str):
+        """Return the event represented by a token, or None if the token wasn't generated by this interface."""
+        if not token.startswith('#'):
+            return None
+
+        return self.events[int(token[1:])]
+
+    def set_movement_speed(self, speed):
+        self._next_speed = speed
+        return self._record("speed", speed)
+
+    def linear_move(self, x=None, y=None, z=None):
+        if self._next_speed is None:
+            raise ValueError("Undefined movement speed. Call set_movement_speed before executing movement commands.")
+
+        if self._absolute and (self.position is not None or (x is not None and y is not None)):
+            self.position = Vector(self.position.x if x is None else x, self.position.y if y is None else y)
+
+        return self._record("move", x, y, z)
+
+    def laser_off(self):
+        return self._record("laser_off")
+
+    def set_laser_power(self, power):
+        if power < 0 or power > 1:
+            raise ValueError(f"{power} is out of bounds. Laser power must be given between 0 and 1. "
+                             f"The interface will scale it correctly.")
+
+        return self._record("laser_power", power)
+
+    def set_absolute_coordinates(self):
+        self._absolute = True
+        return self._record("absolute")
+
+    def set_relative_coordinates(self):
+        self._absolute = False
+        return self._record("relative")
+
+    def dwell(self, milliseconds):
+        return self._record("dwell", milliseconds)
+
+    def set_origin_at_position(self):
+        self.position = Vector(0, 0)
+        return self._record("origin")
+
+    def set_unit(self, unit):
+        return self._record("unit", unit)
+
+    def home_axes(self):
+        return self._record("home")
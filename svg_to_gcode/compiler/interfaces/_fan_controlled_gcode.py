@@ -4,6 +4,10 @@ from svg_to_gcode import formulas
 
 class FanControlledGcode(Gcode):
 
+    def get_state(self):
+        # laser_off depends on the power of the fan, format commands serially.
+        raise NotImplementedError("FanControlledGcode doesn't implement get_state")
+
     def laser_off(self):
         if self._current_power is None or self._current_power > 0:
             self._current_power = 0
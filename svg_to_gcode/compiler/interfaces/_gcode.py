@@ -59,6 +59,58 @@ class Gcode(Interface):
 
         return command + ';'
 
+    def linear_moves(self, points):
+        # Child classes which customise linear_move must go through it for every point.
+        if type(self).linear_move is not Gcode.linear_move or verbose:
+            return super().linear_moves(points)
+
+        if not points:
+            return []
+
+        if self._next_speed is None:
+            raise ValueError("Undefined movement speed. Call set_movement_speed before executing movement commands.")
+
+        # Format every point with the same template, without building a Vector for each of them.
+        template = f"G1 X%.{self.precision}f Y%.{self.precision}f;"
+        commands = [template % (x, y) for x, y in points]
+
+        if self._current_speed != self._next_speed:
+            self._current_speed = self._next_speed
+            commands[0] = f"G1 F{self._current_speed}" + commands[0][2:]
+
+        self.position = Vector(*points[-1])
+
+        return commands
+
+    def get_state(self):
+        position = None if self.position is None else (self.position.x, self.position.y)
+        return position, self._next_speed, self._current_speed
+
+    def set_state(self, state):
+        position, self._next_speed, self._current_speed = state
+        self.position = None if position is None else Vector(*position)
+
+    def stitch(self, commands, predicted, state):
+        if predicted[:2] != state[:2]:
+            return None
+
+        # Only the current speed differs. It decides whether the first move sets the feed rate, after which the
+        # current speed is the same.
+        for index, command in enumerate(commands):
+            if command.startswith("G1"):
+                words = command.split(' ')
+                has_feed = words[1].startswith('F')
+                speed = float(words[1][1:]) if has_feed else predicted[2]
+
+                if has_feed and speed == state[2]:
+                    commands[index] = ' '.join(words[:1] + words[2:])
+                elif not has_feed and speed != state[2]:
+                    commands[index] = ' '.join(words[:1] + [f"F{predicted[2]}"] + words[1:])
+
+                break
+
+        return commands
+
     def laser_off(self):
         return f"M5;"
 
@@ -82,6 +134,14 @@ class Gcode(Interface):
         self.position = Vector(0, 0)
         return "G92 X0 Y0 Z0;"
 
+    def translate_origin(self, x, y):
+        if self.position is None:
+            raise ValueError("Unknown position. Move the tool before translating the origin.")
+
+        # Relative to the position the machine actually reached, which was rounded to self.precision.
+        self.position = Vector(round(self.position.x, self.precision) - x, round(self.position.y, self.precision) - y)
+        return f"G92 X{self.position.x:.{self.precision}f} Y{self.position.y:.{self.precision}f};"
+
     def set_unit(self, unit):
         if unit == "mm":
             return "G21;"
@@ -93,3 +153,12 @@ class Gcode(Interface):
 
     def home_axes(self):
         return "G28;"
+
+    def begin_subroutine(self, number):
+        return f"o{number} sub;"
+
+    def end_subroutine(self, number):
+        return f"o{number} endsub;"
+
+    def call_subroutine(self, number):
+        return f"o{number} call;"
@@ -63,6 +63,12 @@ def tangent_arc_center(c, p, g):
             ) / (g * (-p_c + c_c) + c * (p_c - g_c) + (-c_c + g_c) * p)
 
 
+def bounding_box(points):
+    """Return the axis-aligned bounding box (min_x, min_y, max_x, max_y) of an iterable of points"""
+    xs, ys = zip(*((point.x, point.y) for point in points))
+    return min(xs), min(ys), max(xs), max(ys)
+
+
 def linear_map(min, max, t):
     """Linear map from t∈[0, 1] --> t'∈[min, max]"""
     return (max - min) * t + min
@@ -18,6 +18,21 @@ from svg_to_gcode.geometry._elliptical_arc import EllipticalArc
 from svg_to_gcode.geometry._quadratic_bazier import QuadraticBezier
 from svg_to_gcode.geometry._cubic_bazier import CubicBazier
 
+from svg_to_gcode.geometry._backend import set_backend, get_backend, BACKENDS, evaluate_points, transform_points, \
+    flatten_curve
+
+from svg_to_gcode.geometry._flattening_cache import FlatteningCache, FLATTENING_CACHE
+
 from svg_to_gcode.geometry._abstract_chain import Chain
 from svg_to_gcode.geometry._line_segment_chain import LineSegmentChain
 from svg_to_gcode.geometry._smooth_arc_chain import SmoothArcChain
+
+from svg_to_gcode.geometry._clipping import liang_barsky, clip_line_chain, BoundingBoxIndex, boxes_overlap, \
+    box_contains
+
+from svg_to_gcode.geometry._hatch import hatch_fill, FILL_RULES
+from svg_to_gcode.geometry._segment_index import SegmentIndex
+from svg_to_gcode.geometry._stroke_merging import merge_strokes
+from svg_to_gcode.geometry._cut_ordering import order_cuts, containment_tree, join_chains, is_closed, \
+    point_in_polygon
+from svg_to_gcode.geometry._quantization import quantize_line_chain
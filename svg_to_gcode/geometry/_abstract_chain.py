@@ -100,5 +100,10 @@ class Chain(Curve):
         curve, curve_t = self._get_curve_t(t)
         return curve.derivative(curve_t)
 
+    def bounding_box(self):
+        boxes = [curve.bounding_box() for curve in self._curves]
+        return (min(box[0] for box in boxes), min(box[1] for box in boxes), max(box[2] for box in boxes),
+                max(box[3] for box in boxes))
+
     def sanity_check(self):
         pass
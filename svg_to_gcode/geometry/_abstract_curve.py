@@ -14,7 +14,7 @@ class Curve:
     :type self.end: Vector
     """
 
-    __slots__ = 'start', 'end'
+    __slots__ = 'start', 'end', '__weakref__'
 
     def point(self, t: float) -> Vector:
         """
@@ -35,6 +35,15 @@ class Curve:
         """
         raise NotImplementedError("derivative(self, t) must be implemented")
 
+    def bounding_box(self) -> tuple:
+        """
+        The bounding_box method returns an axis-aligned box which contains the whole curve. It doesn't have to be tight,
+        but it must never be smaller than the curve.
+
+        :return: (min_x, min_y, max_x, max_y)
+        """
+        raise NotImplementedError("bounding_box(self) must be implemented")
+
     def sanity_check(self):
         """Verify if that the curve is valid."""
         raise NotImplementedError("sanity_check(self) must be implemented")
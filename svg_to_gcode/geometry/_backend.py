@@ -0,0 +1,215 @@
+import math
+import os
+import warnings
+
+from svg_to_gcode.geometry import Line, CircularArc, EllipticalArc, QuadraticBezier, CubicBazier
+from svg_to_gcode import TOLERANCES
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKENDS = ("python", "numpy")
+
+
+def set_backend(name: str):
+    """
+    Select the implementation of the batch operations of this module. Both backends return the same points, up to
+    floating point rounding, numpy only computes them faster.
+
+    :param name: "python", which is always available, or "numpy", which requires numpy to be installed.
+    """
+    global _backend
+
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name}. Please specify one of the following: {BACKENDS}")
+
+    if name == "numpy" and numpy is None:
+        raise ImportError("The numpy backend requires numpy. Install it with pip install numpy")
+
+    _backend = name
+
+
+def get_backend() -> str:
+    """Return the name of the selected backend."""
+    return _backend
+
+
+def _default_backend() -> str:
+    """The backend named by the SVG_TO_GCODE_BACKEND environment variable, or numpy if it's installed."""
+    name = os.environ.get("SVG_TO_GCODE_BACKEND")
+    fallback = "python" if numpy is None else "numpy"
+
+    if name is None:
+        return fallback
+
+    if name not in BACKENDS:
+        warnings.warn(f"Unknown backend {name} in SVG_TO_GCODE_BACKEND. Please specify one of the following: "
+                      f"{BACKENDS}. Using the {fallback} backend.")
+        return fallback
+
+    if name == "numpy" and numpy is None:
+        warnings.warn("SVG_TO_GCODE_BACKEND selects numpy, which isn't installed. Using the python backend.")
+        return fallback
+
+    return name
+
+
+_backend = _default_backend()
+
+
+def evaluate_points(curve, ts) -> list:
+    """
+    Evaluate curve.point(t) for many values of t at once.
+
+    Lines are interpolated along both axes, rather than through their slope, such that vertical lines are evaluated
+    correctly. Curves of other types are evaluated one point at a time by either backend.
+
+    :param curve: the curve to evaluate.
+    :param ts: a sequence of t values in [0, 1].
+    :return: a list of (x, y) tuples, one for each t.
+    """
+    if _backend == "numpy":
+        return _numpy_evaluate(curve, ts)
+
+    return _python_evaluate(curve, ts)
+
+
+def transform_points(transformation, points) -> list:
+    """
+    Apply the affine transformation of an svg_parser.Transformation to many points at once, like
+    transformation.apply_affine_transformation() does to a single Vector.
+
+    :param transformation: the svg_parser.Transformation to apply.
+    :param points: a sequence of (x, y) tuples.
+    :return: a list of transformed (x, y) tuples.
+    """
+    if _backend == "numpy":
+        xs, ys = _numpy_transform(transformation, *numpy.asarray(points, dtype=float).reshape(-1, 2).T)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    return _python_transform(transformation, points)
+
+
+def flatten_curve(curve, tolerance=None):
+    """
+    Approximate a curve with line segments of equal steps of t. The number of steps is derived from a bound on the
+    curve's second derivative, such that no point of a segment strays further than tolerance from the point of the curve
+    with the same t. Unlike LineSegmentChain.line_segment_approximation(), which measures the error of every segment as
+    it grows it, every point is evaluated in a single batch, at the cost of more segments on unevenly curved shapes.
+
+    :param curve: the curve to approximate.
+    :param tolerance: the maximum acceptable deviation from the curve. TOLERANCES["approximation"] by default.
+    :return: a list of (x, y) tuples, from curve.start to the end of the curve. None for types of curves whose
+    derivatives aren't known, which must be approximated adaptively instead.
+    """
+    tolerance = TOLERANCES["approximation"] if tolerance is None else tolerance
+
+    if tolerance <= 0:
+        raise ValueError(f"tolerance must be a non-zero positive float. Not {tolerance}")
+
+    segments = _segment_count(curve, tolerance)
+    if segments is None:
+        return None
+
+    return [(curve.start.x, curve.start.y)] + evaluate_points(curve, [i / segments for i in range(1, segments + 1)])
+
+
+def _segment_count(curve, tolerance):
+    """
+    The number of equal steps of t which keep the chords of a curve within tolerance of it. Interpolating a curve p(t)
+    linearly over a step h errs by at most h^2 / 8 * max|p''(t)|.
+    """
+    if isinstance(curve, Line):
+        return 1
+
+    if isinstance(curve, QuadraticBezier):
+        # p'' = 2 * (start - 2 * control + end)
+        second_difference = abs(curve.start - 2 * curve.control + curve.end)
+        return max(1, math.ceil(math.sqrt(second_difference / (4 * tolerance))))
+
+    if isinstance(curve, CubicBazier):
+        # |p''| <= 6 * the largest second difference of the control polygon
+        second_difference = max(abs(curve.start - 2 * curve.control1 + curve.control2),
+                                abs(curve.control1 - 2 * curve.control2 + curve.end))
+        return max(1, math.ceil(math.sqrt(0.75 * second_difference / tolerance)))
+
+    if isinstance(curve, CircularArc):
+        # |p''| = radius * sweep^2
+        sweep = abs(curve.end_angle - curve.start_angle)
+        return max(1, math.ceil(sweep * math.sqrt(curve.radius / (8 * tolerance))))
+
+    if isinstance(curve, EllipticalArc):
+        # |p''| <= largest radius * sweep^2 * the norm of the transformation. The frobenius norm bounds the latter.
+        radius = max(abs(curve.radii.x), abs(curve.radii.y))
+        if curve.transformation:
+            matrix = curve.transformation.translation_matrix
+            radius *= math.sqrt(matrix[0][0] ** 2 + matrix[0][1] ** 2 + matrix[1][0] ** 2 + matrix[1][1] ** 2)
+
+        return max(1, math.ceil(abs(curve.sweep_angle) * math.sqrt(radius / (8 * tolerance))))
+
+    return None
+
+
+def _python_evaluate(curve, ts) -> list:
+    if isinstance(curve, Line):
+        start, end = curve.start, curve.end
+        return [(start.x + t * (end.x - start.x), start.y + t * (end.y - start.y)) for t in ts]
+
+    return [(point.x, point.y) for point in map(curve.point, ts)]
+
+
+def _python_transform(transformation, points) -> list:
+    # The same sums, in the same order and starting from 0 like sum() does, as the product of translation_matrix and
+    # the 4d vector (x, y, 1, 1). The points are identical to apply_affine_transformation()'s, down to the sign of 0.
+    matrix = transformation.translation_matrix
+    return [(0 + matrix[0][0] * x + matrix[0][1] * y + matrix[0][2] + matrix[0][3],
+             0 + matrix[1][0] * x + matrix[1][1] * y + matrix[1][2] + matrix[1][3]) for x, y in points]
+
+
+def _numpy_transform(transformation, xs, ys):
+    matrix = transformation.translation_matrix
+    return (matrix[0][0] * xs + matrix[0][1] * ys + matrix[0][2] + matrix[0][3],
+            matrix[1][0] * xs + matrix[1][1] * ys + matrix[1][2] + matrix[1][3])
+
+
+def _numpy_evaluate(curve, ts) -> list:
+    t = numpy.asarray(ts, dtype=float)
+    start, end = curve.start, curve.end
+
+    if isinstance(curve, Line):
+        xs = start.x + t * (end.x - start.x)
+        ys = start.y + t * (end.y - start.y)
+
+    elif isinstance(curve, QuadraticBezier):
+        control = curve.control
+        xs = control.x + (1 - t) ** 2 * (start.x - control.x) + t ** 2 * (end.x - control.x)
+        ys = control.y + (1 - t) ** 2 * (start.y - control.y) + t ** 2 * (end.y - control.y)
+
+    elif isinstance(curve, CubicBazier):
+        control1, control2 = curve.control1, curve.control2
+        a, b, c, d = (1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t ** 2, t ** 3
+        xs = a * start.x + b * control1.x + c * control2.x + d * end.x
+        ys = a * start.y + b * control1.y + c * control2.y + d * end.y
+
+    elif isinstance(curve, CircularArc):
+        angles = (curve.end_angle - curve.start_angle) * t + curve.start_angle
+        xs = curve.radius * numpy.cos(angles) + curve.center.x
+        ys = curve.radius * numpy.sin(angles) + curve.center.y
+
+    elif isinstance(curve, EllipticalArc):
+        angles = (curve.end_angle - curve.start_angle) * t + curve.start_angle
+        cos, sin = math.cos(curve.rotation), math.sin(curve.rotation)
+        radial_xs, radial_ys = curve.radii.x * numpy.cos(angles), curve.radii.y * numpy.sin(angles)
+
+        xs = cos * radial_xs - sin * radial_ys + curve.center.x
+        ys = sin * radial_xs + cos * radial_ys + curve.center.y
+
+        if curve.transformation:
+            xs, ys = _numpy_transform(curve.transformation, xs, ys)
+
+    else:
+        return _python_evaluate(curve, ts)
+
+    return list(zip(xs.tolist(), ys.tolist()))
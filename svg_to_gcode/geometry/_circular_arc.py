@@ -40,6 +40,10 @@ class CircularArc(Curve):
         angle = formulas.linear_map(self.start_angle, self.end_angle, t)
         return self.angle_to_point(angle)
 
+    def bounding_box(self):
+        return (self.center.x - self.radius, self.center.y - self.radius, self.center.x + self.radius,
+                self.center.y + self.radius)
+
     def derivative(self, t):
         position = self.point(t)
         return (self.center.x - position.x) / (position.y - self.center.y)
@@ -0,0 +1,180 @@
+import math
+
+from svg_to_gcode.geometry import Line, LineSegmentChain
+from svg_to_gcode import TOLERANCES
+
+
+def boxes_overlap(box1: tuple, box2: tuple) -> bool:
+    """Check if two (min_x, min_y, max_x, max_y) boxes overlap, touching boxes overlap."""
+    return box1[0] <= box2[2] and box2[0] <= box1[2] and box1[1] <= box2[3] and box2[1] <= box1[3]
+
+
+def box_contains(outer: tuple, inner: tuple) -> bool:
+    """Check if the (min_x, min_y, max_x, max_y) box outer contains the box inner."""
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2] and inner[3] <= outer[3]
+
+
+def liang_barsky(line: Line, window: tuple):
+    """
+    Clip a line segment against a rectangular window with the Liang–Barsky algorithm.
+
+    :param line: the line segment to clip.
+    :param window: (min_x, min_y, max_x, max_y)
+    :return: (t0, t1), the range of t for which line.point(t) is inside the window. None if no part of it is.
+    """
+    start, end = line.start, line.end
+    dx, dy = end.x - start.x, end.y - start.y
+
+    t0, t1 = 0, 1
+    for p, q in ((-dx, start.x - window[0]), (dx, window[2] - start.x),
+                 (-dy, start.y - window[1]), (dy, window[3] - start.y)):
+        if p == 0:
+            if q < 0:  # Parallel to this edge and outside of it
+                return None
+            continue
+
+        r = q / p
+        if p < 0:
+            t0 = max(t0, r)
+        else:
+            t1 = min(t1, r)
+
+        if t0 > t1:
+            return None
+
+    return t0, t1
+
+
+def clip_line_chain(line_chain: LineSegmentChain, window: tuple) -> list:
+    """
+    Clip a LineSegmentChain against a rectangular window.
+
+    :param line_chain: the chain to clip.
+    :param window: (min_x, min_y, max_x, max_y)
+    :return: a list of LineSegmentChains, one for each part of the chain which lies inside the window. Parts shorter
+    than the operational tolerance are dropped.
+    """
+    pieces = []
+    piece = LineSegmentChain()
+
+    for line in line_chain:
+        clipped = liang_barsky(line, window)
+
+        if clipped is None:
+            if piece.chain_size():
+                pieces.append(piece)
+                piece = LineSegmentChain()
+            continue
+
+        t0, t1 = clipped
+
+        # The line enters the window, it's the beginning of a new piece.
+        if t0 > 0 and piece.chain_size():
+            pieces.append(piece)
+            piece = LineSegmentChain()
+
+        # Interpolate directly, Line.point goes through the slope and loses precision on near vertical lines.
+        direction = line.end - line.start
+        start = line.start if t0 == 0 else line.start + direction * t0
+        end = line.end if t1 == 1 else line.start + direction * t1
+
+        if abs(end - start) > TOLERANCES["operation"]:
+            piece.append(line if t0 == 0 and t1 == 1 else Line(start, end))
+
+        # The line leaves the window
+        if t1 < 1 and piece.chain_size():
+            pieces.append(piece)
+            piece = LineSegmentChain()
+
+    if piece.chain_size():
+        pieces.append(piece)
+
+    return pieces
+
+
+class BoundingBoxIndex:
+    """
+    The BoundingBoxIndex class is a uniform grid of the bounding boxes of a list of curves. It finds the curves which
+    overlap a window by only testing the curves in the grid cells the window overlaps.
+
+    Curves which don't implement bounding_box() can't be indexed, they are returned by every query.
+    """
+
+    # Boxes which would be inserted into more cells are stored in a separate list, which every query has to test.
+    max_cells_per_box = 16
+
+    def __init__(self, curves):
+        """
+        :param curves: the curves to index.
+        """
+        self.curves = list(curves)
+        self.boxes = []
+
+        self._unbounded = []  # Indices of curves without a bounding box
+        self._large = []  # Indices of curves with a bounding box which spans too many cells
+        self._cells = {}
+
+        for index, curve in enumerate(self.curves):
+            try:
+                self.boxes.append(curve.bounding_box())
+            except NotImplementedError:
+                self.boxes.append(None)
+                self._unbounded.append(index)
+
+        boxes = [box for box in self.boxes if box is not None]
+        if not boxes:
+            return
+
+        self._origin = (min(box[0] for box in boxes), min(box[1] for box in boxes))
+        width = max(box[2] for box in boxes) - self._origin[0]
+        height = max(box[3] for box in boxes) - self._origin[1]
+
+        # Roughly one box per cell
+        side = max(1, int(math.sqrt(len(boxes))))
+        self._cell_size = (width / side or 1, height / side or 1)
+
+        for index, box in enumerate(self.boxes):
+            if box is None:
+                continue
+
+            columns, rows = self._cell_range(box)
+            if len(columns) * len(rows) > self.max_cells_per_box:
+                self._large.append(index)
+                continue
+
+            for column in columns:
+                for row in rows:
+                    self._cells.setdefault((column, row), []).append(index)
+
+    def _cell_range(self, box):
+        return (range(math.floor((box[0] - self._origin[0]) / self._cell_size[0]),
+                      math.floor((box[2] - self._origin[0]) / self._cell_size[0]) + 1),
+                range(math.floor((box[1] - self._origin[1]) / self._cell_size[1]),
+                      math.floor((box[3] - self._origin[1]) / self._cell_size[1]) + 1))
+
+    def query(self, window: tuple) -> list:
+        """
+        Find the curves which may overlap a window.
+
+        :param window: (min_x, min_y, max_x, max_y)
+        :return: a list of (curve, bounding box) tuples in the order the curves were indexed. The bounding box is None
+        for curves which don't implement bounding_box().
+        """
+        candidates = set(self._unbounded)
+
+        if self._cells or self._large:
+            candidates.update(index for index in self._large if boxes_overlap(self.boxes[index], window))
+
+            columns, rows = self._cell_range(window)
+
+            # Don't iterate over empty cells if the window is much larger than the indexed curves.
+            if len(columns) * len(rows) > len(self._cells):
+                cells = (cell for cell in self._cells.items() if cell[0][0] in columns and cell[0][1] in rows)
+            else:
+                cells = ((cell, self._cells.get(cell, ())) for cell in
+                         ((column, row) for column in columns for row in rows))
+
+            for _, indices in cells:
+                candidates.update(index for index in indices if boxes_overlap(self.boxes[index], window))
+
+        return [(self.curves[index], self.boxes[index]) for index in sorted(candidates)]
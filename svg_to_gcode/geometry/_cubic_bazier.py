@@ -1,5 +1,6 @@
 from svg_to_gcode.geometry import Vector
 from svg_to_gcode.geometry import Curve
+from svg_to_gcode import formulas
 
 
 class CubicBazier(Curve):
@@ -23,6 +24,10 @@ class CubicBazier(Curve):
                3 * (1-t) * t**2 * self.control2 +\
                t**3 * self.end
 
+    def bounding_box(self):
+        # A bezier curve is contained in the convex hull of its control points.
+        return formulas.bounding_box((self.start, self.control1, self.control2, self.end))
+
     def derivative(self, t):
         return 3 * (1-t)**2 * (self.control1 - self.start) +\
                6 * (1-t) * t * (self.control2 - self.control1) +\
@@ -0,0 +1,231 @@
+import math
+
+from svg_to_gcode.geometry import Vector, LineSegmentChain
+from svg_to_gcode.geometry._clipping import BoundingBoxIndex, box_contains
+from svg_to_gcode import TOLERANCES
+
+
+def is_closed(line_chain: LineSegmentChain) -> bool:
+    """Check if a chain ends where it starts, within the input tolerance."""
+    return abs(line_chain.get(-1).end - line_chain.get(0).start) <= TOLERANCES["input"]
+
+
+def point_in_polygon(point: Vector, line_chain: LineSegmentChain) -> bool:
+    """Check if a point lies inside a closed chain, by counting the edges a horizontal ray from the point crosses."""
+    inside = False
+    for line in line_chain:
+        start, end = line.start, line.end
+        if (start.y > point.y) != (end.y > point.y):
+            if point.x < start.x + (point.y - start.y) * (end.x - start.x) / (end.y - start.y):
+                inside = not inside
+
+    return inside
+
+
+def join_chains(line_chains: list) -> list:
+    """
+    Join consecutive chains where each one starts at the end of the previous one, like the curves of a parsed path.
+    Whole contours are needed to tell what they contain.
+
+    :return: a new list of LineSegmentChains. The lines of the given chains are shared, not copied.
+    """
+    joined = []
+    for line_chain in line_chains:
+        if not line_chain.chain_size():
+            continue
+
+        if joined and not is_closed(joined[-1]) and \
+                abs(joined[-1].get(-1).end - line_chain.get(0).start) <= TOLERANCES["input"]:
+            joined[-1].extend(line_chain)
+        else:
+            joined.append(LineSegmentChain())
+            joined[-1].extend(line_chain)
+
+    return joined
+
+
+def containment_tree(line_chains: list) -> list:
+    """
+    Find the closed chain which immediately contains each chain. Only closed chains can contain others, but any chain
+    can be contained, eg. an engraving inside of a part.
+
+    A chain is contained if its bounding box lies inside of the closed chain's, which the BoundingBoxIndex finds without
+    comparing every pair, and if the middle of its first segment is inside of the closed chain's polygon. Of all the
+    chains which contain it, its parent is the one with the smallest bounding box.
+
+    :param line_chains: a list of non-empty LineSegmentChains.
+    :return: a list with the index of the parent of each chain, or None for the chains which aren't contained.
+    """
+    closed = [line_chain if is_closed(line_chain) else None for line_chain in line_chains]
+    boxes = [line_chain.bounding_box() for line_chain in line_chains]
+
+    index = BoundingBoxIndex([_IndexedBox(i, boxes[i]) for i in range(len(line_chains)) if closed[i] is not None])
+
+    def area(box):
+        return (box[2] - box[0]) * (box[3] - box[1])
+
+    parents = []
+    for i, line_chain in enumerate(line_chains):
+        first = line_chain.get(0)
+        middle = (first.start + first.end) * 0.5
+
+        parent = None
+        for candidate, box in index.query(boxes[i]):
+            # Strictly larger boxes only, such that two identical contours don't contain each other.
+            if candidate.index == i or not box_contains(box, boxes[i]) or area(box) <= area(boxes[i]):
+                continue
+
+            if parent is not None and area(box) >= area(boxes[parent]):
+                continue
+
+            if point_in_polygon(middle, closed[candidate.index]):
+                parent = candidate.index
+
+        parents.append(parent)
+
+    return parents
+
+
+def order_cuts(line_chains: list, position=None) -> list:
+    """
+    Order chains such that every chain is cut before the closed chains which contain it. Otherwise, the inner holes of a
+    through-cut part would be cut after the part has dropped out of the sheet.
+
+    The chains inside of a closed chain are cut right before it. Between siblings, the next chain to be cut is always
+    the one whose start is nearest to the end of the previous one.
+
+    :param line_chains: the chains to order. Empty chains are dropped.
+    :param position: the position of the tool before the first cut. The origin by default.
+    :return: a new list with the same chains.
+    """
+    line_chains = [line_chain for line_chain in line_chains if line_chain.chain_size()]
+    position = Vector(0, 0) if position is None else position
+
+    children = [[] for _ in line_chains]
+    roots = []
+    for i, parent in enumerate(containment_tree(line_chains)):
+        (roots if parent is None else children[parent]).append(i)
+
+    def siblings(indices):
+        return _NearestNeighbours({i: line_chains[i].get(0).start for i in indices})
+
+    # Iterative depth first traversal, a stack of (parent, its remaining children). Parents are cut once all of their
+    # children are.
+    ordered = []
+    stack = [(None, siblings(roots))]
+    while stack:
+        parent, remaining = stack[-1]
+
+        if not remaining:
+            stack.pop()
+            if parent is not None:
+                ordered.append(line_chains[parent])
+                position = line_chains[parent].get(-1).end
+            continue
+
+        i = remaining.pop_nearest(position)
+        if children[i]:
+            stack.append((i, siblings(children[i])))
+        else:
+            ordered.append(line_chains[i])
+            position = line_chains[i].get(-1).end
+
+    return ordered
+
+
+class _IndexedBox:
+    """Adapts a bounding box to the interface BoundingBoxIndex expects, remembering the index of its chain."""
+    __slots__ = "index", "box"
+
+    def __init__(self, index, box):
+        self.index = index
+        self.box = box
+
+    def bounding_box(self):
+        return self.box
+
+
+class _NearestNeighbours:
+    """
+    A set of points in a uniform grid, from which the nearest point to a position is repeatedly removed. Searches look
+    at rings of cells of growing radius around the position, until no closer point can be found.
+    """
+
+    # Below this many points, a linear scan is faster than the grid.
+    linear_scan = 32
+
+    def __init__(self, points: dict):
+        """
+        :param points: {key: Vector}
+        """
+        self.points = dict(points)
+        self._build()
+
+    def _build(self):
+        self._cells = None
+        if len(self.points) <= self.linear_scan:
+            return
+
+        xs, ys = [point.x for point in self.points.values()], [point.y for point in self.points.values()]
+        self._bounds = (min(xs), min(ys), max(xs), max(ys))
+
+        # Roughly one point per cell
+        self._cell_size = max(self._bounds[2] - self._bounds[0], self._bounds[3] - self._bounds[1]) / \
+            math.sqrt(len(self.points)) or 1
+
+        self._cells = {}
+        for key, point in self.points.items():
+            self._cells.setdefault(self._cell(point), []).append(key)
+
+        self._built_size = len(self.points)
+        self._extent = self._cell(Vector(self._bounds[2], self._bounds[3]))  # The last column and row
+
+    def __len__(self):
+        return len(self.points)
+
+    def _cell(self, point):
+        return math.floor((point.x - self._bounds[0]) / self._cell_size), \
+            math.floor((point.y - self._bounds[1]) / self._cell_size)
+
+    def pop_nearest(self, position: Vector):
+        """Remove the point nearest to position and return its key."""
+        # As points are removed, searches cross more empty cells. Rebuild a smaller grid every now and then.
+        if self._cells is not None and len(self.points) < self._built_size / 4:
+            self._build()
+
+        if self._cells is None:
+            key = min(self.points, key=lambda k: abs(self.points[k] - position))
+            del self.points[key]
+            return key
+
+        column, row = self._cell(position)
+        columns, rows = range(self._extent[0] + 1), range(self._extent[1] + 1)
+
+        # Rings are clipped to the grid. Skip the ones which miss it, if the position is outside of the grid.
+        first_ring = max(-column, column - columns[-1], -row, row - rows[-1], 0)
+        last_ring = max(column, columns[-1] - column, row, rows[-1] - row)
+
+        best, best_distance = None, math.inf
+        for ring in range(first_ring, last_ring + 1):
+            ring_columns = range(max(column - ring, 0), min(column + ring, columns[-1]) + 1)
+            ring_rows = range(max(row - ring + 1, 0), min(row + ring - 1, rows[-1]) + 1)
+
+            cells = [(i, j) for j in {row - ring, row + ring} if j in rows for i in ring_columns] + \
+                    [(i, j) for i in {column - ring, column + ring} if i in columns for j in ring_rows]
+
+            for cell in cells:
+                for key in self._cells.get(cell, ()):
+                    distance = abs(self.points[key] - position)
+                    if distance < best_distance:
+                        best, best_distance = key, distance
+
+            # Every point in the next ring is at least ring cells away
+            if best is not None and best_distance <= ring * self._cell_size:
+                break
+
+        cell = self._cell(self.points.pop(best))
+        self._cells[cell].remove(best)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+        return best
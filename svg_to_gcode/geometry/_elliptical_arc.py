@@ -47,6 +47,17 @@ class EllipticalArc(Curve):
 
         return point
 
+    def bounding_box(self):
+        # The circle around the largest radius contains the ellipse, regardless of its rotation. The transformation is
+        # affine, so it maps the square around that circle to a parallelogram which contains the transformed ellipse.
+        radius = max(abs(self.radii.x), abs(self.radii.y))
+        corners = [self.center + Vector(x, y) for x in (-radius, radius) for y in (-radius, radius)]
+
+        if self.transformation:
+            corners = [self.transformation.apply_affine_transformation(corner) for corner in corners]
+
+        return formulas.bounding_box(corners)
+
     def derivative(self, t):
         angle = formulas.linear_map(self.start_angle, self.end_angle, t)
         return self.angle_to_derivative(angle)
@@ -0,0 +1,152 @@
+import threading
+import weakref
+from collections import OrderedDict
+
+from svg_to_gcode.geometry import Vector, Curve
+
+
+class FlatteningCache:
+    """
+    A bounded, least recently used cache of the approximations of curves, such that compiling the same parsed curves
+    again, eg. with other speeds or passes, skips approximating them.
+
+    Entries are keyed by the curve and the parameters of the approximation, which include the active tolerance. Each
+    entry also records the data which defined the curve when it was approximated, see curve_signature(). A curve which
+    was modified since, eg. by moving its end, misses and is approximated again. The cache only holds weak references to
+    the curves, all of their entries are released as soon as they are garbage collected.
+    """
+
+    def __init__(self, max_size=4096):
+        """
+        :param max_size: the maximum number of approximations to keep. 0 disables the cache.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()  # {(id(curve), parameters): (curve_signature(curve), approximation)}
+        self._references = {}  # {id(curve): (weakref.ref(curve), {parameters, ...})}
+        self._lock = threading.Lock()
+
+        # (id(curve), weakref.ref(curve)) of the curves which were garbage collected, appended to by weakref callbacks.
+        # Those can run at any time, even while the lock is held, in which case the entries of the curves are removed by
+        # the next call which holds it. Callbacks run before the memory of a curve is freed, so before its id is reused.
+        self._released = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, curve, parameters):
+        """Return the approximation of the curve with the given parameters, or None if it isn't cached."""
+        with self._lock:
+            self._purge()
+
+            key = (id(curve), parameters)
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] != curve_signature(curve):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, curve, parameters, approximation):
+        """Store the approximation of the curve with the given parameters, evicting the least recently used entries."""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._purge()
+
+            if id(curve) not in self._references:
+                identity = id(curve)
+                reference = weakref.ref(curve, lambda dead: self._release(identity, dead))
+                self._references[identity] = (reference, set())
+
+            self._references[id(curve)][1].add(parameters)
+            self._entries[(id(curve), parameters)] = (curve_signature(curve), approximation)
+            self._entries.move_to_end((id(curve), parameters))
+
+            while len(self._entries) > self.max_size:
+                self._forget(*self._entries.popitem(last=False)[0])
+
+    def clear(self):
+        """Remove every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._references.clear()
+            self._released.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _forget(self, identity, parameters):
+        """Drop the reference to a curve once its last entry was evicted."""
+        parameter_set = self._references[identity][1]
+        parameter_set.discard(parameters)
+        if not parameter_set:
+            del self._references[identity]
+
+    def _release(self, identity, reference):
+        self._released.append((identity, reference))
+
+        if self._lock.acquire(blocking=False):
+            try:
+                self._purge()
+            finally:
+                self._lock.release()
+
+    def _purge(self):
+        """Remove the entries of the curves which were garbage collected."""
+        while self._released:
+            identity, reference = self._released.pop()
+
+            # The curve's entries may have been evicted already, and its id reused by a new curve.
+            if identity not in self._references or self._references[identity][0] is not reference:
+                continue
+
+            for parameters in self._references.pop(identity)[1]:
+                del self._entries[(identity, parameters)]
+
+
+# {type: the names of the slots which define its instances}
+_defining_slots = {}
+
+
+def curve_signature(curve) -> tuple:
+    """
+    Return a tuple of the data which defines a curve: its type and the values of its slots, like its start, end and
+    control points, the parameters of an arc and its transformation. Two curves with the same signature have the same
+    approximations.
+    """
+    curve_type = type(curve)
+    if curve_type not in _defining_slots:
+        slots = []
+        for cls in reversed(curve_type.__mro__):
+            names = cls.__dict__.get("__slots__", ())
+            slots.extend([names] if isinstance(names, str) else names)
+
+        _defining_slots[curve_type] = tuple(slot for slot in slots if slot != "__weakref__")
+
+    return (curve_type,) + tuple(_value_signature(getattr(curve, slot, None)) for slot in _defining_slots[curve_type])
+
+
+def _value_signature(value):
+    if isinstance(value, Vector):
+        return value.x, value.y
+
+    if isinstance(value, Curve):
+        return curve_signature(value)
+
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_value_signature, value))
+
+    # svg_parser.Transformation, without importing the svg_parser
+    if hasattr(value, "translation_matrix"):
+        return _value_signature(value.translation_matrix.matrix_list)
+
+    return value
+
+
+FLATTENING_CACHE = FlatteningCache()
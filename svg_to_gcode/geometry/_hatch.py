@@ -0,0 +1,332 @@
+import math
+
+from svg_to_gcode.geometry import Vector, Line, LineSegmentChain
+from svg_to_gcode import TOLERANCES
+
+FILL_RULES = ("nonzero", "evenodd")
+
+
+def _contours(curves) -> list:
+    """
+    Approximate curves as closed polygons. A new contour starts wherever a curve doesn't begin at the end of the
+    previous one. Contours are closed implicitly, like svg does when filling.
+
+    :return: a list of contours, each a list of (x, y) vertices without the closing vertex.
+    """
+    contours = []
+    contour = []
+    end = None
+
+    for curve in curves:
+        if end is None or abs(curve.start - end) > TOLERANCES["input"]:
+            if len(contour) > 2:
+                contours.append(contour)
+            contour = [(curve.start.x, curve.start.y)]
+
+        for line in LineSegmentChain.line_segment_approximation(curve):
+            contour.append((line.end.x, line.end.y))
+
+        end = curve.end
+
+    if len(contour) > 2:
+        contours.append(contour)
+
+    # Drop the closing vertex of explicitly closed contours
+    for contour in contours:
+        if math.dist(contour[0], contour[-1]) <= TOLERANCES["input"]:
+            contour.pop()
+
+    return contours
+
+
+class _Edge:
+    """An edge of a contour, as stored in the sorted edge table."""
+
+    __slots__ = "contour", "index", "low", "high", "y_min", "y_max", "x", "slope", "winding"
+
+    def __init__(self, contour, index, start, end):
+        self.contour = contour
+        self.index = index
+
+        # +1 for upwards edges and -1 for downwards edges, for the nonzero rule. Horizontal edges never cross a
+        # scanline, they are only stored to check connections between hatch lines.
+        self.winding = (end[1] > start[1]) - (end[1] < start[1])
+
+        self.low, self.high = (start, end) if self.winding == 1 else (end, start)
+        self.y_min, self.y_max = self.low[1], self.high[1]
+        self.slope = (self.high[0] - self.low[0]) / (self.y_max - self.y_min) if self.winding else 0  # dx/dy
+        self.x = self.low[0] - self.slope * self.y_min  # x at y = 0
+
+    def x_at(self, y):
+        return self.x + self.slope * y
+
+
+def _orientation(a, b, c):
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+def _connectable(contours, slab, crossing1, crossing2, y1, y2, right) -> bool:
+    """
+    Check if the straight connection between two crossings on consecutive scanlines stays inside the fill. It does if
+    the crossings lie on the same stretch of the contour, the contour doesn't bulge inwards between them and no other
+    edge crosses the connection.
+
+    :param slab: the _SlabIndex of every edge between the two scanlines.
+    :param right: whether the crossings close their spans, in which case the fill lies to their left.
+    """
+    (x1, edge1), (x2, edge2) = crossing1, crossing2
+
+    if edge1.contour != edge2.contour:
+        return False
+
+    contour = contours[edge1.contour]
+    size = len(contour)
+
+    stretch = _stretch(contour, edge1.index, edge2.index, x1, x2, y1, y2, right)
+    if stretch is None:
+        return False
+
+    start, end = (x1, y1), (x2, y2)
+    min_x, max_x = min(x1, x2), max(x1, x2)
+
+    for edge in slab.query(min_x - TOLERANCES["operation"], max_x + TOLERANCES["operation"]):
+        if edge.contour == edge1.contour and (edge.index - edge1.index) * stretch % size <= \
+                (edge2.index - edge1.index) * stretch % size:
+            continue
+
+        if max(edge.low[0], edge.high[0]) < min_x or min(edge.low[0], edge.high[0]) > max_x:
+            continue
+
+        if _orientation(start, end, edge.low) * _orientation(start, end, edge.high) < 0 and \
+                _orientation(edge.low, edge.high, start) * _orientation(edge.low, edge.high, end) < 0:
+            return False
+
+    return True
+
+
+def _stretch(contour, index1, index2, x1, x2, y1, y2, right):
+    """
+    Find the direction in which to walk along the contour from the crossing on edge index1 to the crossing on edge
+    index2, such that the contour stays within the slab and on the outer side of the connection.
+
+    :return: 1 or -1, None if neither direction does.
+    """
+    if index1 == index2:
+        return 1
+
+    size = len(contour)
+
+    # Walk along the contour from the first crossing to the second in both directions. Every vertex in between must be
+    # within the slab, on the outer side of the connection.
+    for step in (1, -1):
+        index = (index1 + 1) % size if step == 1 else index1
+        last = index2 if step == 1 else (index2 + 1) % size
+
+        for _ in range(size):
+            x, y = contour[index]
+            if not y1 <= y <= y2:
+                break
+
+            connection_x = x1 + (x2 - x1) * (y - y1) / (y2 - y1)
+            if (x < connection_x) if right else (x > connection_x):
+                break
+
+            if index == last:
+                return step
+
+            index = (index + step) % size
+
+    return None
+
+
+def _candidates(contours, open_chains, entry, right, y1, y2) -> list:
+    """
+    Find the open chains which might be extended to an entry crossing, without trying every chain of the contour. A
+    chain can only be extended if the contour between its last crossing and the entry stays within the slab, see
+    _stretch(). Those crossings are found by walking along the contour from the entry in both directions, as long as
+    it stays within the slab.
+
+    :param open_chains: {(contour, edge index) of the last crossing: chain}
+    :param right: whether the entry closes its span. Only chains whose last span ended on the same side can reach it.
+    """
+    edge = entry[1]
+    contour = contours[edge.contour]
+    size = len(contour)
+
+    # Walking forwards from the end of edge i to the start of the entry's edge, or backwards from the start of edge i to
+    # the end of the entry's edge.
+    indices = [edge.index]
+    for step, vertex in ((-1, edge.index), (1, (edge.index + 1) % size)):
+        for _ in range(size):
+            if not y1 <= contour[vertex][1] <= y2:
+                break
+
+            indices.append((vertex - 1) % size if step == -1 else vertex)
+            vertex = (vertex + step) % size
+
+    chains = (open_chains.get((edge.contour, index)) for index in dict.fromkeys(indices))
+    return [chain for chain in chains if chain is not None and chain[2] == right]
+
+
+class _SlabIndex:
+    """
+    The edges between two scanlines, in a uniform grid of columns, such that the edges near a connection are found
+    without scanning the whole slab. Columns are as wide as the average extent of the edges within the slab, which
+    keeps the number of columns each edge is stored in constant on average.
+    """
+
+    def __init__(self, edges, y1, y2):
+        extents = []
+        for edge in edges:
+            if edge.winding:
+                low, high = edge.x_at(max(y1, edge.y_min)), edge.x_at(min(y2, edge.y_max))
+            else:
+                low, high = edge.low[0], edge.high[0]
+
+            extents.append((min(low, high), max(low, high)))
+
+        self.origin = min((low for low, _ in extents), default=0)
+        self.width = sum(high - low for low, high in extents) / max(len(extents), 1) or y2 - y1 or 1
+
+        self.columns = {}
+        for edge, (low, high) in zip(edges, extents):
+            for column in range(self._column(low), self._column(high) + 1):
+                self.columns.setdefault(column, []).append(edge)
+
+    def _column(self, x):
+        return math.floor((x - self.origin) / self.width)
+
+    def query(self, min_x, max_x) -> list:
+        """Return the edges whose extent within the slab might overlap [min_x, max_x], each of them once."""
+        first, last = self._column(min_x), self._column(max_x)
+
+        if last - first < len(self.columns):
+            columns = (self.columns.get(column, ()) for column in range(first, last + 1))
+        else:
+            columns = (edges for column, edges in self.columns.items() if first <= column <= last)
+
+        return list({id(edge): edge for edges in columns for edge in edges}.values())
+
+
+def hatch_fill(curves, spacing: float, angle=0, fill_rule="nonzero") -> list:
+    """
+    Fill the shapes described by curves with parallel hatch lines, using a scanline algorithm with a sorted edge table
+    and an active edge list. Hatch lines are joined into serpentine chains wherever the connection between the end of
+    a line and the start of the next one follows the outline, which keeps laser-off moves to a minimum.
+
+    Each scanline sorts its active edges, in O(A log A) for A active edges, and indexes the edges between it and the
+    previous scanline. A chain is only tested against the spans it can reach along the outline, and each connection
+    only against the edges near it, so a scanline costs close to O(A log A) even when it crosses many spans.
+
+    :param curves: the curves describing the outline of the shapes. Each series of continuous curves is a contour, which
+    is closed implicitly.
+    :param spacing: the distance between neighbouring hatch lines.
+    :param angle: the angle of the hatch lines in degrees, counter-clockwise from the x axis.
+    :param fill_rule: "nonzero" or "evenodd", as the svg fill-rule property.
+    :return: a list of LineSegmentChains.
+    """
+    if spacing <= 0:
+        raise ValueError(f"spacing must be a positive number. Not {spacing}")
+
+    if fill_rule not in FILL_RULES:
+        raise ValueError(f"Unknown fill rule {fill_rule}. Please specify one of the following: {FILL_RULES}")
+
+    # Rotate the shapes such that hatch lines are horizontal.
+    cos, sin = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    contours = [[(x * cos + y * sin, y * cos - x * sin) for x, y in contour] for contour in _contours(curves)]
+
+    edge_table = []
+    for contour_index, contour in enumerate(contours):
+        for index, start in enumerate(contour):
+            end = contour[(index + 1) % len(contour)]
+            edge_table.append(_Edge(contour_index, index, start, end))
+
+    if not any(edge.winding for edge in edge_table):
+        return []
+
+    edge_table.sort(key=lambda edge: edge.y_min)
+
+    # Scanlines are aligned to multiples of spacing, such that neighbouring shapes are hatched consistently.
+    first = math.ceil(min(edge.y_min for edge in edge_table) / spacing)
+    last = math.floor(max(edge.y_max for edge in edge_table) / spacing)
+
+    active = []
+    next_edge = 0
+
+    finished = []
+    # {(contour, edge index) of the last crossing: [points, last crossing, whether the last span ended on its right]}
+    open_chains = {}
+
+    for scanline in range(first, last + 1):
+        y = scanline * spacing
+
+        # Edges span [y_min, y_max), such that a scanline through a vertex crosses exactly one of its edges.
+        new_edges = []
+        while next_edge < len(edge_table) and edge_table[next_edge].y_min <= y:
+            new_edges.append(edge_table[next_edge])
+            next_edge += 1
+
+        # Every edge between the previous scanline and this one
+        slab = active + new_edges
+
+        active = [edge for edge in slab if edge.winding and edge.y_max > y]
+
+        # The order barely changes between scanlines, so sorting the active list again is close to linear.
+        active.sort(key=lambda edge: edge.x_at(y))
+
+        # Extract the spans which are inside according to the fill rule.
+        spans = []
+        winding = 0
+        for edge in active:
+            x = edge.x_at(y)
+            previous = winding
+            winding = winding + edge.winding if fill_rule == "nonzero" else winding ^ 1
+
+            if previous == 0 and winding != 0:
+                span_start = (x, edge)
+            elif previous != 0 and winding == 0 and x - span_start[0] > TOLERANCES["operation"]:
+                spans.append((span_start, (x, edge)))
+
+        # Extend the chains which ended on the previous scanline, or start new ones. Chains which aren't extended are
+        # finished.
+        slab_index = _SlabIndex(slab, y - spacing, y) if open_chains else None
+
+        extended = {}
+        for left, right in spans:
+            for entry in (left, right):
+                candidates = _candidates(contours, open_chains, entry, entry is right, y - spacing, y)
+                chain = next((chain for chain in candidates
+                              if _connectable(contours, slab_index, chain[1], entry, y - spacing, y, chain[2])), None)
+                if chain is not None:
+                    del open_chains[(chain[1][1].contour, chain[1][1].index)]
+                    break
+            else:
+                # New chains alternate direction too, such that parallel chains line up.
+                chain = [[], None, scanline % 2 == 1]
+
+            if chain[2]:
+                chain[0].extend(((right[0], y), (left[0], y)))
+                chain[1], chain[2] = left, False
+            else:
+                chain[0].extend(((left[0], y), (right[0], y)))
+                chain[1], chain[2] = right, True
+
+            extended[(chain[1][1].contour, chain[1][1].index)] = chain
+
+        finished.extend(chain[0] for chain in open_chains.values())
+        open_chains = extended
+
+    finished.extend(chain[0] for chain in open_chains.values())
+
+    # Rotate back and build the chains.
+    line_chains = []
+    for points in finished:
+        vectors = [Vector(x * cos - y * sin, x * sin + y * cos) for x, y in points]
+
+        line_chain = LineSegmentChain()
+        for start, end in zip(vectors, vectors[1:]):
+            line_chain.append(Line(start, end))
+
+        line_chains.append(line_chain)
+
+    return line_chains
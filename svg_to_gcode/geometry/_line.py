@@ -28,5 +28,8 @@ class Line(Curve):
 
         return Vector(x, y)
 
+    def bounding_box(self):
+        return formulas.bounding_box((self.start, self.end))
+
     def derivative(self, t):
         return self.slope
@@ -1,6 +1,8 @@
 from svg_to_gcode.geometry import Chain
-from svg_to_gcode.geometry import Curve, Line, Vector
-from svg_to_gcode import TOLERANCES
+from svg_to_gcode.geometry import Curve, Line, Vector, flatten_curve
+from svg_to_gcode.geometry._flattening_cache import FLATTENING_CACHE
+from svg_to_gcode import TOLERANCES, formulas
+from svg_to_gcode import instrumentation
 
 
 class LineSegmentChain(Chain):
@@ -28,6 +30,18 @@ class LineSegmentChain(Chain):
 
         self._curves.append(line2)
 
+    def reversed(self) -> "LineSegmentChain":
+        """Return a new LineSegmentChain which traces the same lines in the opposite direction."""
+        reversed_chain = LineSegmentChain()
+        reversed_chain._curves = [Line(line.end, line.start) for line in reversed(self._curves)]
+        return reversed_chain
+
+    def bounding_box(self):
+        if not self._curves:
+            raise ValueError("An empty chain doesn't have a bounding box")
+
+        return formulas.bounding_box([self._curves[0].start] + [line.end for line in self._curves])
+
     @staticmethod
     def line_segment_approximation(shape, increment_growth=11 / 10, error_cap=None, error_floor=None)\
             -> "LineSegmentChain":
@@ -41,6 +55,81 @@ class LineSegmentChain(Chain):
         :return: A LineSegmentChain which approximates the given shape.
         """
 
+        if instrumentation.stats is not None:
+            with instrumentation.stats.stage("approximation"):
+                return LineSegmentChain._line_segment_approximation(shape, increment_growth, error_cap, error_floor)
+
+        return LineSegmentChain._line_segment_approximation(shape, increment_growth, error_cap, error_floor)
+
+    @staticmethod
+    def uniform_approximation(shape, error_cap=None) -> "LineSegmentChain":
+        """
+        This method approximates a shape with line segments of equal steps of t, computed in a single batch by the
+        selected backend, see geometry.flatten_curve. Faster than line_segment_approximation, especially with numpy,
+        but it may use more segments. Shapes which flatten_curve doesn't support are approximated adaptively.
+
+        :param shape: The shape to be approximated.
+        :param error_cap: the maximum acceptable deviation from the curve.
+        :return: A LineSegmentChain which approximates the given shape.
+        """
+        if instrumentation.stats is not None:
+            with instrumentation.stats.stage("approximation"):
+                return LineSegmentChain._uniform_approximation(shape, error_cap)
+
+        return LineSegmentChain._uniform_approximation(shape, error_cap)
+
+    @staticmethod
+    def _uniform_approximation(shape, error_cap) -> "LineSegmentChain":
+        error_cap = TOLERANCES['approximation'] if error_cap is None else error_cap
+        parameters = ("uniform", error_cap)
+
+        lines = LineSegmentChain._cached_approximation(shape, parameters)
+        if lines is not None:
+            return lines
+
+        points = flatten_curve(shape, error_cap)
+
+        if points is None:
+            return LineSegmentChain._line_segment_approximation(shape, 11 / 10, error_cap, None)
+
+        lines = LineSegmentChain()
+        for start, end in zip(points, points[1:]):
+            lines.append(Line(Vector(*start), Vector(*end)))
+
+        if not isinstance(shape, Line):
+            FLATTENING_CACHE.put(shape, parameters, LineSegmentChain._vertices(lines))
+
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("approximated_curves")
+            instrumentation.stats.count("segments", lines.chain_size())
+
+        return lines
+
+    @staticmethod
+    def _cached_approximation(shape, parameters):
+        """Rebuild the approximation of a shape from FLATTENING_CACHE, or return None if it wasn't cached."""
+        if isinstance(shape, Line):
+            return None
+
+        vertices = FLATTENING_CACHE.get(shape, parameters)
+        if vertices is None:
+            return None
+
+        # The cached lines could be modified by the chains they're appended to. Every hit builds new ones.
+        lines = LineSegmentChain()
+        lines._curves = [Line(start, end) for start, end in zip(vertices, vertices[1:])]
+
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("cached_approximations")
+
+        return lines
+
+    @staticmethod
+    def _vertices(lines) -> tuple:
+        return (lines.get(0).start,) + tuple(line.end for line in lines)
+
+    @staticmethod
+    def _line_segment_approximation(shape, increment_growth, error_cap, error_floor) -> "LineSegmentChain":
         error_cap = TOLERANCES['approximation'] if error_cap is None else error_cap
         error_floor = (increment_growth - 1) * error_cap if error_floor is None else error_floor
 
@@ -54,8 +143,21 @@ class LineSegmentChain(Chain):
 
         if isinstance(shape, Line):
             lines.append(shape)
+
+            if instrumentation.stats is not None:
+                instrumentation.stats.count("approximated_curves")
+                instrumentation.stats.count("segments")
+
             return lines
 
+        parameters = ("adaptive", increment_growth, error_cap, error_floor)
+
+        cached = LineSegmentChain._cached_approximation(shape, parameters)
+        if cached is not None:
+            return cached
+
+        rejections = 0
+
         t = 0
         line_start = shape.start
         increment = 5
@@ -74,6 +176,7 @@ class LineSegmentChain(Chain):
             # If the error is too high, reduce increment and restart cycle
             if distance > error_cap:
                 increment /= increment_growth
+                rejections += 1
                 continue
 
             # If the error is very low, increase increment but DO NOT restart cycle.
@@ -85,4 +188,11 @@ class LineSegmentChain(Chain):
             line_start = line_end
             t = new_t
 
+        FLATTENING_CACHE.put(shape, parameters, LineSegmentChain._vertices(lines))
+
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("approximated_curves")
+            instrumentation.stats.count("segments", lines.chain_size())
+            instrumentation.stats.count("approximation_rejections", rejections)
+
         return lines
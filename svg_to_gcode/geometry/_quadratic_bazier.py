@@ -1,5 +1,6 @@
 from svg_to_gcode.geometry import Vector
 from svg_to_gcode.geometry import Curve
+from svg_to_gcode import formulas
 
 
 class QuadraticBezier(Curve):
@@ -21,6 +22,10 @@ class QuadraticBezier(Curve):
     def point(self, t):
         return self.control + ((1 - t)**2) * (self.start - self.control) + (t**2) * (self.end - self.control)
 
+    def bounding_box(self):
+        # A bezier curve is contained in the convex hull of its control points.
+        return formulas.bounding_box((self.start, self.control, self.end))
+
     def derivative(self, t):
         return 2 * (1 - t) * (self.control - self.start) + 2 * t * (self.end - self.control)
 
@@ -0,0 +1,33 @@
+from svg_to_gcode.geometry import Vector, Line, LineSegmentChain
+
+
+def quantize_line_chain(line_chain: LineSegmentChain, steps_per_mm: float) -> LineSegmentChain:
+    """
+    Snap the vertices of a chain to the grid of positions a machine can actually reach, one motor step apart. Segments
+    which collapse to a single grid point, shorter than a step, are dropped, such that consecutive vertices are never the
+    same.
+
+    :param line_chain: the chain to quantize.
+    :param steps_per_mm: the resolution of the machine, in steps per unit of the drawing. Usually steps per mm.
+    :return: a new LineSegmentChain, which is empty if the whole chain collapses to a single point.
+    """
+    if steps_per_mm <= 0:
+        raise ValueError(f"steps_per_mm must be a positive number. Not {steps_per_mm}")
+
+    # Grid coordinates as integers, such that collapsed vertices compare equal.
+    vertices = [line_chain.get(0).start] + [line.end for line in line_chain]
+    steps = [(round(vertex.x * steps_per_mm), round(vertex.y * steps_per_mm)) for vertex in vertices]
+
+    quantized = LineSegmentChain()
+    previous = None
+    for step in steps:
+        if step == previous:
+            continue
+
+        point = Vector(step[0] / steps_per_mm, step[1] / steps_per_mm)
+        if previous is not None:
+            quantized.append(Line(start, point))
+
+        start, previous = point, step
+
+    return quantized
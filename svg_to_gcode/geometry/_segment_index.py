@@ -0,0 +1,130 @@
+import math
+
+from svg_to_gcode.geometry import Line, LineSegmentChain
+from svg_to_gcode import TOLERANCES
+
+
+class SegmentIndex:
+    """
+    The SegmentIndex class remembers every line segment it was given, in a hash of grid cells keyed by quantized
+    coordinates. It's used to remove segments which were already drawn: both exact duplicates, in either direction, and
+    collinear segments which partially overlap.
+
+    Each segment is only compared with the segments which share its cells, so indexing n segments takes near-linear
+    time as long as cell_size is in the order of the length of the segments.
+    """
+
+    def __init__(self, tolerance=None, cell_size=1.0):
+        """
+        :param tolerance: how far apart two segments may be and still be considered the same. Defaults to the input
+        tolerance.
+        :param cell_size: the side of a grid cell. Long segments are stored in every cell they cross.
+        """
+        self.tolerance = TOLERANCES["input"] if tolerance is None else tolerance
+
+        if cell_size <= 0:
+            raise ValueError(f"cell_size must be a positive number. Not {cell_size}")
+
+        self.cell_size = cell_size
+
+        self._segments = []  # (start, end) tuples
+        self._cells = {}  # {(column, row): [indices into self._segments]}
+        self._endpoints = set()  # Quantized endpoints of every segment, for exact duplicates
+
+    def _quantize(self, point) -> tuple:
+        return round(point[0] / self.tolerance), round(point[1] / self.tolerance)
+
+    def _cells_crossed(self, start, end) -> set:
+        """The cells a segment crosses. Sampled every half cell, such that cells are at most skipped at their corners."""
+        steps = max(1, math.ceil(math.dist(start, end) / (self.cell_size / 2)))
+        return {(math.floor((start[0] + (end[0] - start[0]) * step / steps) / self.cell_size),
+                 math.floor((start[1] + (end[1] - start[1]) * step / steps) / self.cell_size))
+                for step in range(steps + 1)}
+
+    def _overlaps(self, start, end, length):
+        """Yield the (t0, t1) ranges, as distances from start, where start->end overlaps indexed segments."""
+        direction = ((end[0] - start[0]) / length, (end[1] - start[1]) / length)
+
+        # Segments are stored in the cells they cross, look in the neighbouring cells too.
+        candidates = set()
+        for column, row in self._cells_crossed(start, end):
+            for cell in ((column + i, row + j) for i in (-1, 0, 1) for j in (-1, 0, 1)):
+                candidates.update(self._cells.get(cell, ()))
+
+        for index in candidates:
+            other_start, other_end = self._segments[index]
+
+            # Position along and distance from the line through start and end
+            relative = [(point[0] - start[0], point[1] - start[1]) for point in (other_start, other_end)]
+            (t1, h1), (t2, h2) = [(x * direction[0] + y * direction[1], y * direction[0] - x * direction[1])
+                                  for x, y in relative]
+
+            if t1 > t2:
+                t1, t2, h1, h2 = t2, t1, h2, h1
+
+            low, high = max(0, t1), min(length, t2)
+            if high - low <= self.tolerance:
+                continue
+
+            # The other segment must be within tolerance of this one across the whole overlap.
+            if all(abs(h1 + (h2 - h1) * (t - t1) / (t2 - t1)) <= self.tolerance for t in (low, high)):
+                yield low, high
+
+    def add(self, line_chain: LineSegmentChain) -> list:
+        """
+        Index the segments of a chain, and return the parts of it which weren't indexed before.
+
+        :param line_chain: the chain to index.
+        :return: a list of LineSegmentChains. Empty if the whole chain is a duplicate, [line_chain] if no part of it is.
+        """
+        pieces = []
+        piece = LineSegmentChain()
+        untouched = True
+
+        for line in line_chain:
+            start, end = (line.start.x, line.start.y), (line.end.x, line.end.y)
+            length = math.dist(start, end)
+
+            keys = (self._quantize(start), self._quantize(end))
+            if length <= self.tolerance or (keys in self._endpoints or keys[::-1] in self._endpoints):
+                remaining = []
+            else:
+                # Subtract the overlaps from [0, length]
+                remaining = [(0, length)]
+                for low, high in self._overlaps(start, end, length):
+                    remaining = [interval for t0, t1 in remaining
+                                 for interval in ((t0, min(t1, low)), (max(t0, high), t1))
+                                 if interval[1] - interval[0] > self.tolerance]
+
+            if remaining != [(0, length)]:
+                untouched = False
+
+            for t0, t1 in remaining:
+                piece_start = line.start if t0 == 0 else line.start + (line.end - line.start) * (t0 / length)
+                piece_end = line.end if t1 == length else line.start + (line.end - line.start) * (t1 / length)
+
+                # A gap splits the chain
+                if piece.chain_size() and t0 > 0:
+                    pieces.append(piece)
+                    piece = LineSegmentChain()
+
+                piece.append(line if (t0, t1) == (0, length) else Line(piece_start, piece_end))
+                self._insert((piece_start.x, piece_start.y), (piece_end.x, piece_end.y))
+
+            if not remaining or remaining[-1][1] != length:
+                if piece.chain_size():
+                    pieces.append(piece)
+                    piece = LineSegmentChain()
+
+        if piece.chain_size():
+            pieces.append(piece)
+
+        return [line_chain] if untouched else pieces
+
+    def _insert(self, start, end):
+        index = len(self._segments)
+        self._segments.append((start, end))
+        self._endpoints.add((self._quantize(start), self._quantize(end)))
+
+        for cell in self._cells_crossed(start, end):
+            self._cells.setdefault(cell, []).append(index)
@@ -0,0 +1,149 @@
+import math
+
+from svg_to_gcode.geometry import Line, LineSegmentChain
+from svg_to_gcode import TOLERANCES
+
+
+def _nodes(line_chains, tolerance) -> list:
+    """
+    Cluster the endpoints of the chains into graph nodes, with a spatial hash of cells the size of tolerance. An
+    endpoint joins the first node which lies within tolerance of it.
+
+    :return: a list of (start node, end node) tuples, one for each chain.
+    """
+    cells = {}
+    positions = []
+
+    def node(point):
+        column, row = math.floor(point.x / tolerance), math.floor(point.y / tolerance)
+        for cell in ((column + i, row + j) for i in (-1, 0, 1) for j in (-1, 0, 1)):
+            for index in cells.get(cell, ()):
+                if abs(positions[index] - point) <= tolerance:
+                    return index
+
+        positions.append(point)
+        cells.setdefault((column, row), []).append(len(positions) - 1)
+        return len(positions) - 1
+
+    return [(node(line_chain.get(0).start), node(line_chain.get(-1).end)) for line_chain in line_chains]
+
+
+def _circuit(adjacency, used, start) -> list:
+    """
+    Hierholzer's algorithm. Walk an Eulerian circuit of the unused edges reachable from start. Every node must have an
+    even number of unused edges.
+
+    :return: the circuit as a list of (edge, forwards) tuples.
+    """
+    circuit = []
+    stack = [(start, None)]
+    while stack:
+        node, arrival = stack[-1]
+        edges = adjacency[node]
+
+        while edges and used[edges[-1][0]]:
+            edges.pop()
+
+        if edges:
+            edge, other, forwards = edges.pop()
+            used[edge] = True
+            stack.append((other, (edge, forwards)))
+        else:
+            stack.pop()
+            if arrival is not None:
+                circuit.append(arrival)
+
+    circuit.reverse()
+    return circuit
+
+
+def merge_strokes(line_chains: list, tolerance=None) -> list:
+    """
+    Join chains into as few continuous strokes as possible, such that the tool is lifted as rarely as possible.
+
+    The chains are the edges of a graph whose nodes are their endpoints, merged within tolerance. Each connected
+    component with k nodes of odd degree can't be drawn in less than max(1, k / 2) strokes. Pairing odd nodes with
+    virtual edges gives every node an even degree, an Eulerian circuit then visits every chain once, and splitting
+    it at the virtual edges yields exactly that many strokes. Chains are reversed where needed.
+
+    :param line_chains: the chains to join.
+    :param tolerance: how close two endpoints must be to be joined. Half of the input tolerance by default, such that
+    the joined chains are continuous.
+    :return: a list of LineSegmentChains which, together, draw every line of every chain exactly once.
+    """
+    tolerance = TOLERANCES["input"] / 2 if tolerance is None else tolerance
+    line_chains = [line_chain for line_chain in line_chains if line_chain.chain_size()]
+
+    endpoints = _nodes(line_chains, tolerance)
+    node_count = 1 + max((node for pair in endpoints for node in pair), default=-1)
+
+    adjacency = [[] for _ in range(node_count)]  # [(edge, other node, forwards), ...]
+    for edge, (start, end) in enumerate(endpoints):
+        adjacency[start].append((edge, end, True))
+        adjacency[end].append((edge, start, False))
+
+    # Connected components, in order of their first chain.
+    component = [None] * node_count
+    components = []
+    for start, _ in endpoints:
+        if component[start] is not None:
+            continue
+
+        component[start] = len(components)
+        members = [start]
+        for node in members:
+            for _, other, _ in adjacency[node]:
+                if component[other] is None:
+                    component[other] = len(components)
+                    members.append(other)
+
+        components.append(members)
+
+    # Pair the odd nodes of each component with virtual edges, which are numbered after the chains. The circuit of a
+    # component with odd nodes starts from one of them, such that it begins with a virtual edge.
+    virtual = len(line_chains)
+    starts = []
+    for members in components:
+        odd = [node for node in members if len(adjacency[node]) % 2]
+        for start, end in zip(odd[::2], odd[1::2]):
+            adjacency[start].append((virtual, end, True))
+            adjacency[end].append((virtual, start, False))
+            virtual += 1
+
+        starts.append(odd[0] if odd else members[0])
+
+    # Adjacency lists are consumed from the end. Reverse them, such that virtual edges are taken first and chains are
+    # visited in their original order where possible.
+    for edges in adjacency:
+        edges.reverse()
+
+    used = [False] * virtual
+    strokes = []
+    for start in starts:
+        circuit = _circuit(adjacency, used, start)
+
+        # Rotate the circuit to begin with a virtual edge, if there is one, such that strokes aren't split at its end.
+        first_virtual = next((index for index, (edge, _) in enumerate(circuit) if edge >= len(line_chains)), 0)
+        circuit = circuit[first_virtual:] + circuit[:first_virtual]
+
+        stroke = None
+        for edge, forwards in circuit:
+            if edge >= len(line_chains):
+                if stroke is not None:
+                    strokes.append(stroke)
+                stroke = None
+                continue
+
+            if stroke is None:
+                stroke = LineSegmentChain()
+
+            # Joining snaps the start of each line to the end of the previous one. Copy the lines, such that the input
+            # chains aren't modified.
+            line_chain = line_chains[edge] if forwards else line_chains[edge].reversed()
+            for line in line_chain:
+                stroke.append(Line(line.start, line.end))
+
+        if stroke is not None:
+            strokes.append(stroke)
+
+    return strokes
@@ -0,0 +1,208 @@
+"""
+Opt-in instrumentation of the conversion pipeline. When enabled, the parser, the approximation and the compiler record
+the wall time spent in each stage and count the objects they process. Instrumentation is disabled by default, in which
+case every hook reduces to a single check of the module-level stats variable.
+
+Stages:
+    parse:          parse_file, parse_file_paths and parse_string, from reading the xml to returning the curves.
+    path:           parsing the d attribute of a path into curves.
+    transform:      applying affine transformations to points.
+    approximation:  LineSegmentChain.line_segment_approximation.
+    emission:       Compiler.append_line_chain.
+    deduplication:  removing segments which were already drawn, with Compiler(remove_duplicates=True).
+    quantization:   snapping chains to the resolution of the machine, with Compiler(steps_per_mm=...).
+    merging:        joining chains into strokes, with Compiler(merge_strokes=True).
+    ordering:       ordering chains inside of the closed chains which contain them, with Compiler(order_cuts=True).
+    hatch:          generating the hatch lines of Compiler.append_fill.
+    raster:         dithering the images of Compiler.append_image.
+    join:           assembling the compiled program into a string.
+
+Stages are inclusive, the time spent in nested stages is also counted in the outer stage.
+
+Usage:
+    with instrumentation.instrument(trace_memory=True) as stats:
+        ...
+
+    stats.dump("stats.json")
+"""
+
+import json
+import time
+import tracemalloc
+
+# The active PipelineStats, or None if instrumentation is disabled. Hooks should check it before doing anything else.
+stats = None
+
+_started_tracing = False
+
+
+class StageStats:
+    """The StageStats class accumulates the measurements of a single stage."""
+
+    __slots__ = "calls", "wall_time", "peak_memory"
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_time = 0
+        self.peak_memory = None
+
+    def __repr__(self):
+        return f"StageStats(calls: {self.calls}, wall_time: {self.wall_time}, peak_memory: {self.peak_memory})"
+
+
+class _Stage:
+    """Context manager which measures one execution of a stage."""
+
+    __slots__ = "pipeline", "name", "start", "memory_baseline", "peak_memory"
+
+    def __init__(self, pipeline: "PipelineStats", name: str):
+        self.pipeline = pipeline
+        self.name = name
+
+    def __enter__(self):
+        pipeline = self.pipeline
+
+        if pipeline.trace_memory:
+            # Resetting the peak would hide the peaks of stages which are still open. Record them first.
+            current, peak = tracemalloc.get_traced_memory()
+            for stage in pipeline._open_stages:
+                stage.peak_memory = max(stage.peak_memory, peak - stage.memory_baseline)
+
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+
+            self.memory_baseline = current
+            self.peak_memory = 0
+
+        pipeline._open_stages.append(self)
+        self.start = time.perf_counter()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        wall_time = time.perf_counter() - self.start
+
+        pipeline = self.pipeline
+        pipeline._open_stages.remove(self)
+
+        stage_stats = pipeline.stages.get(self.name)
+        if stage_stats is None:
+            stage_stats = pipeline.stages[self.name] = StageStats()
+
+        stage_stats.calls += 1
+        stage_stats.wall_time += wall_time
+
+        if pipeline.trace_memory:
+            peak = max(self.peak_memory, tracemalloc.get_traced_memory()[1] - self.memory_baseline)
+            stage_stats.peak_memory = peak if stage_stats.peak_memory is None else max(stage_stats.peak_memory, peak)
+
+
+class _NullStage:
+    """Context manager which does nothing. Used when instrumentation is disabled or a stage is re-entered."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_null_stage = _NullStage()
+
+
+class PipelineStats:
+    """The PipelineStats class collects the wall time of each stage and the counters of the pipeline."""
+
+    def __init__(self, trace_memory=False):
+        """
+        :param trace_memory: Whether or not to record the peak memory allocated during each stage with tracemalloc.
+        Expect a significant slowdown.
+        """
+        self.trace_memory = trace_memory
+
+        self.stages = {}
+        self.counters = {}
+
+        self._open_stages = []
+
+    def __repr__(self):
+        return f"PipelineStats(stages: {self.stages}, counters: {self.counters})"
+
+    def stage(self, name: str):
+        """Return a context manager which measures a stage. Re-entering a stage which is already open is a no-op."""
+        for stage in self._open_stages:
+            if stage.name == name:
+                return _null_stage
+
+        return _Stage(self, name)
+
+    def count(self, name: str, amount=1):
+        """Increment a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self):
+        return {
+            "stages": {name: {"calls": stage.calls, "wall_time": stage.wall_time, "peak_memory": stage.peak_memory}
+                       for name, stage in self.stages.items()},
+            "counters": dict(self.counters)
+        }
+
+    def to_json(self, indent=2) -> str:
+        return json.dumps(self.as_dict(), indent=indent)
+
+    def dump(self, file_name: str):
+        """Save the stats to a json file."""
+        with open(file_name, 'w') as file:
+            file.write(self.to_json())
+
+
+def enable(trace_memory=False) -> PipelineStats:
+    """
+    Start collecting stats in a new PipelineStats instance, which is returned.
+
+    :param trace_memory: Whether or not to record the peak memory allocated during each stage with tracemalloc.
+    """
+    global stats, _started_tracing
+
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+
+    stats = PipelineStats(trace_memory)
+    return stats
+
+
+def disable() -> PipelineStats:
+    """Stop collecting stats. Return the PipelineStats instance which was active, if any."""
+    global stats, _started_tracing
+
+    previous_stats, stats = stats, None
+
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+
+    return previous_stats
+
+
+def stage(name: str):
+    """Return a context manager which measures a stage of the active PipelineStats, or does nothing if disabled."""
+    if stats is None:
+        return _null_stage
+
+    return stats.stage(name)
+
+
+class instrument:
+    """Context manager which enables instrumentation for the duration of a block. Yields the PipelineStats instance."""
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+
+    def __enter__(self) -> PipelineStats:
+        return enable(self.trace_memory)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        disable()
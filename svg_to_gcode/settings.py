@@ -0,0 +1,84 @@
+"""
+Per-job settings. A Settings instance holds the tolerances of one job. While it is active, every read of
+svg_to_gcode.TOLERANCES, by the parser, the geometry and the compiler, returns its values instead of the global
+defaults.
+
+Settings are activated per thread (and per asyncio task), so concurrent jobs with different tolerances don't interfere.
+Assigning to TOLERANCES still changes the global defaults, which every Settings created afterwards starts from.
+
+Usage:
+    settings = Settings({"approximation": 0.05})
+
+    with settings:
+        curves = parse_file("drawing.svg")
+
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, settings=settings)
+    gcode_compiler.append_curves(curves)
+"""
+
+import contextvars
+from collections.abc import MutableMapping
+
+# The stack of active Settings of the current context. A tuple, such that each thread or task modifies its own copy.
+_active = contextvars.ContextVar("svg_to_gcode_settings", default=())
+
+
+class Settings:
+    """The configuration of a job. Use it as a context manager to activate it, activations can be nested."""
+    __slots__ = "tolerances",
+
+    def __init__(self, tolerances: dict = None):
+        """
+        :param tolerances: the tolerances which differ from the current values of TOLERANCES, eg. {"approximation":
+        0.05}. The others are copied from the active settings, or the defaults, when the Settings is created.
+        """
+        self.tolerances = dict(TOLERANCES)
+
+        for key, value in (tolerances or {}).items():
+            if key not in self.tolerances:
+                raise ValueError(f"Unknown tolerance {key}. Please specify one of the following: {set(_defaults)}")
+
+            self.tolerances[key] = value
+
+    def __repr__(self):
+        return f"Settings({self.tolerances})"
+
+    def __enter__(self):
+        _active.set(_active.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _active.set(_active.get()[:-1])
+
+
+def active_settings():
+    """Return the innermost active Settings of the current thread or task, or None outside of any."""
+    stack = _active.get()
+    return stack[-1] if stack else None
+
+
+class _Tolerances(MutableMapping):
+    """The type of svg_to_gcode.TOLERANCES. Reads return the values of the active Settings, writes change the defaults."""
+
+    def __getitem__(self, key):
+        stack = _active.get()
+        return (stack[-1].tolerances if stack else _defaults)[key]
+
+    def __setitem__(self, key, value):
+        _defaults[key] = value
+
+    def __delitem__(self, key):
+        raise TypeError("Tolerances can't be deleted")
+
+    def __iter__(self):
+        return iter(_defaults)
+
+    def __len__(self):
+        return len(_defaults)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+_defaults = {"approximation": 10 ** -2, "input": 10 ** -3, "operation": 10**-6}
+TOLERANCES = _Tolerances()
@@ -8,4 +8,8 @@ specific maintenance notes:
 
 from svg_to_gcode.svg_parser._transformation import Transformation
 from svg_to_gcode.svg_parser._path import Path
-from svg_to_gcode.svg_parser._parser_methods import parse_file, parse_string, parse_root
+from svg_to_gcode.svg_parser._png import decode_png
+from svg_to_gcode.svg_parser._image import Image
+from svg_to_gcode.svg_parser._layer import Layer
+from svg_to_gcode.svg_parser._parser_methods import parse_file, parse_string, parse_root, parse_root_paths, \
+    parse_file_paths, parse_root_images, parse_file_images, parse_root_layers, parse_file_layers
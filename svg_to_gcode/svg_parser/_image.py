@@ -0,0 +1,71 @@
+import base64
+import re
+
+from svg_to_gcode.geometry import Vector
+from svg_to_gcode.svg_parser import Transformation
+from svg_to_gcode.svg_parser._png import decode_png
+
+
+class Image:
+    """
+    The Image class represents an svg image element, decoded to grayscale. Only images embedded as png data URIs are
+    supported.
+
+    Pixels are addressed in pixel space, where the top-left corner of the image is (0, 0) and the center of the top-left
+    pixel is (0.5, 0.5). Image.point maps pixel space to the coordinate system of the geometry sub-module.
+    """
+
+    __slots__ = "width", "height", "pixels", "origin", "column_step", "row_step"
+
+    def __init__(self, href: str, x: float, y: float, width: float, height: float, canvas_height: float,
+                 transform_origin=True, transformation=None, preserve_aspect_ratio="xMidYMid meet"):
+        """
+        :param href: the value of the href attribute, a data URI like "data:image/png;base64,iVBORw0KGgo...".
+        :param x: the x attribute, the left edge of the image's viewport.
+        :param y: the y attribute, the top edge of the image's viewport.
+        :param width: the width attribute, the width of the image's viewport.
+        :param height: the height attribute, the height of the image's viewport.
+        :param canvas_height: the height of the canvas, used to transform the origin.
+        :param transform_origin: whether or not to transform coordinates to the bottom-left origin.
+        :param transformation: a Transformation to apply to the image.
+        :param preserve_aspect_ratio: the preserveAspectRatio attribute. "none" stretches the image to fill the
+        viewport, anything else is treated as the default, "xMidYMid meet", which scales it uniformly and centers it.
+        """
+        match = re.match(r"data:image/png(;[^,]*)?,", href.strip())
+        if match is None:
+            raise ValueError(f"Only images embedded as png data URIs are supported. Not {href[:30]}...")
+
+        if not match.group(1) or "base64" not in match.group(1):
+            raise ValueError("Only base64 encoded data URIs are supported")
+
+        self.width, self.height, self.pixels = decode_png(base64.b64decode(href.strip()[match.end():]))
+
+        scale_x, scale_y = width / self.width, height / self.height
+        if preserve_aspect_ratio.strip() != "none":
+            scale_x = scale_y = min(scale_x, scale_y)
+            x += (width - self.width * scale_x) / 2
+            y += (height - self.height * scale_y) / 2
+
+        image_transformation = Transformation()
+
+        if transform_origin:
+            image_transformation.add_translation(0, canvas_height)
+            image_transformation.add_scale(1, -1)
+
+        if transformation is not None:
+            image_transformation.extend(transformation)
+
+        image_transformation.add_translation(x, y)
+        image_transformation.add_scale(scale_x, scale_y)
+
+        # The transformation is affine, three points are enough to describe it.
+        self.origin = image_transformation.apply_affine_transformation(Vector(0, 0))
+        self.column_step = image_transformation.apply_affine_transformation(Vector(1, 0)) - self.origin
+        self.row_step = image_transformation.apply_affine_transformation(Vector(0, 1)) - self.origin
+
+    def __repr__(self):
+        return f"Image({self.width}x{self.height} pixels at {self.origin})"
+
+    def point(self, column: float, row: float) -> Vector:
+        """Map a point in pixel space to the coordinate system of the geometry sub-module."""
+        return self.origin + self.column_step * column + self.row_step * row
@@ -0,0 +1,30 @@
+class Layer:
+    """
+    The Layer class represents an Inkscape layer, a group with inkscape:groupmode="layer". Layers usually separate
+    operations, like engraving, scoring and cutting, which are compiled with different settings.
+    """
+
+    __slots__ = "id", "label", "paths"
+
+    def __init__(self, id: str = None, label: str = None, paths=None):
+        """
+        :param id: the id attribute of the group.
+        :param label: the inkscape:label attribute of the group, the name Inkscape shows.
+        :param paths: the Paths drawn inside of the layer, excluding those of its sublayers.
+        """
+        self.id = id
+        self.label = label
+        self.paths = [] if paths is None else paths
+
+    def __repr__(self):
+        return f"Layer(id: {self.id}, label: {self.label}, {len(self.paths)} paths)"
+
+    @property
+    def name(self):
+        """The label of the layer, or its id if it has none. None for the paths which aren't in any layer."""
+        return self.id if self.label is None else self.label
+
+    @property
+    def curves(self) -> list:
+        """The curves of every path of the layer."""
+        return [curve for path in self.paths for curve in path.curves]
@@ -1,11 +1,20 @@
+import warnings
+
 from xml.etree import ElementTree
 from typing import List
 from copy import deepcopy
 
-from svg_to_gcode.svg_parser import Path, Transformation
+from svg_to_gcode.svg_parser import Path, Image, Transformation, Layer
 from svg_to_gcode.geometry import Curve
+from svg_to_gcode import instrumentation
+
+NAMESPACES = {'svg': 'http://www.w3.org/2000/svg', 'xlink': 'http://www.w3.org/1999/xlink',
+              'inkscape': 'http://www.inkscape.org/namespaces/inkscape'}
+
 
-NAMESPACES = {'svg': 'http://www.w3.org/2000/svg'}
+# Inheritable presentation properties which are attached to the parsed paths, along with their class attribute.
+# https://www.w3.org/TR/SVG2/styling.html
+STYLE_PROPERTIES = ("fill", "fill-rule", "stroke", "stroke-width")
 
 
 def _has_style(element: ElementTree.Element, key: str, value: str) -> bool:
@@ -15,6 +24,21 @@ def _has_style(element: ElementTree.Element, key: str, value: str) -> bool:
     return element.get(key) == value or (element.get("style") and f"{key}:{value}" in element.get("style"))
 
 
+def _get_style(element: ElementTree.Element, key: str):
+    """
+    Return the value of a property, either from the style attribute or from an independent attribute, in that order of
+    precedence. None if the element doesn't specify it.
+    """
+    style = element.get("style")
+    if style and key in style:
+        for declaration in style.split(';'):
+            name, _, value = declaration.partition(':')
+            if name.strip() == key:
+                return value.strip()
+
+    return element.get(key)
+
+
 # Todo deal with viewBoxes
 def parse_root(root: ElementTree.Element, transform_origin=True, canvas_height=None, draw_hidden=False,
                visible_root=True, root_transformation=None) -> List[Curve]:
@@ -32,12 +56,136 @@ def parse_root(root: ElementTree.Element, transform_origin=True, canvas_height=N
     :param root_transformation: Specifies whether the root's transformation. (Transformations are inheritable)
     :return: A list of geometric curves describing the svg. Use the Compiler sub-module to compile them to gcode.
     """
+    paths = parse_root_paths(root, transform_origin, canvas_height, draw_hidden, visible_root, root_transformation)
+    return [curve for path in paths for curve in path.curves]
+
+
+def parse_root_paths(root: ElementTree.Element, transform_origin=True, canvas_height=None, draw_hidden=False,
+                     visible_root=True, root_transformation=None, root_style=None) -> List[Path]:
+    """
+    Recursively parse an etree root's children into Paths. Unlike parse_root, the curves of each path are kept together
+    along with its style, which is needed to fill shapes.
+
+    Takes the same parameters as parse_root.
+
+    :param root_style: The root's inheritable style properties, a dictionary as stored in Path.style.
+    :return: A list of Paths, each with its curves and its style.
+    """
+    canvas_height = _canvas_height(root, canvas_height)
+
+    paths = []
+    for element, transformation, style in _walk(root, draw_hidden, visible_root, root_transformation, root_style):
+        if element.tag == "{%s}path" % NAMESPACES["svg"]:
+            paths.append(_parse_path(element, canvas_height, transform_origin, transformation, style))
+
+    # ToDo implement shapes class
+    return paths
+
+
+def parse_root_layers(root: ElementTree.Element, transform_origin=True, canvas_height=None, draw_hidden=False,
+                      visible_root=True, root_transformation=None) -> List[Layer]:
+    """
+    Recursively parse an etree root's children into Paths, grouped by the Inkscape layer they're drawn in. Each path
+    belongs to its innermost layer, sublayers are layers of their own.
+
+    Takes the same parameters as parse_root.
+
+    :return: A list of the Layers which contain at least one path, in the order of their first path. Paths which aren't
+    in any layer are collected in a Layer without id nor label.
+    """
+    canvas_height = _canvas_height(root, canvas_height)
+    parents = {child: parent for parent in root.iter() for child in parent}
+
+    layers = {}  # {layer element or None: Layer}
+    for element, transformation, style in _walk(root, draw_hidden, visible_root, root_transformation):
+        if element.tag != "{%s}path" % NAMESPACES["svg"]:
+            continue
+
+        group = parents.get(element)
+        while group is not None and group.get("{%s}groupmode" % NAMESPACES["inkscape"]) != "layer":
+            group = parents.get(group)
+
+        if group not in layers:
+            layers[group] = Layer() if group is None else \
+                Layer(group.get("id"), group.get("{%s}label" % NAMESPACES["inkscape"]))
+
+        layers[group].paths.append(_parse_path(element, canvas_height, transform_origin, transformation, style))
+
+    return list(layers.values())
+
+
+def _parse_path(element: ElementTree.Element, canvas_height, transform_origin, transformation, style) -> Path:
+    # Classes aren't inherited, they're only attached to the path which declares them.
+    if element.get("class"):
+        style = dict(style, **{"class": element.get("class")})
+
+    path = Path(element.attrib['d'], canvas_height, transform_origin, transformation, style)
+
+    if instrumentation.stats is not None:
+        instrumentation.stats.count("paths")
+        instrumentation.stats.count("curves", len(path.curves))
+
+    return path
+
+
+def parse_root_images(root: ElementTree.Element, transform_origin=True, canvas_height=None, draw_hidden=False,
+                      visible_root=True, root_transformation=None) -> List[Image]:
+    """
+    Recursively parse the image elements among an etree root's children. Images which aren't embedded png data URIs
+    are skipped with a warning.
+
+    Takes the same parameters as parse_root.
 
+    :return: A list of decoded Images. Use Compiler.append_image to engrave them.
+    """
+    canvas_height = _canvas_height(root, canvas_height)
+
+    images = []
+    for element, transformation, _ in _walk(root, draw_hidden, visible_root, root_transformation):
+        if element.tag != "{%s}image" % NAMESPACES["svg"]:
+            continue
+
+        href = element.get("{%s}href" % NAMESPACES["xlink"], element.get("href"))
+        if href is None:
+            continue
+
+        try:
+            image = Image(href, _length(element.get('x')), _length(element.get('y')), _length(element.get('width')),
+                          _length(element.get('height')), canvas_height, transform_origin, transformation,
+                          element.get("preserveAspectRatio", "xMidYMid meet"))
+        except ValueError as value_error:
+            warnings.warn(f"Skipping image. {value_error}")
+            continue
+
+        images.append(image)
+
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("images")
+
+    return images
+
+
+def _canvas_height(root: ElementTree.Element, canvas_height):
     if canvas_height is None:
         height_str = root.get("height")
         canvas_height = float(height_str) if height_str.isnumeric() else float(height_str[:-2])
 
-    curves = []
+    return canvas_height
+
+
+def _length(value: str) -> float:
+    """Parse a length attribute in user units. Missing attributes are 0."""
+    if value is None:
+        return 0
+
+    return float(value[:-2]) if value.endswith("px") else float(value)
+
+
+def _walk(root: ElementTree.Element, draw_hidden, visible_root, root_transformation, root_style=None):
+    """
+    Recursively walk an etree root's children, yielding an (element, transformation, style) tuple for every element
+    which should be drawn. The transformation and the style include the ones inherited from the element's ancestors.
+    """
 
     # Draw visible elements (Depth-first search)
     for element in list(root):
@@ -61,17 +209,18 @@ def parse_root(root: ElementTree.Element, transform_origin=True, canvas_height=N
         # Override inherited visibility
         visible = visible or (_has_style(element, "visibility", "visible"))
 
+        style = dict(root_style) if root_style else {}
+        for key in STYLE_PROPERTIES:
+            value = _get_style(element, key)
+            if value is not None and value != "inherit":
+                style[key] = value
+
         # If the current element is opaque and visible, draw it
         if draw_hidden or visible:
-            if element.tag == "{%s}path" % NAMESPACES["svg"]:
-                path = Path(element.attrib['d'], canvas_height, transform_origin, transformation)
-                curves.extend(path.curves)
+            yield element, transformation, style
 
         # Continue the recursion
-        curves.extend(parse_root(element, transform_origin, canvas_height, draw_hidden, visible, transformation))
-
-    # ToDo implement shapes class
-    return curves
+        yield from _walk(element, draw_hidden, visible, transformation, style)
 
 
 def parse_string(svg_string: str, transform_origin=True, canvas_height=None, draw_hidden=False) -> List[Curve]:
@@ -86,8 +235,9 @@ def parse_string(svg_string: str, transform_origin=True, canvas_height=None, dra
         :param draw_hidden: Whether or not to draw hidden elements based on their display, visibility and opacity attributes.
         :return: A list of geometric curves describing the svg. Use the Compiler sub-module to compile them to gcode.
     """
-    root = ElementTree.fromstring(svg_string)
-    return parse_root(root, transform_origin, canvas_height, draw_hidden)
+    with instrumentation.stage("parse"):
+        root = ElementTree.fromstring(svg_string)
+        return parse_root(root, transform_origin, canvas_height, draw_hidden)
 
 
 def parse_file(file_path: str, transform_origin=True, canvas_height=None, draw_hidden=False) -> List[Curve]:
@@ -102,5 +252,40 @@ def parse_file(file_path: str, transform_origin=True, canvas_height=None, draw_h
             :param draw_hidden: Whether or not to draw hidden elements based on their display, visibility and opacity attributes.
             :return: A list of geometric curves describing the svg. Use the Compiler sub-module to compile them to gcode.
         """
-    root = ElementTree.parse(file_path).getroot()
-    return parse_root(root, transform_origin, canvas_height, draw_hidden)
+    with instrumentation.stage("parse"):
+        root = ElementTree.parse(file_path).getroot()
+        return parse_root(root, transform_origin, canvas_height, draw_hidden)
+
+
+def parse_file_paths(file_path: str, transform_origin=True, canvas_height=None, draw_hidden=False) -> List[Path]:
+    """
+    Recursively parse an svg file into Paths, which keep their curves together along with their style. (Wrapper for
+    parse_root_paths)
+
+    Takes the same parameters as parse_file.
+    """
+    with instrumentation.stage("parse"):
+        root = ElementTree.parse(file_path).getroot()
+        return parse_root_paths(root, transform_origin, canvas_height, draw_hidden)
+
+
+def parse_file_images(file_path: str, transform_origin=True, canvas_height=None, draw_hidden=False) -> List[Image]:
+    """
+    Recursively parse the image elements of an svg file. (Wrapper for parse_root_images)
+
+    Takes the same parameters as parse_file.
+    """
+    with instrumentation.stage("parse"):
+        root = ElementTree.parse(file_path).getroot()
+        return parse_root_images(root, transform_origin, canvas_height, draw_hidden)
+
+
+def parse_file_layers(file_path: str, transform_origin=True, canvas_height=None, draw_hidden=False) -> List[Layer]:
+    """
+    Recursively parse an svg file into Paths, grouped by Inkscape layer. (Wrapper for parse_root_layers)
+
+    Takes the same parameters as parse_file.
+    """
+    with instrumentation.stage("parse"):
+        root = ElementTree.parse(file_path).getroot()
+        return parse_root_layers(root, transform_origin, canvas_height, draw_hidden)
@@ -5,8 +5,10 @@ from typing import List
 
 from svg_to_gcode.geometry import Vector
 from svg_to_gcode.geometry import Line, EllipticalArc, CubicBazier, QuadraticBezier
+from svg_to_gcode.geometry import transform_points
 from svg_to_gcode.svg_parser import Transformation
 from svg_to_gcode import formulas
+from svg_to_gcode import instrumentation
 
 verbose = False
 
@@ -18,10 +20,18 @@ class Path:
                        'Q': 4, 'q': 4, 'S': 4, 's': 4, 'T': 2, 't': 2, 'A': 7, 'a': 7}
 
     __slots__ = "curves", "initial_point", "current_point", "last_control", "canvas_height", "draw_move", \
-                "transform_origin", "transformation"
+                "transform_origin", "transformation", "style"
 
-    def __init__(self, d: str, canvas_height: float, transform_origin=True, transformation=None):
+    def __init__(self, d: str, canvas_height: float, transform_origin=True, transformation=None, style=None):
+        """
+        :param d: the path's commands, the value of its d attribute.
+        :param canvas_height: the height of the canvas, used to transform the origin.
+        :param transform_origin: whether or not to transform coordinates to the bottom-left origin.
+        :param transformation: a Transformation to apply to every coordinate.
+        :param style: a dictionary of the path's presentation properties, like fill and fill-rule, and of its class.
+        """
         self.canvas_height = canvas_height
+        self.style = {} if style is None else style
         self.transform_origin = transform_origin
 
         self.curves = []
@@ -38,14 +48,37 @@ class Path:
         if transformation is not None:
             self.transformation.extend(transformation)
 
-        try:
-            self._parse_commands(d)
-        except Exception as generic_exception:
-            warnings.warn(f"Terminating path. The following unforeseen exception occurred: {generic_exception}")
+        with instrumentation.stage("path"):
+            try:
+                self._parse_commands(d)
+            except Exception as generic_exception:
+                warnings.warn(f"Terminating path. The following unforeseen exception occurred: {generic_exception}")
+
+            self._transform_curves()
 
     def __repr__(self):
         return f"Path({self.curves})"
 
+    def _transform_curves(self):
+        """
+        Build the curves which were parsed as (class, untransformed points) pairs, transforming the points of the whole
+        path in a single batch. Arcs are built while parsing, they apply their own transformation.
+        """
+        points = [(point.x, point.y) for curve in self.curves if isinstance(curve, tuple) for point in curve[1]]
+
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("transforms", len(points))
+            with instrumentation.stats.stage("transform"):
+                points = transform_points(self.transformation, points)
+        else:
+            points = transform_points(self.transformation, points)
+
+        points = iter(points)
+        for index, curve in enumerate(self.curves):
+            if isinstance(curve, tuple):
+                curve_class, curve_points = curve
+                self.curves[index] = curve_class(*(Vector(*next(points)) for _ in curve_points))
+
     def _parse_commands(self, d: str):
         """Parse svg commands (stored in value of the d key) into geometric curves."""
 
@@ -129,11 +162,14 @@ class Path:
 
         Each sub-method must be implemented with the following structure:
         def descriptive_name(*command_arguments):
-            execute calculations and transformations, **do not modify or create any instance variables**
+            execute calculations, **do not modify or create any instance variables**
             generate curve
             modify instance variables
             return curve
 
+        Lines and bezier curves are returned as (class, points) pairs of the class and its untransformed points, in the
+        order of its constructor's arguments. They are built once the whole path is parsed, see _transform_curves().
+
         Alternatively a sub-method may simply call a base command.
 
         :param command_key: a character representing a specific command based on the svg standard
@@ -154,8 +190,7 @@ class Path:
             start = self.current_point
             end = Vector(x, y)
 
-            line = Line(self.transformation.apply_affine_transformation(start),
-                        self.transformation.apply_affine_transformation(end))
+            line = (Line, (start, end))
 
             self.current_point = end
 
@@ -181,13 +216,8 @@ class Path:
 
         # Draw curvy curves
         def absolute_cubic_bazier(control1_x, control1_y, control2_x, control2_y, x, y):
-
-            trans_start = self.transformation.apply_affine_transformation(self.current_point)
-            trans_end = self.transformation.apply_affine_transformation(Vector(x, y))
-            trans_control1 = self.transformation.apply_affine_transformation(Vector(control1_x, control1_y))
-            trans_control2 = self.transformation.apply_affine_transformation(Vector(control2_x, control2_y))
-
-            cubic_bezier = CubicBazier(trans_start, trans_end, trans_control1, trans_control2)
+            cubic_bezier = (CubicBazier, (self.current_point, Vector(x, y), Vector(control1_x, control1_y),
+                                          Vector(control2_x, control2_y)))
 
             self.last_control = Vector(control2_x, control2_y)
             self.current_point = Vector(x, y)
@@ -219,12 +249,7 @@ class Path:
                                                    self.current_point.x + dx, self.current_point.y + dy)
 
         def absolute_quadratic_bazier(control1_x, control1_y, x, y):
-
-            trans_end = self.transformation.apply_affine_transformation(self.current_point)
-            trans_new_end = self.transformation.apply_affine_transformation(Vector(x, y))
-            trans_control1 = self.transformation.apply_affine_transformation(Vector(control1_x, control1_y))
-
-            quadratic_bezier = QuadraticBezier(trans_end, trans_new_end, trans_control1)
+            quadratic_bezier = (QuadraticBezier, (self.current_point, Vector(x, y), Vector(control1_x, control1_y)))
 
             self.last_control = Vector(control1_x, control1_y)
             self.current_point = Vector(x, y)
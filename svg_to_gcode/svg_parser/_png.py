@@ -0,0 +1,212 @@
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# The number of samples per pixel of each color type.
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# The bit depths the png standard allows for each color type.
+BIT_DEPTHS = {0: (1, 2, 4, 8, 16), 2: (8, 16), 3: (1, 2, 4, 8), 4: (8, 16), 6: (8, 16)}
+
+# The largest number of pixels decode_png accepts. Decoded pixels are held in python lists, which take far more memory
+# than the image file, so larger images must be scaled down before they're embedded.
+MAX_PIXELS = 2 ** 24
+
+# (x offset, y offset, x step, y step) of the seven passes of Adam7 interlacing.
+ADAM7 = ((0, 0, 8, 8), (4, 0, 8, 8), (0, 4, 4, 8), (2, 0, 4, 4), (0, 2, 2, 4), (1, 0, 2, 2), (0, 1, 1, 2))
+
+
+def _unfilter(data: bytes, offset: int, width: int, height: int, bits_per_pixel: int):
+    """
+    Reverse the filters of height scanlines starting at data[offset].
+
+    :return: (a list of scanlines as bytearrays, the offset of the following byte)
+    """
+    stride = (width * bits_per_pixel + 7) // 8
+    bpp = max(1, bits_per_pixel // 8)  # The distance to the corresponding byte of the previous pixel
+
+    scanlines = []
+    previous = bytearray(stride)
+    for _ in range(height):
+        filter_type = data[offset]
+        line = bytearray(data[offset + 1:offset + 1 + stride])
+        offset += 1 + stride
+
+        if filter_type == 1:  # Sub
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xff
+        elif filter_type == 2:  # Up
+            line = bytearray((a + b) & 0xff for a, b in zip(line, previous))
+        elif filter_type == 3:  # Average
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + previous[i]) >> 1)) & 0xff
+        elif filter_type == 4:  # Paeth
+            for i in range(stride):
+                a = line[i - bpp] if i >= bpp else 0
+                b = previous[i]
+                c = previous[i - bpp] if i >= bpp else 0
+                p = a + b - c
+                pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+                predictor = a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+                line[i] = (line[i] + predictor) & 0xff
+        elif filter_type != 0:
+            raise ValueError(f"Unknown png filter type {filter_type}")
+
+        scanlines.append(line)
+        previous = line
+
+    return scanlines, offset
+
+
+def _samples(line: bytearray, count: int, bit_depth: int) -> list:
+    """Unpack the first count samples of a scanline."""
+    if bit_depth == 8:
+        return list(line[:count])
+
+    if bit_depth == 16:
+        return list(struct.unpack(f">{count}H", bytes(line[:2 * count])))
+
+    per_byte = 8 // bit_depth
+    mask = (1 << bit_depth) - 1
+    shifts = [8 - bit_depth * (i + 1) for i in range(per_byte)]
+    return [(byte >> shift) & mask for byte in line for shift in shifts][:count]
+
+
+def decode_png(data: bytes):
+    """
+    Decode a png image to grayscale. Every color type, bit depth and interlacing method of the png standard is
+    supported. Transparent pixels are composited over white, which is what an engraver leaves untouched.
+
+    :param data: the contents of a png file.
+    :return: (width, height, rows), where rows is a list of height lists of width luminances between 0 (black) and 1
+    (white), from the top row of the image to the bottom one.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError("Not a png file, the signature is missing")
+
+    header = None
+    palette = None
+    transparency = None
+    compressed = []
+
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(data):
+        length, chunk_type = struct.unpack(">I4s", data[offset:offset + 8])
+        chunk = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+
+        if chunk_type == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif chunk_type == b"PLTE":
+            palette = [tuple(chunk[i:i + 3]) for i in range(0, len(chunk), 3)]
+        elif chunk_type == b"tRNS":
+            transparency = chunk
+        elif chunk_type == b"IDAT":
+            compressed.append(chunk)
+        elif chunk_type == b"IEND":
+            break
+
+    if header is None:
+        raise ValueError("Invalid png file, the IHDR chunk is missing")
+
+    width, height, bit_depth, color_type, _, _, interlace = header
+
+    if color_type not in CHANNELS:
+        raise ValueError(f"Unknown png color type {color_type}")
+
+    if bit_depth not in BIT_DEPTHS[color_type]:
+        raise ValueError(f"Invalid png file, color type {color_type} doesn't allow a bit depth of {bit_depth}")
+
+    if interlace not in (0, 1):
+        raise ValueError(f"Unknown png interlace method {interlace}")
+
+    if width == 0 or height == 0:
+        raise ValueError(f"Invalid png file, the image is {width}x{height} pixels")
+
+    # Checked before anything is allocated, such that a small file can't claim a huge image.
+    if width * height > MAX_PIXELS:
+        raise ValueError(f"The png image has {width}x{height} pixels, more than the maximum of {MAX_PIXELS}")
+
+    if color_type == 3 and palette is None:
+        raise ValueError("Invalid png file, a palette image without a PLTE chunk")
+
+    channels = CHANNELS[color_type]
+    bits_per_pixel = channels * bit_depth
+
+    # Decompress no more than the filtered scanlines the header announces, such that a small, malicious image can't
+    # expand to gigabytes.
+    if interlace == 0:
+        passes = [(width, height)]
+    else:
+        passes = [((width - x0 + dx - 1) // dx, (height - y0 + dy - 1) // dy) for x0, y0, dx, dy in ADAM7]
+
+    size = sum(pass_height * (1 + (pass_width * bits_per_pixel + 7) // 8) for pass_width, pass_height in passes
+               if pass_width > 0 and pass_height > 0)
+
+    decompressor = zlib.decompressobj()
+    try:
+        data = decompressor.decompress(b''.join(compressed), size)
+        overflow = decompressor.unconsumed_tail and decompressor.decompress(decompressor.unconsumed_tail, 1)
+    except zlib.error as error:
+        raise ValueError(f"Invalid png file, corrupt image data. {error}")
+
+    if overflow:
+        raise ValueError(f"Invalid png file, the image data expands beyond the {size} bytes of a {width}x{height} "
+                         f"image")
+
+    # Neither branch below allocates the pixels before the data is known to be complete.
+    if len(data) != size:
+        raise ValueError(f"Invalid png file, truncated image data. {len(data)} of the {size} bytes of a "
+                         f"{width}x{height} image")
+
+    # Decode the raw samples of every pixel, de-interlacing if necessary.
+    if interlace == 0:
+        scanlines, _ = _unfilter(data, 0, width, height, bits_per_pixel)
+        raw = [_samples(line, width * channels, bit_depth) for line in scanlines]
+    else:
+        raw = [[0] * (width * channels) for _ in range(height)]
+        offset = 0
+        for x0, y0, dx, dy in ADAM7:
+            pass_width, pass_height = (width - x0 + dx - 1) // dx, (height - y0 + dy - 1) // dy
+            if pass_width <= 0 or pass_height <= 0:
+                continue
+
+            scanlines, offset = _unfilter(data, offset, pass_width, pass_height, bits_per_pixel)
+            for row, line in zip(range(y0, height, dy), scanlines):
+                samples = _samples(line, pass_width * channels, bit_depth)
+                for i, column in enumerate(range(x0, width, dx)):
+                    raw[row][column * channels:(column + 1) * channels] = samples[i * channels:(i + 1) * channels]
+
+    maximum = (1 << bit_depth) - 1
+
+    # Convert to luminance, composited over white.
+    if color_type == 3:
+        alphas = list(transparency or b'') + [255] * (len(palette) - len(transparency or b''))
+        table = [((0.299 * r + 0.587 * g + 0.114 * b) / 255 * a + 255 - a) / 255
+                 for (r, g, b), a in zip(palette, alphas)]
+        return width, height, [[table[index] for index in row] for row in raw]
+
+    transparent = None
+    if transparency is not None:
+        transparent = struct.unpack(f">{len(transparency) // 2}H", transparency)
+
+    rows = []
+    for samples in raw:
+        if color_type in (0, 4):
+            gray = [value / maximum for value in samples[::channels]]
+        else:
+            gray = [(0.299 * r + 0.587 * g + 0.114 * b) / maximum
+                    for r, g, b in zip(samples[0::channels], samples[1::channels], samples[2::channels])]
+
+        if color_type in (4, 6):
+            gray = [value * alpha / maximum + 1 - alpha / maximum
+                    for value, alpha in zip(gray, samples[channels - 1::channels])]
+        elif transparent is not None:
+            pixels = zip(*(samples[i::channels] for i in range(channels)))
+            gray = [1 if pixel == transparent else value for value, pixel in zip(gray, pixels)]
+
+        rows.append(gray)
+
+    return width, height, rows
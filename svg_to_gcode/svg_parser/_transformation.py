@@ -2,6 +2,7 @@ import math
 from copy import deepcopy
 
 from svg_to_gcode.geometry import Vector, Matrix, IdentityMatrix
+from svg_to_gcode import instrumentation
 
 
 class Transformation:
@@ -132,6 +133,14 @@ class Transformation:
         Apply the full affine transformation (linear + translation) to a vector. Generally used to transform points.
         Eg the center of an ellipse.
         """
+        if instrumentation.stats is not None:
+            instrumentation.stats.count("transforms")
+            with instrumentation.stats.stage("transform"):
+                return self._apply_affine_transformation(vector)
+
+        return self._apply_affine_transformation(vector)
+
+    def _apply_affine_transformation(self, vector: Vector) -> Vector:
         vector_4d = Matrix([[vector.x], [vector.y], [1], [1]])
         vector_4d = self.translation_matrix * vector_4d
 
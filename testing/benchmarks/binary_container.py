@@ -0,0 +1,62 @@
+"""
+Compare the size and the encoding/decoding throughput of the binary container with the text path, for every example.
+Run from the repository root: python -m testing.benchmarks.binary_container
+"""
+
+import os
+import time
+import zlib
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces, encode, decode
+
+repeats = 3
+
+
+def best_time(function, *args):
+    """Return the fastest of several runs, in seconds, and the result of the function."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def benchmark(svg_file_name):
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 2)
+    gcode_compiler.append_curves(parse_file(svg_file_name))
+    gcode = gcode_compiler.compile(passes=2)
+    megabytes = len(gcode) / 10 ** 6
+
+    text_encode_time, text = best_time(str.encode, gcode)
+    text_decode_time, _ = best_time(bytes.decode, text)
+    gzip_encode_time, gzipped = best_time(zlib.compress, text, 6)
+    gzip_decode_time, _ = best_time(lambda data: zlib.decompress(data).decode(), gzipped)
+
+    raw_encode_time, raw = best_time(encode, gcode, 6, 4096, None)
+    raw_decode_time, _ = best_time(decode, raw)
+    binary_encode_time, binary = best_time(encode, gcode, 6, 4096, 6)
+    binary_decode_time, _ = best_time(decode, binary)
+
+    return [
+        ("text", len(text), megabytes / text_encode_time, megabytes / text_decode_time),
+        ("text+zlib", len(gzipped), megabytes / gzip_encode_time, megabytes / gzip_decode_time),
+        ("binary", len(raw), megabytes / raw_encode_time, megabytes / raw_decode_time),
+        ("binary+zlib", len(binary), megabytes / binary_encode_time, megabytes / binary_decode_time),
+    ]
+
+
+if __name__ == "__main__":
+    svg_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples")
+
+    print(f"{'example':<20}{'format':<14}{'bytes':>10}{'ratio':>8}{'encode MB/s':>14}{'decode MB/s':>14}")
+    for svg_name in sorted(os.listdir(svg_dir)):
+        results = benchmark(os.path.join(svg_dir, svg_name))
+        text_size = results[0][1]
+
+        for format_name, size, encode_speed, decode_speed in results:
+            print(f"{svg_name[:-4]:<20}{format_name:<14}{size:>10}{size / text_size:>8.3f}{encode_speed:>14.1f}"
+                  f"{decode_speed:>14.1f}")
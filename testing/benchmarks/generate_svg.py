@@ -0,0 +1,241 @@
+"""
+Generate reproducible, arbitrarily large svg files to test the parser's throughput and correctness at scale.
+
+Next to every svg, a json file records the number of curves the parser is expected to produce. Each drawing command
+(L, H, V, C, S, Q, T, A and Z) produces a curve, move commands don't.
+
+Run from the repository root:
+    python -m testing.benchmarks.generate_svg large.svg --paths 100000 --commands 10 --seed 1
+"""
+
+import argparse
+import json
+import math
+import random
+
+svg_namespace = "http://www.w3.org/2000/svg"
+xlink_namespace = "http://www.w3.org/1999/xlink"
+
+canvas_size = 1000
+
+
+class SvgGenerator:
+    """
+    The SvgGenerator class writes a random but reproducible svg. Paths are distributed over nested groups, some of
+    which are transformed or hidden, and some paths are referenced by <use> elements.
+    """
+
+    def __init__(self, seed=0, paths=1000, commands=10, depth=3, transform_ratio=0.3, arc_ratio=0.25,
+                 bezier_ratio=0.5, use_ratio=0.05, hidden_ratio=0.05, step=10):
+        """
+        :param seed: the seed of the random number generator. The same parameters and seed produce the same file.
+        :param paths: the number of <path> elements.
+        :param commands: the number of drawing commands per path.
+        :param depth: the maximum number of nested groups around a path.
+        :param transform_ratio: the fraction of groups and paths which have a transform attribute.
+        :param arc_ratio: the fraction of drawing commands which are elliptical arcs.
+        :param bezier_ratio: the fraction of drawing commands which are bezier curves. The rest are lines.
+        :param use_ratio: the number of <use> instances, as a fraction of the number of paths.
+        :param hidden_ratio: the fraction of groups and paths which are hidden, either by display or visibility.
+        :param step: the maximum distance between consecutive points and control points of a path. Keeps the number of
+        line segments each curve is approximated with realistic.
+        """
+        if arc_ratio + bezier_ratio > 1:
+            raise ValueError(f"arc_ratio + bezier_ratio can't exceed 1. Not {arc_ratio + bezier_ratio}")
+
+        self.random = random.Random(seed)
+        self.seed = seed
+        self.paths = paths
+        self.commands = commands
+        self.depth = depth
+        self.transform_ratio = transform_ratio
+        self.arc_ratio = arc_ratio
+        self.bezier_ratio = bezier_ratio
+        self.use_ratio = use_ratio
+        self.hidden_ratio = hidden_ratio
+        self.step = step
+
+        self.expected = {"paths": 0, "use_instances": 0, "curves": 0, "curves_draw_hidden": 0,
+                         "curves_display_none": 0, "curves_referenced_by_use": 0}
+
+    def _point(self, near=None):
+        """Return a random point on the canvas, within step of near if specified."""
+        if near is None:
+            return self.random.uniform(0, canvas_size), self.random.uniform(0, canvas_size)
+
+        return tuple(min(max(near[i] + self.random.uniform(-self.step, self.step), 0), canvas_size) for i in range(2))
+
+    def _transform(self):
+        kind = self.random.choice(["translate", "rotate", "scale", "matrix"])
+        if kind == "translate":
+            return f"translate({self.random.uniform(-50, 50):.3f}, {self.random.uniform(-50, 50):.3f})"
+        if kind == "rotate":
+            return f"rotate({self.random.uniform(-180, 180):.3f})"
+        if kind == "scale":
+            return f"scale({self.random.uniform(0.5, 2):.3f})"
+
+        a, d = self.random.uniform(0.5, 1.5), self.random.uniform(0.5, 1.5)
+        b, c = self.random.uniform(-0.3, 0.3), self.random.uniform(-0.3, 0.3)
+        return f"matrix({a:.3f} {b:.3f} {c:.3f} {d:.3f} {self.random.uniform(-50, 50):.3f} " \
+               f"{self.random.uniform(-50, 50):.3f})"
+
+    def _hidden_style(self):
+        """Return a style which hides the element, or '' for visible elements."""
+        if self.random.random() >= self.hidden_ratio:
+            return ''
+
+        return self.random.choice(["display:none", "visibility:hidden"])
+
+    def _path_data(self):
+        """Return the d attribute of a random path and the number of curves it describes."""
+        x, y = self._point()
+        d = [f"M {x:.3f} {y:.3f}"]
+
+        for _ in range(self.commands):
+            kind = self.random.random()
+            new_x, new_y = self._point((x, y))
+
+            # Consecutive points must differ, arcs between equal points are invalid.
+            while math.hypot(new_x - x, new_y - y) < self.step / 10:
+                new_x, new_y = self._point((x, y))
+
+            if kind < self.arc_ratio:
+                distance = math.hypot(new_x - x, new_y - y)
+                rx = self.random.uniform(distance / 2, distance * 2)
+                ry = self.random.uniform(distance / 2, distance * 2)
+                d.append(f"A {rx:.3f} {ry:.3f} {self.random.uniform(0, 180):.3f} {self.random.randint(0, 1)} "
+                         f"{self.random.randint(0, 1)} {new_x:.3f} {new_y:.3f}")
+
+            elif kind < self.arc_ratio + self.bezier_ratio / 2:
+                d.append("C {:.3f} {:.3f} {:.3f} {:.3f} {:.3f} {:.3f}".format(*self._point((x, y)),
+                                                                            *self._point((new_x, new_y)), new_x, new_y))
+
+            elif kind < self.arc_ratio + self.bezier_ratio:
+                d.append("Q {:.3f} {:.3f} {:.3f} {:.3f}".format(*self._point((x, y)), new_x, new_y))
+
+            else:
+                d.append(f"L {new_x:.3f} {new_y:.3f}")
+
+            x, y = new_x, new_y
+
+        curves = self.commands
+        if self.random.random() < 0.5:
+            d.append("Z")
+            curves += 1
+
+        return ' '.join(d), curves
+
+    def write(self, file_name: str):
+        """Write the svg to file_name and the expected counts to file_name's json sidecar. Return the counts."""
+        with open(file_name, 'w') as file:
+            file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                       f'<svg xmlns="{svg_namespace}" xmlns:xlink="{xlink_namespace}" width="{canvas_size}mm" '
+                       f'height="{canvas_size}mm">\n')
+
+            uses = round(self.paths * self.use_ratio)
+            referenced = set(self.random.sample(range(self.paths), min(uses, self.paths)))
+            path_curves = {}
+
+            # A stack of open groups. Each entry stores whether the group is displayed and visible.
+            groups = [(True, True)]
+
+            for index in range(self.paths):
+                # Randomly close and open groups, so paths end up at different depths.
+                while len(groups) > 1 and self.random.random() < 0.3:
+                    file.write("</g>\n")
+                    groups.pop()
+
+                while len(groups) <= self.depth and self.random.random() < 0.3:
+                    attributes = ''
+                    if self.random.random() < self.transform_ratio:
+                        attributes += f' transform="{self._transform()}"'
+
+                    style = self._hidden_style()
+                    if style:
+                        attributes += f' style="{style}"'
+
+                    displayed, visible = groups[-1]
+                    groups.append((displayed and style != "display:none", visible and style != "visibility:hidden"))
+                    file.write(f"<g{attributes}>\n")
+
+                d, curves = self._path_data()
+                path_curves[index] = curves
+
+                attributes = f'id="path{index}" d="{d}"'
+                if self.random.random() < self.transform_ratio:
+                    attributes += f' transform="{self._transform()}"'
+
+                style = self._hidden_style()
+                if style:
+                    attributes += f' style="{style}"'
+
+                displayed, visible = groups[-1]
+                displayed = displayed and style != "display:none"
+                visible = visible and style != "visibility:hidden"
+
+                self.expected["paths"] += 1
+                if not displayed:
+                    self.expected["curves_display_none"] += curves
+                elif visible:
+                    self.expected["curves"] += curves
+                    self.expected["curves_draw_hidden"] += curves
+                else:
+                    self.expected["curves_draw_hidden"] += curves
+
+                file.write(f"<path {attributes}/>\n")
+
+            while len(groups) > 1:
+                file.write("</g>\n")
+                groups.pop()
+
+            for index in sorted(referenced):
+                x, y = self._point()
+                file.write(f'<use xlink:href="#path{index}" x="{x:.3f}" y="{y:.3f}"/>\n')
+                self.expected["use_instances"] += 1
+                self.expected["curves_referenced_by_use"] += path_curves[index]
+
+            file.write("</svg>\n")
+
+        metadata = {
+            "parameters": {"seed": self.seed, "paths": self.paths, "commands": self.commands, "depth": self.depth,
+                           "transform_ratio": self.transform_ratio, "arc_ratio": self.arc_ratio,
+                           "bezier_ratio": self.bezier_ratio, "use_ratio": self.use_ratio,
+                           "hidden_ratio": self.hidden_ratio, "step": self.step},
+            "expected": self.expected
+        }
+
+        with open(sidecar_name(file_name), 'w') as file:
+            json.dump(metadata, file, indent=2)
+
+        return self.expected
+
+
+def sidecar_name(file_name: str) -> str:
+    """Return the name of the json file which stores the expected counts of a generated svg."""
+    return file_name[:-4] + ".json" if file_name.endswith(".svg") else file_name + ".json"
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument("file_name", help="where to save the svg. The expected counts are saved next to it as json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--paths", type=int, default=1000)
+    parser.add_argument("--commands", type=int, default=10, help="drawing commands per path")
+    parser.add_argument("--depth", type=int, default=3, help="maximum nesting depth of groups")
+    parser.add_argument("--transform-ratio", type=float, default=0.3)
+    parser.add_argument("--arc-ratio", type=float, default=0.25)
+    parser.add_argument("--bezier-ratio", type=float, default=0.5)
+    parser.add_argument("--use-ratio", type=float, default=0.05)
+    parser.add_argument("--hidden-ratio", type=float, default=0.05)
+    parser.add_argument("--step", type=float, default=10, help="maximum distance between consecutive points")
+    arguments = parser.parse_args(arguments)
+
+    generator = SvgGenerator(arguments.seed, arguments.paths, arguments.commands, arguments.depth,
+                             arguments.transform_ratio, arguments.arc_ratio, arguments.bezier_ratio,
+                             arguments.use_ratio, arguments.hidden_ratio, arguments.step)
+
+    print(generator.write(arguments.file_name))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Benchmark every stage of the pipeline over the bundled examples and over larger, generated inputs.
+
+Each phase is timed separately: parse, transform, flatten, emit and end_to_end. Throughput is recorded in paths/s,
+segments/s or MB/s, and the peak memory of each phase is measured in a separate, untimed run. Fast phases are repeated
+until they ran for at least --min-time seconds, the fastest run counts, such that small inputs aren't dominated by
+noise. Results are saved to
+json and compared against a stored baseline. If any throughput regresses by more than the threshold, the run fails.
+
+Run from the repository root:
+    python -m testing.benchmarks.run_benchmarks                    compare against baseline.json
+    python -m testing.benchmarks.run_benchmarks --update-baseline  store the current results as the new baseline
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from xml.etree import ElementTree
+
+from svg_to_gcode.svg_parser import parse_file, Transformation
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import LineSegmentChain, Vector, FLATTENING_CACHE
+
+from testing.benchmarks.generate_svg import SvgGenerator
+
+benchmark_dir = os.path.dirname(os.path.abspath(__file__))
+examples_dir = os.path.join(benchmark_dir, "..", "examples")
+default_baseline = os.path.join(benchmark_dir, "baseline.json")
+
+svg_namespace = "http://www.w3.org/2000/svg"
+
+
+def measure(function, repeats, trace_memory, min_time=0):
+    """
+    Run a function at least repeats times, and until the runs took min_time seconds in total.
+
+    :return: the fastest wall time in seconds, the peak memory in bytes of an additional traced run (or None) and the
+    result of the function.
+    """
+    best = float("inf")
+    result = None
+    runs, total = 0, 0
+    while runs < repeats or total < min_time:
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+
+        best = min(best, elapsed)
+        runs, total = runs + 1, total + elapsed
+
+    peak_memory = None
+    if trace_memory:
+        tracemalloc.start()
+        function()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return best, peak_memory, result
+
+
+def scaled_example(svg_file_name, copies, output_dir):
+    """Write an svg which contains copies of an example, each translated to avoid overlaps. Return its file name."""
+    tree = ElementTree.parse(svg_file_name)
+    root = tree.getroot()
+
+    children = list(root)
+    for child in children:
+        root.remove(child)
+
+    width = float(root.get("width").rstrip("m").rstrip("p"))
+    for copy in range(copies):
+        group = ElementTree.SubElement(root, "{%s}g" % svg_namespace)
+        group.set("transform", f"translate({copy * width}, 0)")
+        group.extend(children)
+
+    root.set("width", str(copies * width))
+
+    file_name = os.path.join(output_dir, f"{os.path.basename(svg_file_name)[:-4]}_x{copies}.svg")
+    tree.write(file_name)
+    return file_name
+
+
+def benchmark(svg_file_name, repeats, trace_memory, expected_curves=None, min_time=0):
+    """
+    Benchmark every phase for a single input. Return a dictionary of phases and their metrics.
+
+    :param expected_curves: the number of curves the parser should produce. If it produces a different number, a
+    ValueError is raised, a fast but incorrect parser isn't worth benchmarking.
+    :param min_time: the minimum total time of the timed runs of each phase, in seconds. See measure().
+    """
+    svg_size = os.path.getsize(svg_file_name)
+
+    def count_paths():
+        root = ElementTree.parse(svg_file_name).getroot()
+        return len(list(root.iter("{%s}path" % svg_namespace)))
+
+    paths = count_paths()
+
+    # parse
+    parse_time, parse_memory, curves = measure(lambda: parse_file(svg_file_name), repeats, trace_memory, min_time)
+
+    if expected_curves is not None and len(curves) != expected_curves:
+        raise ValueError(f"Parsing {svg_file_name} produced {len(curves)} curves. Expected {expected_curves}")
+
+    # transform
+    transformation = Transformation()
+    transformation.add_transform("translate(10, 20) rotate(30) scale(2, 3) skewX(5)")
+    points = [Vector(*curve.start) for curve in curves] + [Vector(*curve.end) for curve in curves]
+
+    def transform():
+        return [transformation.apply_affine_transformation(point) for point in points]
+
+    transform_time, transform_memory, _ = measure(transform, repeats, trace_memory, min_time)
+
+    # flatten. Every run approximates the curves from scratch, rather than returning the previous run's approximations.
+    def flatten():
+        FLATTENING_CACHE.clear()
+        return [LineSegmentChain.line_segment_approximation(curve) for curve in curves]
+
+    flatten_time, flatten_memory, chains = measure(flatten, repeats, trace_memory, min_time)
+    segments = sum(chain.chain_size() for chain in chains)
+
+    # emit
+    def emit():
+        gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 2)
+        for chain in chains:
+            gcode_compiler.append_line_chain(chain)
+        return gcode_compiler.compile(passes=1)
+
+    emit_time, emit_memory, gcode = measure(emit, repeats, trace_memory, min_time)
+    output_megabytes = len(gcode) / 10 ** 6
+
+    # end_to_end
+    def end_to_end():
+        gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 2)
+        gcode_compiler.append_curves(parse_file(svg_file_name))
+        return gcode_compiler.compile(passes=1)
+
+    end_to_end_time, end_to_end_memory, _ = measure(end_to_end, repeats, trace_memory, min_time)
+
+    return {
+        "size": {"svg_bytes": svg_size, "paths": paths, "curves": len(curves), "segments": segments,
+                 "gcode_bytes": len(gcode)},
+        "parse": {"seconds": parse_time, "paths_per_second": paths / parse_time,
+                  "curves_per_second": len(curves) / parse_time, "peak_memory": parse_memory},
+        "transform": {"seconds": transform_time, "points_per_second": len(points) / transform_time,
+                      "peak_memory": transform_memory},
+        "flatten": {"seconds": flatten_time, "segments_per_second": segments / flatten_time,
+                    "peak_memory": flatten_memory},
+        "emit": {"seconds": emit_time, "segments_per_second": segments / emit_time,
+                 "output_mb_per_second": output_megabytes / emit_time, "peak_memory": emit_memory},
+        "end_to_end": {"seconds": end_to_end_time, "paths_per_second": paths / end_to_end_time,
+                       "output_mb_per_second": output_megabytes / end_to_end_time, "peak_memory": end_to_end_memory},
+    }
+
+
+def compare(results, baseline, threshold, min_seconds=0.005):
+    """
+    Compare throughput metrics (anything measured per second) with the baseline. Phases which took less than
+    min_seconds in the baseline are too noisy to compare and are skipped.
+
+    :return: a list of human readable regressions.
+    """
+    regressions = []
+    for input_name, phases in baseline.items():
+        for phase, metrics in phases.items():
+            if metrics.get("seconds", min_seconds) < min_seconds or input_name not in results:
+                continue
+
+            for metric, baseline_value in metrics.items():
+                if not metric.endswith("per_second"):
+                    continue
+
+                value = results[input_name][phase][metric]
+                if value < baseline_value * (1 - threshold):
+                    regressions.append(f"{input_name} {phase} {metric}: {value:.1f} < {baseline_value:.1f} "
+                                       f"({value / baseline_value - 1:+.0%})")
+
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument("--repeats", type=int, default=3, help="number of timed runs per phase, the fastest counts")
+    parser.add_argument("--min-time", type=float, default=1.0,
+                        help="repeat each phase until its timed runs took at least this many seconds in total")
+    parser.add_argument("--copies", type=int, nargs="*", default=[10],
+                        help="generate larger inputs which contain this many copies of hiking.svg")
+    parser.add_argument("--generated", type=int, nargs="*", default=[100],
+                        help="generate synthetic inputs with this many paths, see generate_svg.py")
+    parser.add_argument("--output", help="save the results to this json file")
+    parser.add_argument("--baseline", default=default_baseline, help="the json file to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="maximum tolerated slowdown of any throughput metric, as a fraction")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurements")
+    arguments = parser.parse_args(arguments)
+
+    with tempfile.TemporaryDirectory() as generated_dir:
+        inputs = {name[:-4]: os.path.join(examples_dir, name) for name in sorted(os.listdir(examples_dir))
+                  if name.endswith(".svg")}
+
+        for copies in arguments.copies:
+            file_name = scaled_example(inputs["hiking"], copies, generated_dir)
+            inputs[os.path.basename(file_name)[:-4]] = file_name
+
+        expected_curves = {}
+        for paths in arguments.generated:
+            name = f"synthetic_{paths}"
+            inputs[name] = os.path.join(generated_dir, name + ".svg")
+            expected_curves[name] = SvgGenerator(seed=0, paths=paths).write(inputs[name])["curves"]
+
+        results = {}
+        for name, file_name in inputs.items():
+            results[name] = benchmark(file_name, arguments.repeats, not arguments.no_memory, expected_curves.get(name),
+                                      arguments.min_time)
+
+            phases = results[name]
+            print(f"{name:<20} parse {phases['parse']['paths_per_second']:>9.0f} paths/s   "
+                  f"flatten {phases['flatten']['segments_per_second']:>9.0f} segments/s   "
+                  f"emit {phases['emit']['output_mb_per_second']:>6.2f} MB/s   "
+                  f"end_to_end {phases['end_to_end']['seconds']:>7.3f}s")
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.update_baseline:
+        with open(arguments.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Saved the baseline to {arguments.baseline}")
+        return 0
+
+    if not os.path.isfile(arguments.baseline):
+        print(f"There is no baseline at {arguments.baseline}. Run with --update-baseline to create one.")
+        return 0
+
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)
+
+    regressions = compare(results, baseline, arguments.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} metrics regressed by more than {arguments.threshold:.0%}:")
+        print('\n'.join(regressions))
+        return 1
+
+    print(f"\nNo metric regressed by more than {arguments.threshold:.0%} compared to the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
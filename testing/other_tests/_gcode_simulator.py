@@ -0,0 +1,115 @@
+"""
+A minimal gcode interpreter used by tests which need to verify that two gcode programs are equivalent. It only
+understands the subset of gcode emitted by the interfaces in this library.
+"""
+
+from svg_to_gcode import TOLERANCES
+
+
+def simulate(gcode: str, resolution=None):
+    """
+    Execute a gcode program and return the trace of the tool. Moves which don't change the position of the tool are
+    omitted, such that programs which only differ by redundant commands produce the same trace.
+
+    :param gcode: the program to execute.
+    :param resolution: if specified, positions are rounded to the nearest multiple of resolution, like on a machine.
+
+    :return: a list of (x, y, z, feed, power) tuples. One for each move. Positions are in machine coordinates, which
+    only differ from program coordinates after G92.
+    """
+    position = [0, 0, 0]
+    offset = [0, 0, 0]
+    absolute = True
+    feed = None
+    power = 0
+
+    trace = []
+    for line in _expand_subroutines(gcode.split('\n')):
+        words = {}
+        for word in line.split():
+            words[word[0]] = float(word[1:]) if len(word) > 1 else None
+
+        if "G" in words and words["G"] == 90:
+            absolute = True
+            continue
+
+        if "G" in words and words["G"] == 91:
+            absolute = False
+            continue
+
+        if "M" in words:
+            if words["M"] in (3, 106):
+                power = words.get("S", 255)
+            if words["M"] in (5, 107):
+                power = 0
+            continue
+
+        if "G" in words and words["G"] == 92:
+            for axis, index in zip("XYZ", range(3)):
+                if axis in words:
+                    offset[index] = position[index] - words[axis]
+            continue
+
+        if "G" in words and words["G"] not in (0, 1):
+            continue
+
+        if "F" in words:
+            feed = words["F"]
+
+        new_position = list(position)
+        for axis, index in zip("XYZ", range(3)):
+            if axis in words:
+                new_position[index] = words[axis] + offset[index] if absolute else position[index] + words[axis]
+
+        if resolution is not None:
+            new_position = [round(value / resolution) * resolution for value in new_position]
+
+        if max(abs(a - b) for a, b in zip(position, new_position)) > 0:
+            trace.append((*new_position, feed, power))
+
+        position = new_position
+
+    return trace
+
+
+def _expand_subroutines(lines):
+    """Strip comments and empty lines, replacing every o-word subroutine call with the body of the subroutine."""
+    subroutines = {}
+    expanded = []
+
+    current = None
+    for line in lines:
+        line = line.split(';')[0].strip()
+        if not line:
+            continue
+
+        if line[0] in "oO":
+            name, keyword = line.split()[:2]
+            name = name.lower()
+
+            if keyword == "sub":
+                current = subroutines[name] = []
+            elif keyword == "endsub":
+                current = None
+            elif keyword == "call":
+                expanded.extend(subroutines[name])
+            continue
+
+        (expanded if current is None else current).append(line)
+
+    return expanded
+
+
+def equivalent_traces(trace1, trace2, tolerance=TOLERANCES["operation"]):
+    """Check if two traces visit the same positions, with the same speed and power, within tolerance."""
+    if len(trace1) != len(trace2):
+        print(f"Traces have a different number of moves {len(trace1)} != {len(trace2)}")
+        return False
+
+    for move1, move2 in zip(trace1, trace2):
+        if any(abs(value1 - value2) > tolerance for value1, value2 in zip(move1[:3], move2[:3])) \
+                or move1[3:] != move2[3:]:
+            print(f"Different moves {move1} != {move2}")
+            return False
+
+    return True
@@ -0,0 +1,58 @@
+import functools
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+
+from testing.other_tests._gcode_simulator import simulate, equivalent_traces
+
+
+def cuts(trace):
+    return [move for move in trace if move[4] > 0]
+
+
+def run_test(svg_file_name, _):
+    curves = parse_file(svg_file_name)
+    columns, rows, spacing = 3, 2, (120, 90)
+
+    # Cut in serpentine order
+    placements = [(0, 0), (120, 0), (240, 0), (240, 90), (120, 90), (0, 90)]
+
+    for interface_class, resolution in [(interfaces.Gcode, None),
+                                        (functools.partial(interfaces.CompactGcode, resolution=0.001), 0.001)]:
+        tolerance = 2 * (resolution or 1e-6)
+
+        single_compiler = Compiler(interface_class, 1000, 300, 2, dwell_time=200)
+        single_compiler.append_curves(curves)
+        single_trace = simulate(single_compiler.compile(passes=2), resolution)
+
+        expected = []
+        for x, y in placements:
+            expected.extend((move[0] + x, move[1] + y, *move[2:]) for move in cuts(single_trace))
+
+        for subroutine in [False, True]:
+            array_compiler = Compiler(interface_class, 1000, 300, 2, dwell_time=200)
+            array_compiler.append_curves(curves)
+            gcode = array_compiler.compile_array(columns, rows, spacing, passes=2, subroutine=subroutine)
+
+            if not equivalent_traces(cuts(simulate(gcode, resolution)), expected, tolerance):
+                print(f"The copies weren't cut in the right place, subroutine={subroutine}")
+                return False
+
+            # The origin and the height are restored.
+            end = simulate(gcode + "\nG90\nG1 X0 Y0", resolution)[-1]
+            if any(abs(value) > tolerance for value in end[:3]):
+                print(f"The origin wasn't restored: {end}")
+                return False
+
+        # With subroutines, each copy costs two lines: a translation and a call.
+        sizes = []
+        for copies in [2, 20]:
+            array_compiler = Compiler(interface_class, 1000, 300, 2, dwell_time=200)
+            array_compiler.append_curves(curves)
+            sizes.append(len(array_compiler.compile_array(copies, 1, spacing, passes=2, subroutine=True).split('\n')))
+
+        if sizes[1] - sizes[0] != 2 * 18:
+            print(f"The size of the program grows by {sizes[1] - sizes[0]} lines for 18 more copies")
+            return False
+
+    return True
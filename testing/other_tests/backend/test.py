@@ -0,0 +1,149 @@
+import os
+import warnings
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Vector, Line, EllipticalArc, LineSegmentChain, BACKENDS, set_backend, get_backend, \
+    evaluate_points, transform_points, flatten_curve
+from svg_to_gcode.geometry import _backend
+from svg_to_gcode import TOLERANCES
+
+POINTS = [(0, 0), (-0.0, -0.0), (1, 2), (-3.5, 7)]
+
+
+def available_backends():
+    return [name for name in BACKENDS if name == "python" or _backend.numpy is not None]
+
+
+def close(points1, points2, tolerance=1e-9):
+    return len(points1) == len(points2) and \
+        all(abs(x1 - x2) <= tolerance and abs(y1 - y2) <= tolerance for (x1, y1), (x2, y2) in zip(points1, points2))
+
+
+def results(curves):
+    """Everything the backend computes for some curves."""
+    ts = [i / 50 for i in range(51)]
+    evaluated = [evaluate_points(curve, ts) for curve in curves]
+    flattened = [flatten_curve(curve) for curve in curves]
+    transformed = [transform_points(curve.transformation, POINTS) for curve in curves
+                   if isinstance(curve, EllipticalArc) and curve.transformation]
+
+    return evaluated, flattened, transformed
+
+
+def default_backend(value):
+    """The backend selected by SVG_TO_GCODE_BACKEND=value, and whether or not a warning was issued."""
+    previous = os.environ.get("SVG_TO_GCODE_BACKEND")
+    os.environ["SVG_TO_GCODE_BACKEND"] = value
+    try:
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            return _backend._default_backend(), bool(caught)
+    finally:
+        if previous is None:
+            del os.environ["SVG_TO_GCODE_BACKEND"]
+        else:
+            os.environ["SVG_TO_GCODE_BACKEND"] = previous
+
+
+def run_test(svg_file_name, _):
+    curves = parse_file(svg_file_name)
+    selected = get_backend()
+
+    # Every available backend computes the same points.
+    try:
+        runs = {}
+        for name in available_backends():
+            set_backend(name)
+            runs[name] = results(curves)
+    finally:
+        set_backend(selected)
+
+    for name, (evaluated, flattened, transformed) in runs.items():
+        expected_evaluated, expected_flattened, expected_transformed = runs["python"]
+        if not all(close(a, b) for a, b in zip(evaluated + transformed, expected_evaluated + expected_transformed)) or \
+                not all(a is None and b is None or close(a, b) for a, b in zip(flattened, expected_flattened)):
+            print(f"The {name} backend differs from the python backend")
+            return False
+
+    # The python backend evaluates curves like Curve.point.
+    evaluated, flattened, transformed = runs["python"]
+    ts = [i / 50 for i in range(51)]
+    for curve, points in zip(curves, evaluated):
+        if not isinstance(curve, Line) and points != [(point.x, point.y) for point in map(curve.point, ts)]:
+            print(f"Evaluating {curve} differs from Curve.point")
+            return False
+
+    # The python backend transforms points exactly like apply_affine_transformation, which the parser relies on.
+    arcs = [curve for curve in curves if isinstance(curve, EllipticalArc) and curve.transformation]
+    for curve, points in zip(arcs, transformed):
+        expected = [curve.transformation.apply_affine_transformation(Vector(*point)) for point in POINTS]
+        if repr(points) != repr([(point.x, point.y) for point in expected]):
+            print("Transforming points differs from apply_affine_transformation")
+            return False
+
+    # Flattened curves stay within tolerance of the curve, between their vertices too.
+    for curve, points in zip(curves, flattened):
+        segments = len(points) - 1
+        for i, (start, end) in enumerate(zip(points, points[1:])):
+            for j in range(1, 8):
+                t = (i + j / 8) / segments
+                x, y = start[0] + j / 8 * (end[0] - start[0]), start[1] + j / 8 * (end[1] - start[1])
+                point = curve.start + t * (curve.end - curve.start) if isinstance(curve, Line) else curve.point(t)
+
+                if abs(point - Vector(x, y)) > TOLERANCES["approximation"] + 1e-9:
+                    print(f"Flattening {curve} strays {abs(point - Vector(x, y))} from it")
+                    return False
+
+    # Vertical lines are interpolated, not evaluated through their slope.
+    if evaluate_points(Line(Vector(1, 0), Vector(1, 10)), [0.5]) != [(1, 5)]:
+        print("A vertical line was evaluated incorrectly")
+        return False
+
+    # The compiler's uniform flattening cuts the same segments, plus one travel move after each M5.
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, flattening="uniform")
+    gcode_compiler.append_curves(curves)
+
+    moves = sum(1 for command in gcode_compiler.body if command.startswith("G1"))
+    travels = sum(1 for command in gcode_compiler.body if command.startswith("M5"))
+    if moves - travels != sum(len(points) - 1 for points in flattened):
+        print("The compiler's uniform flattening differs from flatten_curve")
+        return False
+
+    # The environment variable selects a backend, unknown and missing ones fall back with a warning.
+    fallback = "numpy" if _backend.numpy is not None else "python"
+    if default_backend("python") != ("python", False) or default_backend("nonsense") != (fallback, True):
+        print("SVG_TO_GCODE_BACKEND wasn't respected")
+        return False
+
+    if _backend.numpy is None:
+        if default_backend("numpy") != ("python", True):
+            print("A missing numpy didn't fall back to python")
+            return False
+
+        try:
+            set_backend("numpy")
+        except ImportError:
+            pass
+        else:
+            set_backend(selected)
+            print("Selecting numpy without numpy didn't raise an ImportError")
+            return False
+
+    try:
+        set_backend("fortran")
+    except ValueError:
+        pass
+    else:
+        print("An unknown backend was accepted")
+        return False
+
+    try:
+        Compiler(interfaces.Gcode, 1000, 300, 0, flattening="exact")
+    except ValueError:
+        pass
+    else:
+        print("An unknown flattening was accepted")
+        return False
+
+    return True
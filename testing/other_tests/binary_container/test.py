@@ -0,0 +1,51 @@
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces, encode, decode
+
+from svg_to_gcode import TOLERANCES
+
+
+def equivalent_lines(line1, line2):
+    """Check if two lines contain the same words, with numbers equal within operational tolerance."""
+    words1, words2 = line1.replace(';', '').split(), line2.replace(';', '').split()
+
+    if len(words1) != len(words2) or line1.endswith(';') != line2.endswith(';'):
+        return False
+
+    for word1, word2 in zip(words1, words2):
+        if word1 == word2:
+            continue
+
+        try:
+            if word1[0] != word2[0] or abs(float(word1[1:]) - float(word2[1:])) > TOLERANCES["operation"]:
+                return False
+        except ValueError:
+            return False
+
+    return True
+
+
+def run_test(svg_file_name, _):
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 2, dwell_time=200)
+    gcode_compiler.append_curves(parse_file(svg_file_name))
+    gcode = gcode_compiler.compile(passes=2) + "\nM106 S127.5;\nG0 X1 Y2 ; unsupported commands are stored verbatim"
+
+    # Small blocks exercise block boundaries, which reset the delta encoding.
+    for block_size, compression_level in [(4096, 6), (7, None), (1, 9)]:
+        data = encode(gcode, gcode_compiler.interface.precision, block_size, compression_level)
+        decoded = decode(data)
+
+        lines, decoded_lines = gcode.split('\n'), decoded.split('\n')
+        if len(lines) != len(decoded_lines):
+            print(f"Decoded {len(decoded_lines)} lines instead of {len(lines)}")
+            return False
+
+        for line, decoded_line in zip(lines, decoded_lines):
+            if not equivalent_lines(line, decoded_line):
+                print(f"Decoded '{decoded_line}' instead of '{line}'")
+                return False
+
+        if len(data) >= len(gcode.encode()):
+            print(f"The container ({len(data)} bytes) isn't smaller than the text ({len(gcode)} bytes)")
+            return False
+
+    return True
@@ -0,0 +1,73 @@
+import contextlib
+import functools
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode import cli
+
+
+def run_test(svg_file_name, _):
+    expected_compiler = Compiler(functools.partial(interfaces.CompactGcode, resolution=0.01), 1000, 300, 2,
+                                 dwell_time=200)
+    expected_compiler.append_curves(parse_file(svg_file_name))
+    expected = expected_compiler.compile(passes=2)
+
+    with tempfile.TemporaryDirectory() as directory:
+        inputs = [os.path.join(directory, f"copy{i}.svg") for i in range(3)]
+        for input_file_name in inputs:
+            shutil.copy(svg_file_name, input_file_name)
+
+        config_file_name = os.path.join(directory, "machine.json")
+        with open(config_file_name, 'w') as file:
+            json.dump({"movement-speed": 1000, "cutting_speed": 300, "pass-depth": 5, "interface": "compact"}, file)
+
+        output_dir = os.path.join(directory, "output")
+
+        # Flags override the config file.
+        arguments = inputs + ["--config", config_file_name, "--output-dir", output_dir, "--pass-depth", "2",
+                              "--passes", "2", "--dwell-time", "200", "--resolution", "0.01"]
+
+        cache_arguments = ["--cache-dir", os.path.join(directory, "cache")]
+
+        # The copies are identical, so only the first is compiled when the cache is enabled.
+        runs = [(["--jobs", "1"], 0), (["--jobs", "2"], 0), (cache_arguments + ["--jobs", "1"], len(inputs) - 1),
+                (cache_arguments + ["--jobs", "2"], len(inputs))]
+
+        for extra_arguments, hits in runs:
+            with contextlib.redirect_stdout(io.StringIO()) as report:
+                exit_code = cli.main(arguments + extra_arguments)
+
+            if exit_code != 0:
+                print(f"svg2gcode exited with {exit_code}")
+                return False
+
+            for input_file_name in inputs:
+                output_file_name = os.path.join(output_dir, os.path.basename(input_file_name)[:-4] + ".gcode")
+
+                with open(output_file_name) as file:
+                    if file.read() != expected:
+                        print(f"{output_file_name} differs from the output of the Compiler")
+                        return False
+
+                if input_file_name not in report.getvalue():
+                    print(f"The report doesn't mention {input_file_name}")
+                    return False
+
+                if f"{os.path.getsize(output_file_name)} bytes" not in report.getvalue():
+                    print(f"The report doesn't mention the size of {output_file_name}")
+                    return False
+
+            if report.getvalue().count("(cached)") != hits:
+                print(f"Expected {hits} cache hits with {extra_arguments}")
+                return False
+
+            if any(name.endswith(".tmp") for name in os.listdir(output_dir)):
+                print("Temporary files were left behind")
+                return False
+
+    return True
@@ -0,0 +1,103 @@
+import random
+import warnings
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Line, Vector, BoundingBoxIndex, liang_barsky, boxes_overlap
+
+from testing.other_tests._gcode_simulator import simulate
+
+tolerance = 10 ** -5
+
+
+def cut_segments(gcode):
+    """The (start, end) tuples of every move made with the laser on."""
+    trace = simulate(gcode)
+    positions = [(0, 0)] + [move[:2] for move in trace]
+    return [(Vector(*start), Vector(*end)) for start, end, move in zip(positions, positions[1:], trace) if move[4] > 0]
+
+
+def length_inside(segments, window):
+    length = 0
+    for start, end in segments:
+        clipped = liang_barsky(Line(start, end), window)
+        if clipped is not None:
+            length += (clipped[1] - clipped[0]) * abs(end - start)
+    return length
+
+
+def compile_body(curves, clip_window=None):
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, clip_window=clip_window)
+    gcode_compiler.append_curves(curves)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return gcode_compiler.compile(), gcode_compiler.body
+
+
+def run_test(svg_file_name, _):
+    curves = parse_file(svg_file_name)
+
+    # Bounding boxes must contain the whole curve. The box of a line is trivially correct, and Line.point is imprecise
+    # on near vertical lines.
+    for curve in curves:
+        if isinstance(curve, Line):
+            continue
+
+        min_x, min_y, max_x, max_y = curve.bounding_box()
+        for i in range(51):
+            point = curve.point(i / 50)
+            if not (min_x - tolerance <= point.x <= max_x + tolerance
+                    and min_y - tolerance <= point.y <= max_y + tolerance):
+                print(f"{point} is outside of the bounding box of {curve}")
+                return False
+
+    index = BoundingBoxIndex(curves)
+    boxes = [curve.bounding_box() for curve in curves]
+    min_x, min_y = min(box[0] for box in boxes), min(box[1] for box in boxes)
+    max_x, max_y = max(box[2] for box in boxes), max(box[3] for box in boxes)
+    width, height = max_x - min_x, max_y - min_y
+
+    # The index returns the same curves as testing every bounding box.
+    generator = random.Random(0)
+    for _ in range(50):
+        x, y = generator.uniform(min_x, max_x), generator.uniform(min_y, max_y)
+        window = (x, y, x + generator.uniform(0, width), y + generator.uniform(0, height))
+
+        expected = [curve for curve, box in zip(curves, boxes) if boxes_overlap(box, window)]
+        if [curve for curve, _ in index.query(window)] != expected:
+            print(f"The index returned different curves for {window}")
+            return False
+
+    unclipped_gcode, unclipped_body = compile_body(curves)
+    segments = cut_segments(unclipped_gcode)
+
+    # A window around everything changes nothing.
+    if compile_body(curves, (min_x - 1, min_y - 1, max_x + 1, max_y + 1))[1] != unclipped_body:
+        print("A window containing everything changed the output")
+        return False
+
+    # Nothing is drawn outside a window.
+    if compile_body(curves, (max_x + 1, max_y + 1, max_x + 2, max_y + 2))[1]:
+        print("Curves outside the window were drawn")
+        return False
+
+    # Partially clipped, exactly the parts of the cuts inside the window remain.
+    for window in [(min_x + width / 4, min_y + height / 4, max_x - width / 4, max_y - height / 4),
+                   (min_x - 1, min_y + height / 3, min_x + width / 2, max_y + 1)]:
+        clipped_segments = cut_segments(compile_body(curves, window)[0])
+
+        for start, end in clipped_segments:
+            for point in (start, end):
+                if not (window[0] - tolerance <= point.x <= window[2] + tolerance
+                        and window[1] - tolerance <= point.y <= window[3] + tolerance):
+                    print(f"{point} is outside of the window {window}")
+                    return False
+
+        expected_length = length_inside(segments, window)
+        clipped_length = sum(abs(end - start) for start, end in clipped_segments)
+        if abs(expected_length - clipped_length) > 10 ** -3 * max(1, expected_length):
+            print(f"{clipped_length} was cut inside the window instead of {expected_length}")
+            return False
+
+    return True
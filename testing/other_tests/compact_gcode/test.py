@@ -0,0 +1,39 @@
+from functools import partial
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode import TOLERANCES
+
+from testing.other_tests._gcode_simulator import simulate, equivalent_traces
+
+resolution = 0.001
+
+
+def compile_file(svg_file_name, interface_class):
+    gcode_compiler = Compiler(interface_class, 1000, 300, 2)
+    gcode_compiler.append_curves(parse_file(svg_file_name))
+    return gcode_compiler.compile(passes=3)
+
+
+def run_test(svg_file_name, _):
+    reference = simulate(compile_file(svg_file_name, interfaces.Gcode), resolution)
+
+    variants = [
+        partial(interfaces.CompactGcode, resolution=resolution),
+        partial(interfaces.CompactGcode, resolution=resolution, relative_moves=True),
+        partial(interfaces.CompactGcode, resolution=resolution, relative_moves=True, modal_motion=True)
+    ]
+
+    # Rounding positions to the machine resolution can move them by one step.
+    for variant in variants:
+        gcode = compile_file(svg_file_name, variant)
+
+        if variant.keywords.get("modal_motion"):
+            # The simulator requires explicit motion commands.
+            gcode = '\n'.join(line if line[0] in "GM" else "G1 " + line for line in gcode.split('\n'))
+
+        if not equivalent_traces(reference, simulate(gcode, resolution), tolerance=resolution + TOLERANCES["operation"]):
+            print(f"{variant.keywords} is not equivalent to the Gcode interface")
+            return False
+
+    return True
@@ -0,0 +1,73 @@
+import functools
+import os
+import tempfile
+import time
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.cache import CompileCache
+from svg_to_gcode import instrumentation
+
+
+def run_test(svg_file_name, _):
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 2, dwell_time=200)
+    gcode_compiler.append_curves(parse_file(svg_file_name))
+    expected = gcode_compiler.compile(passes=2)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CompileCache(directory)
+
+        if cache.compile_file(svg_file_name, interfaces.Gcode, 1000, 300, 2, passes=2, dwell_time=200) != expected:
+            print("A miss returned a different program than the Compiler")
+            return False
+
+        # A hit must not parse or approximate anything.
+        with instrumentation.instrument() as stats:
+            gcode = cache.compile_file(svg_file_name, interfaces.Gcode, 1000, 300, 2, passes=2, dwell_time=200)
+
+        if gcode != expected or "parse" in stats.stages or "approximation" in stats.stages:
+            print("A hit returned a different program or wasn't served from the cache")
+            return False
+
+        if (cache.hits, cache.misses) != (1, 1):
+            print(f"Expected 1 hit and 1 miss. Got {cache.hits} and {cache.misses}")
+            return False
+
+        # Any change to the settings is a different entry.
+        variants = [
+            ((interfaces.Gcode, 1000, 300, 2), {"passes": 1, "dwell_time": 200}),
+            ((interfaces.Gcode, 1000, 301, 2), {"passes": 2, "dwell_time": 200}),
+            ((functools.partial(interfaces.CompactGcode, resolution=0.01), 1000, 300, 2), {"passes": 2}),
+            ((functools.partial(interfaces.CompactGcode, resolution=0.1), 1000, 300, 2), {"passes": 2}),
+            ((interfaces.Gcode, 1000, 300, 2),
+             {"passes": 2, "dwell_time": 200, "parser_options": {"draw_hidden": True}}),
+        ]
+        for arguments, keywords in variants:
+            cache.compile_file(svg_file_name, *arguments, **keywords)
+
+        if cache.misses != 1 + len(variants):
+            print(f"{1 + len(variants) - cache.misses} variants were wrongly served from the cache")
+            return False
+
+        # Touch the first entry so it's the most recently used, then shrink the cache until only it fits.
+        time.sleep(0.01)
+        cache.compile_file(svg_file_name, interfaces.Gcode, 1000, 300, 2, passes=2, dwell_time=200)
+
+        small_cache = CompileCache(directory, max_size=len(expected))
+        small_cache.evict()
+
+        remaining = [name for _, _, name in small_cache._entries()]
+        if small_cache.size() > len(expected) or len(remaining) != 1:
+            print(f"Eviction left {len(remaining)} entries and {small_cache.size()} bytes")
+            return False
+
+        small_cache.compile_file(svg_file_name, interfaces.Gcode, 1000, 300, 2, passes=2, dwell_time=200)
+        if small_cache.hits != 1:
+            print("The most recently used entry was evicted")
+            return False
+
+        if any(name.endswith(".tmp") for _, _, names in os.walk(directory) for name in names):
+            print("Temporary files were left behind")
+            return False
+
+    return True
@@ -0,0 +1,129 @@
+import math
+import random
+
+from svg_to_gcode.svg_parser import parse_file, parse_string
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Vector, Line, LineSegmentChain, order_cuts, containment_tree, join_chains, \
+    is_closed, point_in_polygon
+
+from testing.other_tests._gcode_simulator import simulate
+
+
+def chain(*points):
+    line_chain = LineSegmentChain()
+    for start, end in zip(points, points[1:]):
+        line_chain.append(Line(Vector(*start), Vector(*end)))
+
+    return line_chain
+
+
+def rectangle(x0, y0, x1, y1):
+    return chain((x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0))
+
+
+def contains(outer, inner):
+    """The definition of containment, tested naively."""
+    outer_box, inner_box = outer.bounding_box(), inner.bounding_box()
+    first = inner.get(0)
+    return is_closed(outer) and outer is not inner and all(outer_box[i] <= inner_box[i] for i in (0, 1)) and \
+        all(inner_box[i] <= outer_box[i] for i in (2, 3)) and \
+        (outer_box[2] - outer_box[0]) * (outer_box[3] - outer_box[1]) > \
+        (inner_box[2] - inner_box[0]) * (inner_box[3] - inner_box[1]) and \
+        point_in_polygon((first.start + first.end) * 0.5, outer)
+
+
+def area(line_chain):
+    box = line_chain.bounding_box()
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def parent(line_chain, line_chains):
+    """The smallest chain which contains line_chain."""
+    return min((outer for outer in line_chains if contains(outer, line_chain)), key=area, default=None)
+
+
+def check_order(line_chains):
+    """Every chain must be cut before its parent, and so before all of its ancestors."""
+    ordered = order_cuts(line_chains)
+    if sorted(map(id, ordered)) != sorted(map(id, line_chains)):
+        print("Ordering lost or duplicated chains")
+        return False
+
+    position = {id(line_chain): i for i, line_chain in enumerate(ordered)}
+    for inner in line_chains:
+        outer = parent(inner, line_chains)
+        if outer is not None and position[id(inner)] > position[id(outer)]:
+            print(f"{outer} was cut before the chain it contains, {inner}")
+            return False
+
+    return True
+
+
+def nested_circles(count):
+    """An svg of concentric circles, from the outside in. Each circle is a path of two arcs."""
+    circles = "".join(f'<path d="M {50 - radius} 50 A {radius} {radius} 0 0 1 {50 + radius} 50 '
+                      f'A {radius} {radius} 0 0 1 {50 - radius} 50"/>' for radius in range(count * 10, 0, -10))
+    return f'<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">{circles}</svg>'
+
+
+def travel(line_chains):
+    position, length = Vector(0, 0), 0
+    for line_chain in line_chains:
+        length += abs(line_chain.get(0).start - position)
+        position = line_chain.get(-1).end
+
+    return length
+
+
+def run_test(svg_file_name, _):
+    curves = parse_file(svg_file_name)
+    line_chains = join_chains([LineSegmentChain.line_segment_approximation(curve) for curve in curves])
+
+    if not check_order(line_chains):
+        return False
+
+    # The parent is the smallest chain which contains each chain.
+    for line_chain, index in zip(line_chains, containment_tree(line_chains)):
+        if (None if index is None else line_chains[index]) is not parent(line_chain, line_chains):
+            print(f"The parent of {line_chain} is {index}")
+            return False
+
+    # A grid of parts, each with a hole which has an engraving inside, in random order. Both the hole and the
+    # engraving must be cut before the part, and travel must be shorter than in document order.
+    random.seed(0)
+    parts = []
+    for column in range(15):
+        for row in range(15):
+            x, y = column * 10, row * 10
+            parts.append((rectangle(x, y, x + 8, y + 8), rectangle(x + 2, y + 2, x + 6, y + 6),
+                          chain((x + 3, y + 3), (x + 5, y + 5))))
+
+    line_chains = [line_chain for part in parts for line_chain in part]
+    random.shuffle(line_chains)
+
+    ordered = order_cuts(line_chains)
+    position = {id(line_chain): i for i, line_chain in enumerate(ordered)}
+    if len(ordered) != len(line_chains) or any(not position[id(engraving)] < position[id(hole)] < position[id(outline)]
+                                               for outline, hole, engraving in parts):
+        print("A part was cut before its hole or engraving")
+        return False
+
+    if travel(ordered) > travel(line_chains) / 10:
+        print(f"Ordering barely shortened travel, {travel(line_chains)} to {travel(ordered)}")
+        return False
+
+    # The compiler joins the curves of each path before ordering, nested circles are cut from the inside out.
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, order_cuts=True)
+    gcode_compiler.append_curves(parse_string(nested_circles(3)))
+    trace = simulate(gcode_compiler.compile())
+    radii = []
+    for previous, move in zip(trace, trace[1:]):
+        radius = round(math.dist(move[:2], (50, 50)))
+        if move[4] > 0 and previous[4] == 0:
+            radii.append(radius)
+
+    if radii != [10, 20, 30]:
+        print(f"Nested circles were cut in the order {radii}")
+        return False
+
+    return True
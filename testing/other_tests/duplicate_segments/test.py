@@ -0,0 +1,99 @@
+import math
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Vector, Line, LineSegmentChain, SegmentIndex
+
+from testing.other_tests._gcode_simulator import simulate
+
+
+def cut_segments(gcode_compiler):
+    trace = [(0, 0, 0, None, 0)] + simulate(gcode_compiler.compile())
+    return [(previous[:2], move[:2]) for previous, move in zip(trace, trace[1:]) if move[4] > 0]
+
+
+def cut_length(gcode_compiler):
+    return sum(math.dist(start, end) for start, end in cut_segments(gcode_compiler))
+
+
+def chain(*points):
+    line_chain = LineSegmentChain()
+    for start, end in zip(points, points[1:]):
+        line_chain.append(Line(Vector(*start), Vector(*end)))
+
+    return line_chain
+
+
+def reverse(line_chain):
+    return chain(*[(line.end.x, line.end.y) for line in reversed(list(line_chain))], (line_chain.get(0).start.x,
+                                                                                     line_chain.get(0).start.y))
+
+
+def run_test(svg_file_name, _):
+    curves = parse_file(svg_file_name)
+    line_chains = [LineSegmentChain.line_segment_approximation(curve) for curve in curves]
+
+    # Drawing the same geometry again, in either direction, adds nothing.
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, remove_duplicates=True)
+    gcode_compiler.append_curves(curves)
+    body = list(gcode_compiler.body)
+
+    for line_chain in line_chains:
+        gcode_compiler.append_line_chain(line_chain)
+        gcode_compiler.append_line_chain(reverse(line_chain))
+
+    if gcode_compiler.body != body:
+        print("Duplicates were drawn")
+        return False
+
+    plain_compiler = Compiler(interfaces.Gcode, 1000, 300, 0)
+    plain_compiler.append_curves(curves)
+    if cut_length(gcode_compiler) > cut_length(plain_compiler) + 1e-6:
+        print("Removing duplicates made the job longer")
+        return False
+
+    # Every segment must still be cut somewhere.
+    cuts = cut_segments(gcode_compiler)
+    if len(cuts) < 5000:
+        for line_chain in line_chains:
+            for line in line_chain:
+                middle = ((line.start.x + line.end.x) / 2, (line.start.y + line.end.y) / 2)
+                if line.length() > 1e-2 and not any(distance(middle, start, end) < 2e-3 for start, end in cuts):
+                    print(f"{line} isn't cut anymore")
+                    return False
+
+    # Neighbouring squares share an edge, which is split in two in the second square.
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, remove_duplicates=True)
+    gcode_compiler.append_line_chain(chain((0, 0), (10, 0), (10, 10), (0, 10), (0, 0)))
+    gcode_compiler.append_line_chain(chain((10, 4), (10, 0), (20, 0), (20, 10), (10, 10), (10, 4)))
+    if abs(cut_length(gcode_compiler) - 70) > 1e-6:
+        print(f"Cut {cut_length(gcode_compiler)} instead of 70mm of shared squares")
+        return False
+
+    # Collinear overlaps keep one copy, and the parts which don't overlap.
+    index = SegmentIndex()
+    index.add(chain((0, 0), (10, 0)))
+    cases = [
+        (chain((5, 0), (15, 0)), [[(10, 0), (15, 0)]]),
+        (chain((2, 0.0005), (4, 0.0005)), []),
+        (chain((-5, 0), (20, 0)), [[(-5, 0), (0, 0)], [(15, 0), (20, 0)]]),
+        (chain((12, 1), (12, 0), (13, 0), (13, 1)), [[(12, 1), (12, 0)], [(13, 0), (13, 1)]]),
+        (chain((0, 1), (5, 1)), [[(0, 1), (5, 1)]]),
+    ]
+    for line_chain, expected in cases:
+        pieces = [[(piece.get(0).start.x, piece.get(0).start.y)] + [(line.end.x, line.end.y) for line in piece]
+                  for piece in index.add(line_chain)]
+        if len(pieces) != len(expected) or any(len(a) != len(b) or any(math.dist(p, q) > 1e-9 for p, q in zip(a, b))
+                                               for a, b in zip(pieces, expected)):
+            print(f"Expected {expected}. Got {pieces}")
+            return False
+
+    return True
+
+
+def distance(point, start, end):
+    direction = (end[0] - start[0], end[1] - start[1])
+    length = direction[0] ** 2 + direction[1] ** 2
+    t = 0 if length == 0 else ((point[0] - start[0]) * direction[0] + (point[1] - start[1]) * direction[1]) / length
+    t = min(1, max(0, t))
+    return math.dist(point, (start[0] + direction[0] * t, start[1] + direction[1] * t))
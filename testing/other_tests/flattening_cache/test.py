@@ -0,0 +1,108 @@
+import gc
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Vector, Line, CubicBazier, LineSegmentChain, FlatteningCache, FLATTENING_CACHE
+from svg_to_gcode import Settings
+from svg_to_gcode import instrumentation
+
+
+def vertices(line_chain):
+    return [(line.start.x, line.start.y, line.end.x, line.end.y) for line in line_chain]
+
+
+def compile_curves(curves, cutting_speed, passes=1):
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, cutting_speed, 1)
+    gcode_compiler.append_curves(curves)
+    return gcode_compiler.compile(passes=passes)
+
+
+def check_hits(curves):
+    """Hits build new lines, which the chains they're appended to can modify without affecting the cache."""
+    for curve in curves:
+        first, second = LineSegmentChain.line_segment_approximation(curve), \
+            LineSegmentChain.line_segment_approximation(curve)
+
+        if vertices(first) != vertices(second) or any(a is b for a, b in zip(first, second)):
+            print(f"The cached approximation of {curve} differs, or shares its lines")
+            return False
+
+    return True
+
+
+def run_test(svg_file_name, _):
+    FLATTENING_CACHE.clear()
+
+    curves = parse_file(svg_file_name)
+    approximated = [curve for curve in curves if not isinstance(curve, Line)]
+
+    # Recompiling the same curves with other speeds or passes skips the approximation, and the output is the same as
+    # that of a fresh compile.
+    compile_curves(curves, 300)
+    with instrumentation.instrument() as stats:
+        cached = compile_curves(curves, 500, passes=2)
+
+    # Lines are their own approximation, they're never cached.
+    if stats.counters.get("approximated_curves", 0) != len(curves) - len(approximated) or \
+            stats.counters.get("cached_approximations", 0) != len(approximated):
+        print(f"The recompile approximated curves again: {stats.counters}")
+        return False
+
+    FLATTENING_CACHE.clear()
+    if compile_curves(curves, 500, passes=2) != cached:
+        print("The cached approximations changed the output")
+        return False
+
+    if not check_hits(approximated):
+        return False
+
+    # The tolerance is part of the key.
+    if approximated:
+        coarse = LineSegmentChain.uniform_approximation(approximated[0])
+        with Settings({"approximation": 1e-4}):
+            fine = LineSegmentChain.uniform_approximation(approximated[0])
+
+        if fine.chain_size() <= coarse.chain_size():
+            print("A finer tolerance returned the cached approximation")
+            return False
+
+    # Modifying a curve in place invalidates its approximation.
+    bezier = CubicBazier(Vector(0, 0), Vector(10, 0), Vector(10, 10), Vector(0, 10))
+    LineSegmentChain.line_segment_approximation(bezier)
+    bezier.end, bezier.control2 = Vector(100, 100), Vector(50, 50)
+    bezier.control1.x = 20
+
+    if vertices(LineSegmentChain.line_segment_approximation(bezier)) != \
+            vertices(LineSegmentChain.line_segment_approximation(CubicBazier(Vector(0, 0), Vector(100, 100),
+                                                                             Vector(20, 10), Vector(50, 50)))):
+        print("The cache returned the approximation of a curve from before it was modified")
+        return False
+
+    # Entries are released with their curves.
+    del bezier
+    del curves, approximated
+    gc.collect()
+    if len(FLATTENING_CACHE):
+        print(f"{len(FLATTENING_CACHE)} approximations outlived their curves")
+        return False
+
+    # The least recently used entries are evicted beyond max_size.
+    cache = FlatteningCache(max_size=3)
+    beziers = [CubicBazier(Vector(i, 0), Vector(i, 10), Vector(i + 5, 3), Vector(i - 5, 6)) for i in range(5)]
+    for bezier in beziers:
+        cache.put(bezier, ("adaptive",), (bezier.start, bezier.end))
+
+    cache.get(beziers[2], ("adaptive",))
+    cache.put(beziers[0], ("adaptive",), (beziers[0].start, beziers[0].end))
+
+    if [cache.get(bezier, ("adaptive",)) is not None for bezier in beziers] != [True, False, True, False, True]:
+        print("The cache didn't evict the least recently used entries")
+        return False
+
+    disabled = FlatteningCache(max_size=0)
+    disabled.put(beziers[0], ("adaptive",), (beziers[0].start, beziers[0].end))
+    if len(disabled):
+        print("A disabled cache stored an entry")
+        return False
+
+    return True
@@ -0,0 +1,158 @@
+import math
+from xml.etree import ElementTree
+
+from svg_to_gcode.svg_parser import parse_file, parse_file_paths, parse_root_paths
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Vector, Line, hatch_fill
+from svg_to_gcode.geometry._hatch import _contours
+
+SPACING = 2
+
+
+def rotate(point, angle):
+    cos, sin = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    return point[0] * cos + point[1] * sin, point[1] * cos - point[0] * sin
+
+
+def inside(edges, point, fill_rule):
+    """Brute force winding number of a point."""
+    winding = 0
+    for (x1, y1), (x2, y2) in edges:
+        if (y1 <= point[1] < y2) or (y2 <= point[1] < y1):
+            x = x1 + (point[1] - y1) * (x2 - x1) / (y2 - y1)
+            if x > point[0]:
+                winding += 1 if y2 > y1 else -1
+
+    return winding != 0 if fill_rule == "nonzero" else winding % 2 == 1
+
+
+def distance_to_outline(edges, point):
+    distance = math.inf
+    for start, end in edges:
+        direction = (end[0] - start[0], end[1] - start[1])
+        length = direction[0] ** 2 + direction[1] ** 2
+        t = 0 if length == 0 else ((point[0] - start[0]) * direction[0] + (point[1] - start[1]) * direction[1]) / length
+        t = min(1, max(0, t))
+        closest = (start[0] + direction[0] * t, start[1] + direction[1] * t)
+        distance = min(distance, math.dist(point, closest))
+
+    return distance
+
+
+def brute_force_length(edges, spacing, fill_rule):
+    """Total length of the hatch lines, found by intersecting every scanline with every edge."""
+    low = min(min(start[1], end[1]) for start, end in edges)
+    high = max(max(start[1], end[1]) for start, end in edges)
+
+    total = 0
+    for scanline in range(math.ceil(low / spacing), math.floor(high / spacing) + 1):
+        y = scanline * spacing
+        crossings = []
+        for (x1, y1), (x2, y2) in edges:
+            if (y1 <= y < y2) or (y2 <= y < y1):
+                crossings.append((x1 + (y - y1) * (x2 - x1) / (y2 - y1), 1 if y2 > y1 else -1))
+
+        crossings.sort()
+        winding = 0
+        for index, (x, direction) in enumerate(crossings[:-1]):
+            winding = winding + direction if fill_rule == "nonzero" else winding ^ 1
+            if winding != 0:
+                total += crossings[index + 1][0] - x
+
+    return total
+
+
+def check_fill(curves, angle, fill_rule):
+    contours = [[rotate(point, angle) for point in contour] for contour in _contours(curves)]
+    edges = [(contour[i], contour[(i + 1) % len(contour)]) for contour in contours for i in range(len(contour))]
+
+    line_chains = hatch_fill(curves, SPACING, angle, fill_rule)
+
+    hatch_length = 0
+    spans = 0
+    for line_chain in line_chains:
+        for line in line_chain:
+            start, end = rotate(line.start, angle), rotate(line.end, angle)
+
+            if abs(start[1] - end[1]) < 1e-6:
+                hatch_length += abs(end[0] - start[0])
+                spans += 1
+                continue
+
+            # Connections between hatch lines must stay inside the fill.
+            middle = ((start[0] + end[0]) / 2, (start[1] + end[1]) / 2)
+            if not inside(edges, middle, fill_rule) and distance_to_outline(edges, middle) > 1e-6:
+                print(f"The connection {line} leaves the fill")
+                return False
+
+    expected = brute_force_length(edges, SPACING, fill_rule) if edges else 0
+    if abs(hatch_length - expected) > 1e-6 * max(1, expected):
+        print(f"Hatched {hatch_length} instead of {expected} at {angle} degrees with {fill_rule}")
+        return False
+
+    if len(line_chains) > spans:
+        print("More chains than hatch lines")
+        return False
+
+    return True
+
+
+def square(x, y, side):
+    corners = [Vector(x, y), Vector(x + side, y), Vector(x + side, y + side), Vector(x, y + side)]
+    return [Line(corners[i], corners[(i + 1) % 4]) for i in range(4)]
+
+
+def run_test(svg_file_name, _):
+    paths = parse_file_paths(svg_file_name)
+
+    if [repr(curve) for path in paths for curve in path.curves] != [repr(curve) for curve in parse_file(svg_file_name)]:
+        print("parse_file_paths and parse_file returned different curves")
+        return False
+
+    for path in paths:
+        for angle in (0, 30):
+            for fill_rule in ("nonzero", "evenodd"):
+                if not check_fill(path.curves, angle, fill_rule):
+                    return False
+
+    # Fill rules on two nested squares with the same orientation.
+    nested = square(0, 0, 10) + square(3, 3, 4)
+    for fill_rule, expected in (("nonzero", 100), ("evenodd", 84)):
+        length = sum(abs(line.end.x - line.start.x) for chain in hatch_fill(nested, 1, 0, fill_rule) for line in chain
+                     if line.start.y == line.end.y)
+        if abs(length - expected) > 1e-9:
+            print(f"Hatched {length} instead of {expected} with {fill_rule}")
+            return False
+
+    # A convex shape is a single serpentine.
+    if len(hatch_fill(square(0, 0, 10), 0.5, 45)) != 1:
+        print("A square wasn't filled with a single chain")
+        return False
+
+    # Many spans of a single contour on every scanline: each tooth of a comb is a single serpentine.
+    teeth = 40
+    corners = [Vector(0, 0)] + [Vector(x, y) for i in range(teeth)
+                                for x, y in ((2 * i, 20), (2 * i + 1, 20), (2 * i + 1, 1), (2 * i + 2, 1))]
+    corners.append(Vector(2 * teeth, 0))
+    comb = [Line(corners[i], corners[(i + 1) % len(corners)]) for i in range(len(corners))]
+    if len(hatch_fill(comb, 0.5)) != teeth or not check_fill(comb, 0, "nonzero"):
+        print(f"A comb with {teeth} teeth wasn't filled with a chain per tooth")
+        return False
+
+    # Styles are inherited, and the style attribute has precedence.
+    root = ElementTree.fromstring('<svg xmlns="http://www.w3.org/2000/svg" height="10"><g fill-rule="evenodd" '
+                                  'fill="blue"><path fill="green" style="fill: red" d="M0 0 L1 1"/></g></svg>')
+    style = parse_root_paths(root)[0].style
+    if style != {"fill-rule": "evenodd", "fill": "red"}:
+        print(f"Wrong style {style}")
+        return False
+
+    # Each chain is cut without turning the laser off.
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0)
+    gcode_compiler.append_fill(nested, 1, 30, "evenodd")
+    laser_offs = sum(command == "M5;" for command in gcode_compiler.body)
+    if laser_offs != len(hatch_fill(nested, 1, 30, "evenodd")):
+        print("The compiler didn't draw each chain in one go")
+        return False
+
+    return True
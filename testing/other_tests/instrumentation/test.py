@@ -0,0 +1,54 @@
+import json
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import LineSegmentChain
+from svg_to_gcode import instrumentation
+
+
+def convert(svg_file_name):
+    curves = parse_file(svg_file_name)
+
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 2)
+    gcode_compiler.append_curves(curves)
+
+    return curves, gcode_compiler.compile(passes=2)
+
+
+def run_test(svg_file_name, _):
+    _, reference = convert(svg_file_name)
+
+    with instrumentation.instrument(trace_memory=True) as stats:
+        curves, gcode = convert(svg_file_name)
+
+    if instrumentation.stats is not None:
+        print("Instrumentation wasn't disabled")
+        return False
+
+    if gcode != reference:
+        print("Instrumentation changed the output")
+        return False
+
+    segments = sum(LineSegmentChain.line_segment_approximation(curve).chain_size() for curve in curves)
+    expected_counters = {"curves": len(curves), "approximated_curves": len(curves), "segments": segments,
+                         "bytes_emitted": len(gcode)}
+
+    for counter, value in expected_counters.items():
+        if stats.counters.get(counter) != value:
+            print(f"Counter {counter} is {stats.counters.get(counter)}, expected {value}")
+            return False
+
+    for stage in ["parse", "path", "transform", "approximation", "emission", "join"]:
+        if stage not in stats.stages or stats.stages[stage].peak_memory is None:
+            print(f"Stage {stage} wasn't measured: {stats.stages}")
+            return False
+
+    if stats.stages["parse"].wall_time < stats.stages["path"].wall_time:
+        print("Stages aren't inclusive")
+        return False
+
+    if json.loads(stats.to_json()) != stats.as_dict():
+        print("Stats can't be serialized to json")
+        return False
+
+    return True
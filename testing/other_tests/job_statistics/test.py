@@ -0,0 +1,71 @@
+import math
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces, estimate_job, Machine
+
+from testing.other_tests._gcode_simulator import simulate
+
+settings = {"movement_speed": 1000, "cutting_speed": 300, "pass_depth": 2, "dwell_time": 100}
+passes = 2
+
+
+def run_test(svg_file_name, _):
+    curves = parse_file(svg_file_name)
+
+    gcode_compiler = Compiler(interfaces.Gcode, **settings)
+    gcode_compiler.append_curves(curves)
+    gcode = gcode_compiler.compile(passes=passes)
+    trace = simulate(gcode)
+
+    dry_run_compiler = Compiler(interfaces.DryRun, **settings)
+    dry_run_compiler.append_curves(curves)
+
+    # Measure the job from the gcode, the statistics should match.
+    cut_length = travel_length = ideal_time = 0
+    previous = (0, 0, 0, None, 0)
+    for move in trace:
+        length = math.dist(previous[:3], move[:3])
+        ideal_time += 60 * length / move[3]
+
+        if move[4] > 0:
+            cut_length += length
+        else:
+            travel_length += length
+
+        previous = move
+
+    # Every time the laser is turned on counts as a pierce, even if it's turned off without moving.
+    pierce_count = 0
+    laser_on = False
+    for line in gcode.split('\n'):
+        pierce_count += line.startswith("M3") and not laser_on
+        laser_on = line.startswith("M3") or (laser_on and not line.startswith("M5"))
+
+    interface_state = dict(vars(dry_run_compiler.interface), events=list(dry_run_compiler.interface.events))
+    statistics = estimate_job(dry_run_compiler, Machine(), passes)
+    expected = {"segment_count": len(trace), "pierce_count": pierce_count, "cut_length": cut_length,
+                "travel_length": travel_length}
+
+    for key, value in expected.items():
+        if not math.isclose(getattr(statistics, key), value, rel_tol=10 ** -6):
+            print(f"{key} is {getattr(statistics, key)}, expected {value}")
+            return False
+
+    # A machine can't be faster than moving at full speed everywhere.
+    ideal_time += statistics.dwell_time
+    if statistics.estimated_time < ideal_time:
+        print(f"Estimated {statistics.estimated_time}s, faster than the ideal {ideal_time}s")
+        return False
+
+    # With near infinite acceleration, the estimate should converge to the ideal time.
+    instant_statistics = estimate_job(dry_run_compiler, Machine(acceleration=10 ** 9), passes)
+    if not math.isclose(instant_statistics.estimated_time, ideal_time, rel_tol=10 ** -3):
+        print(f"Estimated {instant_statistics.estimated_time}s with instant acceleration, expected {ideal_time}s")
+        return False
+
+    # Estimating a job has no side effects, however often it's repeated.
+    if dict(vars(dry_run_compiler.interface)) != interface_state:
+        print("estimate_job changed the state of the interface")
+        return False
+
+    return True
@@ -0,0 +1,97 @@
+from xml.etree import ElementTree
+
+from svg_to_gcode.svg_parser import parse_file, parse_file_layers, parse_root, parse_root_layers
+from svg_to_gcode.compiler import Compiler, interfaces, compile_layers, concatenate_layers
+from svg_to_gcode import Settings
+
+DOCUMENT = """<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+    width="200" height="200">
+  <path d="M 0,0 L 10,10"/>
+  <g inkscape:groupmode="layer" inkscape:label="engrave" id="layer1">
+    <path d="M 20,20 C 30,0 40,40 50,20"/>
+    <g transform="translate(5, 5)">
+      <path d="M 20,20 Q 30,0 40,20"/>
+    </g>
+    <g inkscape:groupmode="layer" inkscape:label="score" id="layer2">
+      <path d="M 60,60 L 70,60 L 70,70 Z"/>
+    </g>
+  </g>
+  <g inkscape:groupmode="layer" id="layer3">
+    <path d="M 100,100 A 20,10 30 0 1 150,120"/>
+  </g>
+  <g inkscape:groupmode="layer" inkscape:label="hidden" style="display:none">
+    <path d="M 0,0 L 200,200"/>
+  </g>
+</svg>"""
+
+
+def compile_curves(curves, cutting_speed=300, passes=1, **options):
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, cutting_speed, 1, **options)
+    gcode_compiler.append_curves(curves)
+    return gcode_compiler.compile(passes=passes)
+
+
+def run_test(svg_file_name, _):
+    # Every drawn path belongs to exactly one layer.
+    layers = parse_file_layers(svg_file_name)
+    if sum(len(layer.curves) for layer in layers) != len(parse_file(svg_file_name)):
+        print("The layers don't contain every curve")
+        return False
+
+    root = ElementTree.fromstring(DOCUMENT)
+    layers = parse_root_layers(root)
+
+    # Paths belong to their innermost layer, those outside of any layer to an unnamed one. Hidden layers are skipped.
+    names = [(layer.name, len(layer.paths)) for layer in layers]
+    if names != [(None, 1), ("engrave", 2), ("score", 1), ("layer3", 1)]:
+        print(f"Unexpected layers {names}")
+        return False
+
+    if [repr(curve) for layer in layers for curve in layer.curves] != [repr(curve) for curve in parse_root(root)]:
+        print("The layers' curves differ from parse_root's")
+        return False
+
+    # Every layer is compiled with its own options, in parallel or not.
+    layer_options = {"score": {"cutting_speed": 100}, "layer3": {"passes": 3, "dwell_time": 50}}
+    with Settings({"approximation": 0.05}):
+        programs = compile_layers(layers, interfaces.Gcode, 1000, 300, 1, layer_options=layer_options, processes=2)
+
+    serial = compile_layers(layers, interfaces.Gcode, 1000, 300, 1, layer_options=layer_options, processes=1,
+                            settings=Settings({"approximation": 0.05}))
+    if programs != serial:
+        print("Compiling the layers in parallel changed the programs")
+        return False
+
+    with Settings({"approximation": 0.05}):
+        expected = {None: compile_curves(layers[0].curves), "engrave": compile_curves(layers[1].curves),
+                    "score": compile_curves(layers[2].curves, cutting_speed=100),
+                    "layer3": compile_curves(layers[3].curves, passes=3, dwell_time=50)}
+
+    if programs != expected:
+        print(f"The programs of {[name for name in expected if programs.get(name) != expected[name]]} are wrong")
+        return False
+
+    # Layers with the same name are compiled together.
+    duplicates = parse_root_layers(root)
+    duplicates[2].label = "engrave"
+    if list(compile_layers(duplicates, interfaces.Gcode, 1000, 300, 1, processes=1)) != [None, "engrave", "layer3"]:
+        print("Layers with the same name weren't compiled together")
+        return False
+
+    # Concatenation follows the configured order.
+    if concatenate_layers(programs, ["engrave", "layer3"]) != programs["engrave"] + '\n' + programs["layer3"] or \
+            concatenate_layers(programs) != '\n'.join(programs.values()):
+        print("The layers were concatenated in the wrong order")
+        return False
+
+    for invalid in (lambda: concatenate_layers(programs, ["cut"]),
+                    lambda: compile_layers(layers, interfaces.Gcode, 1000, 300, 1, layer_options={"cut": {}})):
+        try:
+            invalid()
+        except ValueError:
+            pass
+        else:
+            print("An unknown layer was accepted")
+            return False
+
+    return True
@@ -0,0 +1,111 @@
+from collections import Counter
+from xml.etree import ElementTree
+
+from svg_to_gcode.svg_parser import parse_file, parse_file_paths, parse_root_paths
+from svg_to_gcode.compiler import Compiler, Operation, interfaces, parse_color
+from svg_to_gcode import Settings
+
+from testing.other_tests._gcode_simulator import simulate
+
+DOCUMENT = """<svg xmlns="http://www.w3.org/2000/svg" width="200" height="200">
+  <path d="M 10,10 L 50,10 L 50,50 Z" stroke="red"/>
+  <path d="M 60,10 C 70,0 80,40 90,10" style="stroke:#0000ff;stroke-width:0.5px"/>
+  <g stroke="#f00" class="ignored">
+    <path d="M 10,60 Q 30,20 50,60"/>
+  </g>
+  <path d="M 100,100 A 30,20 0 0 1 160,120" class="vector engrave" style="stroke:black"/>
+  <path d="M 60,60 L 90,90" stroke="rgb(0, 0, 255)" stroke-width="0.5"/>
+  <path d="M 150,10 L 190,10" stroke="green"/>
+</svg>"""
+
+
+def cut_moves(gcode):
+    """The (feed, power) of every cutting move."""
+    return [(move[3], move[4]) for move in simulate(gcode) if move[4] > 0]
+
+
+def run_test(svg_file_name, _):
+    # Without operations, paths are drawn like their curves.
+    plain_compiler = Compiler(interfaces.Gcode, 1000, 300, 0)
+    plain_compiler.append_curves(parse_file(svg_file_name))
+
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0)
+    gcode_compiler.append_paths(parse_file_paths(svg_file_name), [])
+
+    if gcode_compiler.compile() != plain_compiler.compile():
+        print("append_paths without operations differs from append_curves")
+        return False
+
+    paths = parse_root_paths(ElementTree.fromstring(DOCUMENT))
+
+    # The class attribute is carried on the path which declares it, along with the inherited stroke.
+    if [path.style.get("class") for path in paths] != [None, None, None, "vector engrave", None, None] or \
+            paths[2].style.get("stroke") != "#f00":
+        print(f"Unexpected styles {[path.style for path in paths]}")
+        return False
+
+    if not parse_color("red") == parse_color("#F00") == parse_color("rgb(255,0,0)") == (255, 0, 0):
+        print("Equivalent colours were parsed differently")
+        return False
+
+    cut = Operation(stroke="red", cutting_speed=100, passes=2)
+    score = Operation(stroke="blue", stroke_width=0.5, cutting_speed=600, power=0.5)
+    engrave = Operation(css_class="engrave", cutting_speed=2000, power=0.2, tolerance=0.5)
+
+    groups = {"cut": [paths[0], paths[2]], "score": [paths[1], paths[4]], "engrave": [paths[3]], None: [paths[5]]}
+    for name, operation in (("cut", cut), ("score", score), ("engrave", engrave)):
+        if [path for path in paths if operation.matches(path.style)] != groups[name]:
+            print(f"The {name} operation matched the wrong paths")
+            return False
+
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0)
+    gcode_compiler.append_paths(paths, [engrave, score, cut])
+    moves = cut_moves(gcode_compiler.compile())
+
+    # Groups are drawn in the order of the operations, unmatched paths last, and every parameter changes once per group.
+    changes = [parameters for i, parameters in enumerate(moves) if i == 0 or moves[i - 1] != parameters]
+    if changes != [(2000, 255 * 0.2), (600, 255 * 0.5), (100, 255), (300, 255)]:
+        print(f"Unexpected parameter changes {changes}")
+        return False
+
+    # Each group draws the same segments as its curves on their own, with its passes and tolerance.
+    for name, operation in (("cut", cut), ("score", score), ("engrave", engrave), (None, Operation())):
+        settings = None if operation.tolerance is None else Settings({"approximation": operation.tolerance})
+        expected_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, settings=settings)
+
+        for _ in range(operation.passes):
+            expected_compiler.append_curves([curve for path in groups[name] for curve in path.curves])
+
+        expected = len(cut_moves(expected_compiler.compile()))
+        drawn = Counter(moves)[(operation.cutting_speed or 300, 255 * operation.power)]
+        if drawn != expected:
+            print(f"The {name} group drew {drawn} segments instead of {expected}")
+            return False
+
+    # The passes of an operation step down by pass_depth, then move back up for the next group.
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 2)
+    gcode_compiler.append_paths(paths, [cut, score])
+    depths = {}
+    for move in simulate(gcode_compiler.compile()):
+        if move[4] > 0:
+            depths.setdefault((move[3], move[4]), set()).add(move[2])
+
+    if depths != {(100, 255): {0, -2}, (600, 255 * 0.5): {0}, (300, 255): {0}}:
+        print(f"Unexpected cutting depths {depths}")
+        return False
+
+    # The compiler's parameters are restored.
+    if (gcode_compiler.cutting_speed, gcode_compiler.laser_power) != (300, 1):
+        print("append_paths didn't restore the cutting speed and power")
+        return False
+
+    for invalid in ({"power": 2}, {"passes": 0}, {"tolerance": -1}, {"stroke": "ultraviolet"}):
+        try:
+            Operation(**invalid)
+        except ValueError:
+            pass
+        else:
+            print(f"Operation accepted {invalid}")
+            return False
+
+    return True
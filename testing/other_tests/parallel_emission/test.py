@@ -0,0 +1,77 @@
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Vector, Line, LineSegmentChain
+
+
+def chain(*points):
+    line_chain = LineSegmentChain()
+    for start, end in zip(points, points[1:]):
+        line_chain.append(Line(Vector(*start), Vector(*end)))
+
+    return line_chain
+
+
+def check_stitch():
+    gcode = interfaces.Gcode()
+    position = (1, 2)
+
+    cases = [
+        # The worker set the feed rate, but the machine already moves at that speed.
+        (["M5;", "G1 F300 X1.000000 Y1.000000;", "G1 X2.000000 Y1.000000;"], (position, 300, None),
+         (position, 300, 300), ["M5;", "G1 X1.000000 Y1.000000;", "G1 X2.000000 Y1.000000;"]),
+        # The worker assumed the machine moves at the right speed, but it doesn't.
+        (["G1 X1.000000 Y1.000000;"], (position, 300, 300), (position, 300, 1000), ["G1 F300 X1.000000 Y1.000000;"]),
+        (["G1 F300 X1.000000 Y1.000000;"], (position, 300, 1000), (position, 300, 200),
+         ["G1 F300 X1.000000 Y1.000000;"]),
+        # Mispredicted positions can't be patched.
+        (["G1 X1.000000 Y1.000000;"], (position, 300, 300), ((0, 0), 300, 300), None),
+    ]
+
+    for commands, predicted, state, expected in cases:
+        if gcode.stitch(list(commands), predicted, state) != expected:
+            print(f"Stitching {commands} from {predicted} to {state} didn't give {expected}")
+            return False
+
+    return True
+
+
+def run_test(svg_file_name, _):
+    if not check_stitch():
+        return False
+
+    curves = parse_file(svg_file_name)
+    line_chains = [LineSegmentChain.line_segment_approximation(curve) for curve in curves]
+
+    # Parallel output is identical to serial output, including the state the interface is left in.
+    for interface_class in (interfaces.Gcode, interfaces.CompactGcode):
+        for options in ({}, {"dwell_time": 10}, {"remove_duplicates": True}):
+            serial = Compiler(interface_class, 1000, 300, 0, **options)
+            serial.append_line_chain(chain((0, 0), (1, 1)))
+            serial.append_line_chains(line_chains, processes=1)
+
+            parallel = Compiler(interface_class, 1000, 300, 0, **options)
+            parallel.append_line_chain(chain((0, 0), (1, 1)))
+            parallel.append_line_chains(line_chains, processes=3)
+
+            if parallel.compile() != serial.compile():
+                print(f"Parallel output differs from serial output with {interface_class.__name__} and {options}")
+                return False
+
+            if interface_class is interfaces.Gcode and parallel.interface.get_state() != serial.interface.get_state():
+                print("Parallel emission left the interface in a different state")
+                return False
+
+    # Chains which continue where the previous one ended. Their speeds depend on the state before the first one, which
+    # the chunks can't predict, so some are formatted again.
+    zigzag = [chain((i, 0), (i + 1, 1), (i + 1, 0)) for i in range(12)]
+    for state in (((0, 0), 300, 450), ((0, 0), 200, 450)):
+        compilers = [Compiler(interfaces.Gcode, 1000, 300, 0) for _ in range(2)]
+        for gcode_compiler, processes in zip(compilers, (1, 4)):
+            gcode_compiler.interface.set_state(state)
+            gcode_compiler.append_line_chains(zigzag, processes=processes)
+
+        if compilers[0].body != compilers[1].body:
+            print(f"Chunks of continuous chains weren't stitched correctly from {state}")
+            return False
+
+    return True
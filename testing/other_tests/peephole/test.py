@@ -0,0 +1,110 @@
+from functools import partial
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, PeepholeOptimizer, interfaces
+
+from testing.other_tests._gcode_simulator import simulate
+
+# (rule, commands, expected commands, expected count of the rule)
+CASES = [
+    ("empty_commands", ["G90;", "", "  ", "G1 X1 Y1;"], ["G90;", "G1 X1 Y1;"], 2),
+    ("laser_state", ["M5;", "M5;", "M3 S255;", "M3 S255;", "M3 S100;", "M5;"], ["M5;", "M3 S255;", "M3 S100;", "M5;"],
+     2),
+    ("coordinate_mode", ["G90;", "G90;", "G91;", "G91;", "G90;"], ["G90;", "G91;", "G90;"], 2),
+    ("feed_rate", ["G90;", "G1 F300 X1 Y1;", "G1 F300 X2 Y2;", "G1 F300;", "G1 F200 X3 Y3;"],
+     ["G90;", "G1 F300 X1 Y1;", "G1 X2 Y2;", "G1 F200 X3 Y3;"], 2),
+    ("zero_length_moves", ["G90;", "G0 X1 Y1;", "G0 X1 Y1;", "G1 X1 Y1;", "G1 X1 Y1 F300;", "X1;"],
+     ["G90;", "G0 X1 Y1;", "G1 X1 Y1;", "G1 X1 Y1 F300;"], 2),
+    ("zero_length_moves", ["G91;", "G1 X0 Y0;", "G1 X1 Y0;", "G1 X0;"], ["G91;", "G1 X0 Y0;", "G1 X1 Y0;"], 1),
+    # The motion mode of a move is kept, even if the move goes nowhere, since later moves without G depend on it.
+    ("zero_length_moves", ["G90;", "G0 X1 Y1;", "G1 X1 Y1;", "X2;"], ["G90;", "G0 X1 Y1;", "G1 X1 Y1;", "X2;"], 0),
+    # Commands which aren't understood make the optimizer forget the state.
+    ("zero_length_moves", ["G90;", "G0 X1 Y1;", "G92 X0 Y0;", "G0 X1 Y1;"], ["G90;", "G0 X1 Y1;", "G92 X0 Y0;",
+                                                                           "G0 X1 Y1;"], 0),
+    ("laser_state", ["M5;", "G21;", "M5;"], ["M5;", "G21;", "M5;"], 0),
+    ("laser_state", ["M5;", "M5; turn the laser off"], ["M5;", "M5; turn the laser off"], 0),
+    ("zero_length_moves", ["G91;", "G0 X1;", "G4 P0.5;", "G0 X0;"], ["G91;", "G0 X1;", "G4 P0.5;"], 1),
+]
+
+
+def check_cases():
+    for rule, commands, expected, saved in CASES:
+        optimizer = PeepholeOptimizer()
+        optimized = list(optimizer.optimize(commands))
+
+        if optimized != expected or optimizer.saved[rule] != saved:
+            print(f"Optimized {commands} to {optimized}, saved {optimizer.saved}. Expected {expected}")
+            return False
+
+        if simulate('\n'.join(optimized)) != simulate('\n'.join(commands)):
+            print(f"Optimizing {commands} changed the moves")
+            return False
+
+        # Without the rule, the commands it would have removed are kept. Empty commands are removed regardless.
+        disabled = PeepholeOptimizer([other for other in optimizer.rules if other != rule])
+        kept = list(disabled.optimize(commands)) != expected or rule == "empty_commands"
+        if saved and (not kept or disabled.saved[rule] != 0):
+            print(f"Disabling {rule} didn't keep the commands of {commands}")
+            return False
+
+    return True
+
+
+def run_test(svg_file_name, _):
+    if not check_cases():
+        return False
+
+    try:
+        PeepholeOptimizer(["laser_state", "everything"])
+        print("Unknown rules are accepted")
+        return False
+    except ValueError:
+        pass
+
+    curves = parse_file(svg_file_name)
+
+    # CompactGcode carries its modal state over to the next compilation, so every program is compiled by a new compiler.
+    def new_compiler(interface, peephole=False):
+        gcode_compiler = Compiler(interface, 1000, 300, 1, dwell_time=5, peephole=peephole)
+        gcode_compiler.append_curves(curves)
+        return gcode_compiler
+
+    for interface in (interfaces.Gcode, partial(interfaces.CompactGcode, resolution=0.01, relative_moves=True,
+                                                modal_motion=True)):
+        gcode_compiler = new_compiler(interface, peephole=True)
+        plain, optimized = new_compiler(interface).compile(passes=2), gcode_compiler.compile(passes=2)
+
+        stream = new_compiler(interface).compile_stream(passes=2)
+        if optimized != '\n'.join(PeepholeOptimizer().optimize(stream)):
+            print("The compiler's peephole optimization differs from PeepholeOptimizer")
+            return False
+
+        if simulate(optimized) != simulate(plain):
+            print("The optimized program moves differently")
+            return False
+
+        if len(optimized) >= len(plain) or not sum(gcode_compiler.peephole.saved.values()):
+            print(f"Nothing was optimized: {gcode_compiler.peephole.saved}")
+            return False
+
+        # Empty commands are dropped even if their rule is disabled, without disturbing the other rules.
+        rules = ("laser_state", "zero_length_moves")
+        subset_compiler = new_compiler(interface, peephole=rules)
+        subset = subset_compiler.compile(passes=2)
+
+        if '' in subset.split('\n') or simulate(subset) != simulate(plain):
+            print(f"Optimizing with {rules} kept empty commands, or changed the moves")
+            return False
+
+        if subset_compiler.peephole.saved["empty_commands"] or \
+                not sum(subset_compiler.peephole.saved[rule] for rule in rules):
+            print(f"Optimizing with {rules} saved {subset_compiler.peephole.saved}")
+            return False
+
+        subroutine = interface is not interfaces.Gcode
+        array = new_compiler(interface, peephole=True).compile_array(2, 2, (100, 100), subroutine=subroutine)
+        if simulate(array) != simulate(new_compiler(interface).compile_array(2, 2, (100, 100), subroutine=subroutine)):
+            print("The optimized array moves differently")
+            return False
+
+    return True
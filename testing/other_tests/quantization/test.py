@@ -0,0 +1,84 @@
+import math
+
+from svg_to_gcode import Settings
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Vector, Line, LineSegmentChain, quantize_line_chain
+
+from testing.other_tests._gcode_simulator import simulate
+
+STEPS_PER_MM = 80
+
+
+def cuts(gcode_compiler):
+    """The number of moves made with the laser on, including the ones which don't move the machine."""
+    count, laser_on = 0, False
+    for command in gcode_compiler.body:
+        if command.startswith(("M3", "M5")):
+            laser_on = command.startswith("M3")
+        elif command.startswith("G1") and laser_on:
+            count += 1
+
+    return count
+
+
+def run_test(svg_file_name, _):
+    # A fine approximation produces many segments shorter than a step.
+    settings = Settings({"approximation": 10 ** -4})
+    with settings:
+        curves = parse_file(svg_file_name)
+
+    plain_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, settings=settings)
+    plain_compiler.append_curves(curves)
+
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, steps_per_mm=STEPS_PER_MM, settings=settings)
+    gcode_compiler.append_curves(curves)
+
+    if cuts(plain_compiler) - cuts(gcode_compiler) != gcode_compiler.saved_lines:
+        print(f"{gcode_compiler.saved_lines} lines were reported saved, instead of "
+              f"{cuts(plain_compiler) - cuts(gcode_compiler)}")
+        return False
+
+    # Every position is on the grid of the machine, and every move moves it.
+    trace = simulate(gcode_compiler.compile())
+    previous = (0, 0)
+    for move in trace:
+        if any(abs(value * STEPS_PER_MM - round(value * STEPS_PER_MM)) > 1e-6 for value in move[:2]):
+            print(f"{move} isn't on the grid of the machine")
+            return False
+
+        if move[:2] == previous:
+            print(f"A move to {move} doesn't move the machine")
+            return False
+
+        previous = move[:2]
+
+    if len(trace) != sum(1 for command in gcode_compiler.body if command.startswith("G1")):
+        print("Some moves don't move the machine")
+        return False
+
+    # Vertices move by at most half a step along each axis.
+    line_chain = LineSegmentChain()
+    points = [Vector(math.cos(t / 2000) * 3, math.sin(t / 2000) * 3) for t in range(100)]
+    for start, end in zip(points, points[1:]):
+        line_chain.append(Line(start, end))
+
+    quantized = quantize_line_chain(line_chain, STEPS_PER_MM)
+    vertices = [quantized.get(0).start] + [line.end for line in quantized]
+    if any(min(max(abs(point.x - vertex.x), abs(point.y - vertex.y)) for vertex in vertices) > 0.5 / STEPS_PER_MM + 1e-9
+           for point in points):
+        print("Quantization moved a vertex by more than half a step")
+        return False
+
+    if quantized.chain_size() >= line_chain.chain_size():
+        print("Segments shorter than a step weren't dropped")
+        return False
+
+    # A chain shorter than a step vanishes.
+    dot = LineSegmentChain()
+    dot.append(Line(Vector(0, 0), Vector(0.001, 0.002)))
+    if quantize_line_chain(dot, STEPS_PER_MM).chain_size() != 0:
+        print("A chain shorter than a step wasn't dropped")
+        return False
+
+    return True
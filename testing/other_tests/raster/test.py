@@ -0,0 +1,261 @@
+import base64
+import random
+import struct
+import warnings
+import zlib
+from xml.etree import ElementTree
+
+from svg_to_gcode.svg_parser import parse_root, parse_root_images, decode_png
+from svg_to_gcode.svg_parser._png import ADAM7
+from svg_to_gcode.svg_parser._parser_methods import _canvas_height
+from svg_to_gcode.geometry import Vector
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.compiler._raster import dither
+
+from testing.other_tests._gcode_simulator import simulate
+
+WIDTH, HEIGHT = 13, 9
+
+
+def paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    return a if pa <= pb and pa <= pc else (b if pb <= pc else c)
+
+
+def filter_scanlines(scanlines, bpp):
+    """Filter raw scanlines, cycling through the five filter types."""
+    filtered = b''
+    previous = bytes(len(scanlines[0])) if scanlines else b''
+    for index, line in enumerate(scanlines):
+        filter_type = index % 5
+        out = bytearray()
+        for i, value in enumerate(line):
+            a = line[i - bpp] if i >= bpp else 0
+            b = previous[i]
+            c = previous[i - bpp] if i >= bpp else 0
+            predictor = (0, a, b, (a + b) >> 1, paeth(a, b, c))[filter_type]
+            out.append((value - predictor) & 0xff)
+
+        filtered += bytes([filter_type]) + bytes(out)
+        previous = line
+
+    return filtered
+
+
+def pack(samples, bit_depth):
+    if bit_depth == 16:
+        return struct.pack(f">{len(samples)}H", *samples)
+
+    if bit_depth == 8:
+        return bytes(samples)
+
+    per_byte = 8 // bit_depth
+    samples = samples + [0] * (-len(samples) % per_byte)
+    return bytes(sum(sample << (8 - bit_depth * (i + 1)) for i, sample in enumerate(samples[j:j + per_byte]))
+                 for j in range(0, len(samples), per_byte))
+
+
+def encode_png(pixels, color_type, bit_depth, channels, interlace=False, extra_chunks=(), compressed=None):
+    """A minimal png encoder. pixels is a list of rows of tuples of samples. compressed replaces the image data."""
+    bpp = max(1, channels * bit_depth // 8)
+    height, width = len(pixels), len(pixels[0])
+
+    def scanlines(rows, columns):
+        return [pack([sample for column in columns for sample in pixels[row][column]], bit_depth) for row in rows]
+
+    if interlace:
+        data = b''
+        for x0, y0, dx, dy in ADAM7:
+            if x0 < width and y0 < height:
+                data += filter_scanlines(scanlines(range(y0, height, dy), range(x0, width, dx)), bpp)
+    else:
+        data = filter_scanlines(scanlines(range(height), range(width)), bpp)
+
+    def chunk(chunk_type, content):
+        checksum = struct.pack(">I", zlib.crc32(chunk_type + content))
+        return struct.pack(">I", len(content)) + chunk_type + content + checksum
+
+    header = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, int(interlace))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + b''.join(chunk(*extra) for extra in extra_chunks)
+            + chunk(b"IDAT", zlib.compress(data) if compressed is None else compressed) + chunk(b"IEND", b''))
+
+
+def check_decoder():
+    random.seed(0)
+    gray = [[random.randrange(256) for _ in range(WIDTH)] for _ in range(HEIGHT)]
+    expected = [[value / 255 for value in row] for row in gray]
+
+    palette = b''.join(bytes([value] * 3) for value in range(256))
+    half_alpha = [[(value, 128) for value in row] for row in gray]
+
+    variants = {
+        "gray": (encode_png([[(value,) for value in row] for row in gray], 0, 8, 1), expected),
+        "interlaced": (encode_png([[(value,) for value in row] for row in gray], 0, 8, 1, True), expected),
+        "gray16": (encode_png([[(value * 257,) for value in row] for row in gray], 0, 16, 1), expected),
+        "rgb": (encode_png([[(value,) * 3 for value in row] for row in gray], 2, 8, 3), expected),
+        "rgba": (encode_png([[(value,) * 3 + (255,) for value in row] for row in gray], 6, 8, 4), expected),
+        "interlaced rgba": (encode_png([[(value,) * 3 + (255,) for value in row] for row in gray], 6, 8, 4, True),
+                            expected),
+        "palette": (encode_png([[(value,) for value in row] for row in gray], 3, 8, 1,
+                               extra_chunks=[(b"PLTE", palette)]), expected),
+        "gray alpha": (encode_png(half_alpha, 4, 8, 2),
+                       [[value / 255 * 128 / 255 + 1 - 128 / 255 for value in row] for row in gray]),
+    }
+
+    for bit_depth in (1, 2, 4):
+        maximum = (1 << bit_depth) - 1
+        low_depth = [[value * maximum // 255 for value in row] for row in gray]
+        variants[f"gray{bit_depth}"] = (
+            encode_png([[(value,) for value in row] for row in low_depth], 0, bit_depth, 1),
+            [[value / maximum for value in row] for row in low_depth])
+        variants[f"interlaced gray{bit_depth}"] = (
+            encode_png([[(value,) for value in row] for row in low_depth], 0, bit_depth, 1, True),
+            [[value / maximum for value in row] for row in low_depth])
+
+    for name, (data, expected_rows) in variants.items():
+        width, height, rows = decode_png(data)
+        if (width, height) != (WIDTH, HEIGHT) or any(abs(a - b) > 1e-9 for row1, row2 in zip(rows, expected_rows)
+                                                     for a, b in zip(row1, row2)):
+            print(f"The {name} png wasn't decoded correctly")
+            return False
+
+    # A few kilobytes which would expand to 100MB are rejected, rather than decompressed.
+    # So are corrupt and truncated image data.
+    invalid = {
+        "expands beyond its size": encode_png([[(0,)]], 0, 8, 1, compressed=zlib.compress(bytes(10 ** 8), 9)),
+        "is corrupt": encode_png([[(0,)]], 0, 8, 1, compressed=b"not zlib data"),
+        "is truncated": encode_png([[(0,)] * WIDTH] * HEIGHT, 0, 8, 1, compressed=zlib.compress(bytes(WIDTH))),
+    }
+
+    # Invalid headers are rejected before any pixel is allocated, eg. a huge interlaced image without data.
+    def header(width, height, bit_depth=8, color_type=0, interlace=1):
+        png = encode_png([[(0,)]], 0, 8, 1, compressed=zlib.compress(b''))
+        content = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, interlace)
+        return png[:16] + content + struct.pack(">I", zlib.crc32(b"IHDR" + content)) + png[33:]
+
+    invalid.update({
+        "is missing from a huge image": header(60000, 60000),
+        "is missing from an interlaced image": header(WIDTH, HEIGHT),
+        "describes an empty image": header(0, HEIGHT),
+        "has a bit depth its color type doesn't allow": header(WIDTH, HEIGHT, bit_depth=4, color_type=2),
+        "has an unknown interlace method": header(WIDTH, HEIGHT, interlace=2),
+    })
+
+    for problem, data in invalid.items():
+        try:
+            decode_png(data)
+            print(f"A png whose data {problem} was decoded")
+            return False
+        except ValueError:
+            pass
+
+    return True
+
+
+def engraved(trace, image, levels, max_power):
+    """Rasterize the powered moves of a trace back to power levels, one per pixel."""
+    result = [[0] * image.width for _ in range(image.height)]
+    for previous, move in zip([(None, None)] + trace, trace):
+        if move[4] == 0 or previous[0] is None:
+            continue
+
+        # Pixel space coordinates of the move
+        row = round((image.origin.y - move[1]) / -image.row_step.y - 0.5)
+        columns = sorted(((previous[0] - image.origin.x) / image.column_step.x,
+                          (move[0] - image.origin.x) / image.column_step.x))
+
+        if abs(previous[1] - move[1]) > 1e-6:
+            raise ValueError("A diagonal raster move")
+
+        for column in range(image.width):
+            if columns[0] < column + 0.5 < columns[1]:
+                result[row][column] = round(move[4] / 255 / max_power * (levels - 1))
+
+    return result
+
+
+def run_test(svg_file_name, _):
+    if not check_decoder():
+        return False
+
+    random.seed(1)
+    gray = [[random.randrange(256) for _ in range(WIDTH)] for _ in range(HEIGHT)]
+    gray[3] = [255] * WIDTH  # A blank row is skipped
+    data = base64.b64encode(encode_png([[(value,) for value in row] for row in gray], 0, 8, 1)).decode()
+
+    # Add the image to the example, it mustn't change the curves.
+    root = ElementTree.parse(svg_file_name).getroot()
+    curves = parse_root(root)
+
+    group = ElementTree.SubElement(root, "{http://www.w3.org/2000/svg}g", {"transform": "translate(10, 5)"})
+    ElementTree.SubElement(group, "{http://www.w3.org/2000/svg}image",
+                           {"x": "2", "y": "3", "width": f"{WIDTH * 0.5}", "height": f"{HEIGHT * 0.5}px",
+                            "{http://www.w3.org/1999/xlink}href": f"data:image/png;base64,{data}"})
+    ElementTree.SubElement(group, "{http://www.w3.org/2000/svg}image", {"href": "photo.jpg", "width": "5",
+                                                                        "height": "5"})
+
+    # A corrupt png is skipped like any other unsupported image, rather than failing the whole parse.
+    corrupt = base64.b64encode(encode_png([[(0,)]], 0, 8, 1, compressed=b"not zlib data")).decode()
+    ElementTree.SubElement(group, "{http://www.w3.org/2000/svg}image", {"href": f"data:image/png;base64,{corrupt}",
+                                                                        "width": "5", "height": "5"})
+
+    if [repr(curve) for curve in parse_root(root)] != [repr(curve) for curve in curves]:
+        print("Images changed the curves")
+        return False
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        images = parse_root_images(root)
+
+    if len(images) != 1 or len(caught) != 2:
+        print(f"Expected one image and two warnings. Got {images} and {len(caught)} warnings")
+        return False
+
+    image = images[0]
+
+    # The top-left corner is at (12, 8) in svg coordinates, which puts the origin at the top-left.
+    canvas_height = _canvas_height(root, None)
+    top_left, bottom_right = image.point(0, 0), image.point(WIDTH, HEIGHT)
+    if abs(top_left - Vector(12, canvas_height - 8)) > 1e-9 or \
+            abs(bottom_right - Vector(12 + WIDTH * 0.5, canvas_height - 8 - HEIGHT * 0.5)) > 1e-9:
+        print(f"The image is misplaced: {top_left}, {bottom_right}")
+        return False
+
+    for levels, max_power in ((2, 1), (5, 0.8)):
+        gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0)
+        gcode_compiler.append_image(image, levels, max_power)
+        trace = simulate(gcode_compiler.compile())
+
+        expected = dither(image.pixels, levels)
+        if engraved(trace, image, levels, max_power) != expected:
+            print(f"The engraving doesn't match the dithered image with {levels} levels")
+            return False
+
+        # Runs of constant power are single moves, and rows alternate direction.
+        powered = [move for move in trace if move[4] > 0]
+        changes = sum(1 for row in expected for a, b in zip(row, row[1:]) if a != b and a and b)
+        if len(powered) > sum(1 for row in expected for value in row if value) or len(powered) < changes:
+            print("Runs of constant power weren't merged")
+            return False
+
+        directions = []
+        for previous, move in zip(trace, trace[1:]):
+            if move[4] > 0 and move[1] != (directions[-1][0] if directions else None):
+                directions.append((move[1], move[0] > previous[0]))
+
+        if any(a[1] == b[1] for a, b in zip(directions, directions[1:])):
+            print("Rows weren't scanned in alternating directions")
+            return False
+
+    # Nothing is engraved outside of the clip window.
+    window = (top_left.x + 1, bottom_right.y, top_left.x + 4, top_left.y)
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, clip_window=window)
+    gcode_compiler.append_image(image)
+    trace = simulate(gcode_compiler.compile())
+    for previous, move in zip(trace, trace[1:]):
+        if move[4] > 0 and not all(window[0] - 1e-6 <= point[0] <= window[2] + 1e-6 for point in (previous, move)):
+            print(f"Engraved outside of the clip window {move}")
+            return False
+
+    return True
@@ -0,0 +1,151 @@
+import os
+import pty
+import select
+import threading
+import tty
+import warnings
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces, Sender
+
+
+class PtyStream:
+    """The master side of a pty, with a readline that times out like pyserial's."""
+
+    def __init__(self, fd, timeout=5):
+        self.fd = fd
+        self.timeout = timeout
+        self.buffer = b''
+
+    def write(self, data):
+        os.write(self.fd, data)
+
+    def readline(self):
+        while b'\n' not in self.buffer:
+            if not select.select([self.fd], [], [], self.timeout)[0]:
+                return b''
+            self.buffer += os.read(self.fd, 4096)
+
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        return line + b'\n'
+
+
+class FakeController(threading.Thread):
+    """
+    Emulates grbl or Marlin on the slave side of a pty. Everything available is read before any line is processed, such
+    that the receive buffer fills up like on a real controller and overflows can be detected.
+    """
+
+    def __init__(self, fd, buffer_size, line_numbers, corrupt=()):
+        super().__init__(daemon=True)
+        self.fd = fd
+        self.buffer_size = buffer_size
+        self.line_numbers = line_numbers
+        self.corrupt = set(corrupt)  # Line numbers which fail their checksum the first time they are received
+
+        self.received = []
+        self.max_buffered = 0
+        self.stop = threading.Event()
+
+    def respond(self, response):
+        os.write(self.fd, (response + '\n').encode())
+
+    def process(self, line, expected):
+        """Process a line and return the next expected line number."""
+        if line.startswith("M110"):
+            self.respond("ok")
+            return 1
+
+        if self.line_numbers:
+            data, checksum = line.rsplit('*', 1)
+            number, line = data.split(' ', 1)
+            number = int(number[1:])
+
+            if number != expected:
+                self.respond(f"Error:Line Number is not Last Line Number+1, Last Line: {expected - 1}")
+                self.respond(f"Resend: {expected}")
+                self.respond("ok")
+                return expected
+
+            if Sender.checksum(data) != int(checksum) or number in self.corrupt:
+                self.corrupt.discard(number)
+                self.respond(f"Error:checksum mismatch, Last Line: {expected - 1}")
+                self.respond(f"Resend: {expected}")
+                self.respond("ok")
+                return expected
+
+        self.received.append(line)
+
+        if not line.startswith("G99"):
+            self.respond("ok")
+        elif self.line_numbers:
+            self.respond('echo:Unknown command: "G99"')
+            self.respond("ok")
+        else:
+            self.respond("error:20")
+
+        return expected + 1
+
+    def run(self):
+        buffer = b''
+        expected = 1
+        while not self.stop.is_set():
+            timeout = 0.05
+            while select.select([self.fd], [], [], timeout)[0]:
+                buffer += os.read(self.fd, 4096)
+                timeout = 0
+            self.max_buffered = max(self.max_buffered, len(buffer))
+
+            while b'\n' in buffer:
+                line, buffer = buffer.split(b'\n', 1)
+                expected = self.process(line.decode(), expected)
+
+
+def stream(commands, buffer_size, line_numbers, corrupt=()):
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+
+    controller = FakeController(slave, buffer_size, line_numbers, corrupt)
+    controller.start()
+
+    sender = Sender(PtyStream(master), buffer_size, line_numbers)
+    try:
+        sender.send(commands)
+    finally:
+        controller.stop.set()
+        controller.join()
+        os.close(master)
+        os.close(slave)
+
+    return sender, controller
+
+
+def run_test(svg_file_name, _):
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 2, dwell_time=200)
+    gcode_compiler.append_curves(parse_file(svg_file_name))
+
+    commands = list(gcode_compiler.compile_stream(passes=2)) + ["G99 (unsupported)"]
+    expected = [Sender.clean(line) for command in commands for line in command.split('\n') if Sender.clean(line)]
+
+    for line_numbers, corrupt in [(False, ()), (True, ()), (True, (1, 3, 4, len(expected) // 2))]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            sender, controller = stream(iter(commands), 128, line_numbers, corrupt)
+
+        if controller.received != expected:
+            print(f"The controller received {len(controller.received)} lines instead of {len(expected)}")
+            return False
+
+        if controller.max_buffered > 128:
+            print(f"The controller's receive buffer overflowed: {controller.max_buffered} bytes")
+            return False
+
+        if sender.errors != [("G99", "error:20")] * (not line_numbers):
+            print(f"Unexpected errors: {sender.errors}")
+            return False
+
+        if sender.resends != len(set(corrupt)):
+            print(f"Resent {sender.resends} times instead of {len(set(corrupt))}")
+            return False
+
+    return True
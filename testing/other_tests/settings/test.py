@@ -0,0 +1,82 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from svg_to_gcode import TOLERANCES, Settings
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+
+
+def job(svg_file_name, settings):
+    with settings:
+        curves = parse_file(svg_file_name)
+
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, settings=settings)
+    gcode_compiler.append_curves(curves)
+    return gcode_compiler.compile()
+
+
+def run_test(svg_file_name, _):
+    defaults = dict(TOLERANCES)
+    coarse, fine = Settings({"approximation": 0.1}), Settings({"approximation": 0.02, "operation": 10 ** -4})
+
+    expected = {coarse: job(svg_file_name, coarse), fine: job(svg_file_name, fine)}
+    if expected[coarse] == expected[fine] and len(parse_file(svg_file_name)) > 1:
+        print("The tolerances of the settings were ignored")
+        return False
+
+    # Concurrent jobs with different tolerances don't interfere. Switch threads often, to interleave them.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(4) as pool:
+            jobs = [coarse, fine] * 3
+            results = list(pool.map(lambda settings: job(svg_file_name, settings), jobs))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    if any(result != expected[settings] for result, settings in zip(results, jobs)):
+        print("Concurrent jobs interfered with each other")
+        return False
+
+    if dict(TOLERANCES) != defaults:
+        print("Settings leaked into the global tolerances")
+        return False
+
+    # Activations nest, and the interface rounds to the operational tolerance of the job.
+    with coarse:
+        with fine:
+            if TOLERANCES["approximation"] != 0.02:
+                print("The innermost settings aren't active")
+                return False
+
+        if TOLERANCES["approximation"] != 0.1:
+            print("Leaving settings didn't restore the outer settings")
+            return False
+
+    if Compiler(interfaces.Gcode, 1000, 300, 0, settings=fine).interface.precision != 4:
+        print("The interface didn't use the operational tolerance of the settings")
+        return False
+
+    try:
+        Settings({"aproximation": 0.1})
+        print("An unknown tolerance was accepted")
+        return False
+    except ValueError:
+        pass
+
+    # A reset compiler compiles the next job from scratch, it doesn't remember the segments of the previous one.
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, remove_duplicates=True, settings=coarse)
+    with coarse:
+        curves = parse_file(svg_file_name)
+
+    programs = []
+    for _ in range(2):
+        gcode_compiler.reset()
+        gcode_compiler.append_curves(curves)
+        programs.append(gcode_compiler.compile())
+
+    if programs[0] != programs[1]:
+        print("Reusing a compiler after reset() changed its output")
+        return False
+
+    return True
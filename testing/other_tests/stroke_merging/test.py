@@ -0,0 +1,112 @@
+from collections import Counter
+
+from svg_to_gcode.svg_parser import parse_file
+from svg_to_gcode.compiler import Compiler, interfaces
+from svg_to_gcode.geometry import Vector, Line, LineSegmentChain, merge_strokes
+from svg_to_gcode.geometry._stroke_merging import _nodes
+
+from testing.other_tests._gcode_simulator import simulate
+
+
+class Points:
+    """Snap points within tolerance of each other to the same key, with a hash of grid cells."""
+
+    def __init__(self, tolerance=2e-3):
+        self.tolerance = tolerance
+        self.cells = {}
+
+    def key(self, x, y):
+        column, row = round(x / self.tolerance), round(y / self.tolerance)
+        for cell in ((column + i, row + j) for i in (-1, 0, 1) for j in (-1, 0, 1)):
+            for point in self.cells.get(cell, ()):
+                if abs(point[0] - x) <= self.tolerance and abs(point[1] - y) <= self.tolerance:
+                    return point
+
+        self.cells.setdefault((column, row), []).append((x, y))
+        return x, y
+
+
+def segments(line_chains, points):
+    """The multiset of segments drawn by some chains, regardless of their direction."""
+    return Counter(tuple(sorted((points.key(line.start.x, line.start.y), points.key(line.end.x, line.end.y))))
+                   for line_chain in line_chains for line in line_chain)
+
+
+def cut_segments(gcode_compiler, points):
+    trace = [(0, 0, 0, None, 0)] + simulate(gcode_compiler.compile())
+    return Counter(tuple(sorted((points.key(*previous[:2]), points.key(*move[:2]))))
+                   for previous, move in zip(trace, trace[1:]) if move[4] > 0)
+
+
+def chain(*points):
+    line_chain = LineSegmentChain()
+    for start, end in zip(points, points[1:]):
+        line_chain.append(Line(Vector(*start), Vector(*end)))
+
+    return line_chain
+
+
+def lower_bound(line_chains):
+    """max(1, odd nodes / 2) strokes per connected component of the endpoint graph."""
+    endpoints = _nodes(line_chains, 1e-3 / 2)
+    parent = {}
+
+    def find(node):
+        while parent.setdefault(node, node) != node:
+            node = parent[node]
+        return node
+
+    degree = Counter()
+    for start, end in endpoints:
+        parent[find(start)] = find(end)
+        degree[start] += 1
+        degree[end] += 1
+
+    odd = Counter(find(node) for node in degree if degree[node] % 2)
+    return sum(max(1, odd[root] // 2) for root in {find(node) for node in degree})
+
+
+def run_test(svg_file_name, _):
+    curves = parse_file(svg_file_name)
+    line_chains = [LineSegmentChain.line_segment_approximation(curve) for curve in curves]
+
+    # Every segment is drawn exactly once, in as few strokes as the graph allows.
+    points = Points()
+    strokes = merge_strokes(line_chains)
+    if segments(strokes, points) != segments(line_chains, points):
+        print("Merging changed the segments")
+        return False
+
+    if len(strokes) != lower_bound(line_chains):
+        print(f"Merged {len(line_chains)} chains into {len(strokes)} strokes instead of {lower_bound(line_chains)}")
+        return False
+
+    # A square with both diagonals has four odd corners, it takes two strokes.
+    square = [chain((0, 0), (10, 0)), chain((10, 0), (10, 10)), chain((0, 10), (10, 10)), chain((0, 0), (0, 10)),
+              chain((0, 0), (10, 10)), chain((10, 0), (0, 10))]
+    if len(merge_strokes(square)) != 2 or segments(merge_strokes(square), points) != segments(square, points):
+        print(f"A square with diagonals was merged into {len(merge_strokes(square))} strokes")
+        return False
+
+    # Endpoints within tolerance of each other are joined.
+    if len(merge_strokes([chain((0, 0), (5, 0)), chain((5.0002, 0), (5, 5))])) != 1:
+        print("Coincident endpoints weren't joined")
+        return False
+
+    # The compiled program cuts the same segments, and only lifts the tool once per stroke.
+    plain_compiler = Compiler(interfaces.Gcode, 1000, 300, 0)
+    plain_compiler.append_curves(curves)
+
+    gcode_compiler = Compiler(interfaces.Gcode, 1000, 300, 0, dwell_time=10, merge_strokes=True)
+    gcode_compiler.append_curves(curves)
+
+    if cut_segments(gcode_compiler, points) != cut_segments(plain_compiler, points):
+        print("Merging changed the cuts")
+        return False
+
+    lifts = sum(1 for command in gcode_compiler.body if command.startswith("G4"))
+    if lifts > len(strokes):
+        print(f"The tool was lifted {lifts} times for {len(strokes)} strokes")
+        return False
+
+    return True